@@ -0,0 +1,245 @@
+"""
+Define the admission control of the requests calling the providers.
+
+When the providers slow down, the requests collecting data from them pile up in the workers until everything times out
+together. Each worker therefore admits a limited number of concurrent collections, and lets a limited number of extra
+requests wait for a slot. The requests beyond the queue, or waiting for too long, are rejected right away with a 503
+and a `Retry-After` header, instead of timing out later. The admitted requests wait for their collection for a limited
+time, then fail with a 504.
+
+Only the requests calling the providers go through the admission control: the health checks and the requests answered
+from the cache are always served.
+
+The saturation of the worker is reported by the health endpoint, so that the readiness probe takes a saturated worker
+out of the load balancing until it drains. The counters are per process: each gunicorn worker reports its own state.
+"""
+import asyncio
+import contextlib
+import os
+import threading
+
+from connexion.lifecycle import ConnexionResponse
+
+# Maximum number of concurrent collections per worker.
+ADMISSION_LIMIT = int(os.environ.get('RYR_API_ADMISSION_LIMIT', 8))
+
+# Maximum number of requests waiting for a collection slot per worker.
+ADMISSION_QUEUE_SIZE = int(os.environ.get('RYR_API_ADMISSION_QUEUE_SIZE', 16))
+
+# Maximum number of seconds a request waits for a collection slot.
+ADMISSION_TIMEOUT = float(os.environ.get('RYR_API_ADMISSION_TIMEOUT', 5))
+
+# Number of seconds after which the rejected clients should retry.
+ADMISSION_RETRY_AFTER = int(os.environ.get('RYR_API_ADMISSION_RETRY_AFTER', 10))
+
+# Maximum number of seconds an admitted request waits for the collection to complete.
+COLLECT_TIMEOUT = float(os.environ.get('RYR_API_COLLECT_TIMEOUT', 30))
+
+
+class Overloaded(Exception):
+    """
+    Define the error raised when a request is not admitted.
+
+    :param int retry_after: number of seconds after which the client should retry
+    """
+
+    def __init__(self, retry_after):
+        """Initialize the error."""
+        super().__init__('The server is overloaded, please retry later.')
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Define the admission control of the collections run by threads.
+
+    :param int limit: maximum number of concurrent collections
+    :param int queue_size: maximum number of requests waiting for a slot
+    :param float timeout: maximum number of seconds a request waits for a slot
+    :param int retry_after: number of seconds after which the rejected clients should retry
+    """
+
+    def __init__(self, limit, queue_size, timeout, retry_after):
+        """Initialize the controller."""
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._condition = threading.Condition()
+
+    def _admit_now(self):
+        """
+        Take a slot if one is free, or check whether the request may wait for one.
+
+        :return: `True` if the request was admitted, `False` if it may wait.
+        :rtype: bool
+        :raises Overloaded: if the queue is full
+        """
+        if self.in_flight < self.limit:
+            self.in_flight += 1
+            return True
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise Overloaded(self.retry_after)
+        return False
+
+    def _has_free_slot(self):
+        """Check whether a slot is free."""
+        return self.in_flight < self.limit
+
+    def acquire(self):
+        """
+        Take a collection slot, waiting for one if needed.
+
+        :raises Overloaded: if the queue is full, or if no slot was freed in time
+        """
+        with self._condition:
+            if self._admit_now():
+                return
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(self._has_free_slot, self.timeout)
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+            self.in_flight += 1
+
+    def release(self):
+        """Free a collection slot."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def admit(self):
+        """
+        Run a collection within a slot.
+
+        :raises Overloaded: if the request is not admitted
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def saturated(self):
+        """Check whether the worker cannot admit any new request."""
+        return self.in_flight >= self.limit and self.waiting >= self.queue_size
+
+    def stats(self):
+        """
+        Report the state of the admission control.
+
+        :return: the limits, the number of collections in flight, the number of requests waiting, the number of
+            requests rejected so far and the saturation, between 0 and 1.
+        :rtype: dict
+        """
+        capacity = self.limit + self.queue_size
+        return {
+            'limit': self.limit,
+            'queue_size': self.queue_size,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'rejected': self.rejected,
+            'saturation': min((self.in_flight + self.waiting) / capacity, 1.0) if capacity else 1.0,
+        }
+
+
+class AsyncAdmissionController(AdmissionController):
+    """
+    Define the admission control of the collections run by coroutines.
+
+    The condition is created on first use, so that it belongs to the event loop of the worker.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the controller."""
+        super().__init__(*args, **kwargs)
+        self._condition = None
+
+    @property
+    def condition(self):
+        """Return the condition notified when a slot is freed."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):  # pylint: disable=invalid-overridden-method
+        """
+        Take a collection slot, waiting for one if needed.
+
+        :raises Overloaded: if the queue is full, or if no slot was freed in time
+        """
+        async with self.condition:
+            if self._admit_now():
+                return
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.condition.wait_for(self._has_free_slot), self.timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise Overloaded(self.retry_after)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self):  # pylint: disable=invalid-overridden-method
+        """Free a collection slot."""
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    @contextlib.asynccontextmanager
+    async def admit(self):  # pylint: disable=invalid-overridden-method
+        """
+        Run a collection within a slot.
+
+        :raises Overloaded: if the request is not admitted
+        """
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+def overloaded_response(error):
+    """
+    Create the response rejecting a request which was not admitted.
+
+    :param Overloaded error: the admission error
+    :return: a 503 response, telling the client when to retry.
+    :rtype: ConnexionResponse
+    """
+    body = {'error': {'message': str(error)}}
+    return ConnexionResponse(status_code=503, body=body, headers={'Retry-After': str(error.retry_after)})
+
+
+def timed_out_response():
+    """
+    Create the response of a request whose collection did not complete in time.
+
+    :return: a 504 response.
+    :rtype: ConnexionResponse
+    """
+    body = {'error': {'message': f'The collection did not complete within {COLLECT_TIMEOUT:g} seconds.'}}
+    return ConnexionResponse(status_code=504, body=body)
+
+
+# Admission control of the WSGI workers.
+ADMISSION = AdmissionController(ADMISSION_LIMIT, ADMISSION_QUEUE_SIZE, ADMISSION_TIMEOUT, ADMISSION_RETRY_AFTER)
+
+# Admission control of the asyncio workers.
+ASYNC_ADMISSION = AsyncAdmissionController(
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_TIMEOUT,
+    ADMISSION_RETRY_AFTER,
+)
@@ -0,0 +1,16 @@
+"""
+Define the asyncio app.
+
+This is an alternative to the WSGI app, using aiohttp and the asynchronous controllers. A single process can therefore
+hold many concurrent requests waiting on slow upstream providers.
+
+Run it with::
+
+    gunicorn -c python:api.gunicorn_config --worker-class aiohttp.GunicornWebWorker api.aio:application
+"""
+
+from api.connexion_utils import create_aiohttp_app
+
+app = create_aiohttp_app()
+
+application = app.app
@@ -0,0 +1,28 @@
+"""Define the asynchronous endpoint for the health resource."""
+import asyncio
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.admission import ASYNC_ADMISSION
+from api.health import HEALTH_CHECK
+
+
+async def search(detailed=False):
+    """
+    Provide server status information.
+
+    The worker is reported as saturated, with a 503, when it cannot admit any new collection, so that the readiness
+    probe takes it out of the load balancing until it drains.
+
+    If `detailed` is set, the dependencies of the API are also probed. A failing dependency reports the API as degraded,
+    without changing the status code.
+    """
+    saturated = ASYNC_ADMISSION.saturated
+    content = {'status': 'saturated' if saturated else 'ok', 'admission': ASYNC_ADMISSION.stats()}
+    if detailed:
+        # The probes are blocking, so they run in the default executor.
+        report = await asyncio.get_event_loop().run_in_executor(None, HEALTH_CHECK.report)
+        content = {**report, **content}
+        if not saturated:
+            content['status'] = report['status']
+    return ConnexionResponse(status_code=503 if saturated else 200, body=content)
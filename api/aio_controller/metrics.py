@@ -0,0 +1,14 @@
+"""Define the asynchronous endpoint for the metrics resource."""
+import asyncio
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.metrics import collect
+from api.metrics import CONTENT_TYPE
+
+
+async def search():
+    """Expose the metrics driving the autoscaling of the Celery workers, in the Prometheus text format."""
+    # Reading the broker and Redis is blocking, so it runs in the default executor.
+    body = await asyncio.get_event_loop().run_in_executor(None, collect)
+    return ConnexionResponse(body=body, content_type=CONTENT_TYPE)
@@ -0,0 +1,76 @@
+"""
+Define the asynchronous endpoint for the place resource.
+
+The calls to Redis and to the broker are blocking: they run in the default executor, so that the event loop keeps
+serving the other requests.
+"""
+import asyncio
+import dataclasses
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.admission import ASYNC_ADMISSION
+from api.admission import COLLECT_TIMEOUT
+from api.admission import Overloaded
+from api.admission import overloaded_response
+from api.admission import timed_out_response
+from api.background import run_in_background
+from api.cache import PLACE_DETAILS_CACHE
+from api.connexion_json import encode
+from api.hot_places import HOT_PLACES
+from api.hot_places import place_request
+from api.http_cache import cache_headers
+
+
+async def post(body):
+    """Provide detailed information about a specific place."""
+    # Track the popularity of the place, to refresh its details before they expire, without waiting for Redis.
+    run_in_background(HOT_PLACES.record, body['place_id'], place_request(body))
+
+    loop = asyncio.get_event_loop()
+
+    # Serve the cached result if any.
+    cached = await loop.run_in_executor(None, PLACE_DETAILS_CACHE.get_with_ttl, body['place_id'])
+    if cached:
+        etag, details, ttl = cached
+        return details_response(details, etag, ttl)
+
+    # Celery and the collectors are only imported when the endpoint is first used.
+    from celery.exceptions import TimeoutError as CeleryTimeoutError
+
+    from api.celery.aio import wait_for_result
+    from api.celery.tasks import dispatch_place_details
+    from api.celery.tasks import forget_result
+
+    # Only the requests calling the providers go through the admission control.
+    try:
+        async with ASYNC_ADMISSION.admit():
+            async_result = await loop.run_in_executor(
+                None,
+                dispatch_place_details,
+                body['place_id'],
+                body['name'],
+                body['address'],
+                body.get('latitude'),
+                body.get('longitude'),
+            )
+            try:
+                result = await wait_for_result(async_result, COLLECT_TIMEOUT)
+            finally:
+                await loop.run_in_executor(None, forget_result, async_result)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except CeleryTimeoutError:
+        return timed_out_response()
+    details = dataclasses.asdict(result)
+    etag = await loop.run_in_executor(None, PLACE_DETAILS_CACHE.set, body['place_id'], details)
+    return details_response(details, etag, PLACE_DETAILS_CACHE.ttl)
+
+
+def details_response(details, etag, max_age):
+    """Create the response containing the details of a place, serialized with the fast JSON encoder."""
+    return ConnexionResponse(
+        body=encode(details),
+        content_type='application/json',
+        headers=cache_headers(etag, max_age, public=False),
+    )
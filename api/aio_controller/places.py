@@ -0,0 +1,97 @@
+"""Define the asynchronous endpoint for the places resource."""
+import asyncio
+import os
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.admission import ASYNC_ADMISSION
+from api.admission import Overloaded
+from api.admission import overloaded_response
+from api.background import run_in_background
+from api.cache import PLACES_CACHE
+from api.connexion_json import encode
+from api.http_cache import cache_headers
+from api.http_cache import etag_matches
+from api.http_cache import not_modified
+from api.http_cache import variant_etag
+from api.prefetch import PREFETCH_TOP
+from api.projection import canonical_fields
+from api.projection import project_search_results
+
+
+async def search(location, request, fields=None, merged=False):
+    """
+    Return a list of all places nearby our coordinates.
+
+    Only Google is queried by default. If `merged` is set, every provider supporting the nearby search is queried and
+    their results are merged into a single list of distinct places.
+    """
+    cache_key = f'merged:{location}' if merged else location
+    # The lists of fields selecting the same projection share their ETag.
+    fields = canonical_fields(fields)
+    # The calls to Redis are blocking: they run in the default executor.
+    loop = asyncio.get_event_loop()
+
+    # Answer the conditional requests without touching the providers.
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etag = await loop.run_in_executor(None, PLACES_CACHE.etag, cache_key)
+        if etag and etag_matches(if_none_match, variant_etag(etag, fields)):
+            return not_modified(variant_etag(etag, fields), PLACES_CACHE.ttl)
+
+    # Serve the cached result if any.
+    cached = await loop.run_in_executor(None, PLACES_CACHE.get_with_ttl, cache_key)
+    if cached:
+        etag, places_nearby, max_age = cached
+    else:
+        # Only the requests calling the providers go through the admission control.
+        try:
+            async with ASYNC_ADMISSION.admit():
+                places_nearby = await search_providers(location, merged)
+        except Overloaded as e:
+            return overloaded_response(e)
+        etag = await loop.run_in_executor(None, PLACES_CACHE.set, cache_key, places_nearby)
+        max_age = PLACES_CACHE.ttl
+
+    # Warm the place details cache for the first results, without waiting for the tasks to be published.
+    if PREFETCH_TOP:
+        from api.celery.tasks import schedule_prefetch
+        run_in_background(schedule_prefetch, places_nearby, PREFETCH_TOP)
+
+    body = encode(project_search_results(places_nearby, fields))
+    return ConnexionResponse(
+        body=body,
+        content_type='application/json',
+        headers=cache_headers(variant_etag(etag, fields), max_age),
+    )
+
+
+async def search_providers(location, merged):
+    """
+    Query the providers for the places nearby our coordinates.
+
+    :param str location: the coordinates
+    :param bool merged: query every provider supporting the nearby search, rather than Google only
+    :return: the places nearby.
+    """
+    loop = asyncio.get_event_loop()
+    if merged:
+        # The collectors are only imported when the endpoint is first used.
+        from api.collectors.nearby import nearby_clients
+        from api.collectors.nearby import search_nearby
+
+        # The providers are queried concurrently by the search itself, which runs in the default executor.
+        return await loop.run_in_executor(None, lambda: search_nearby(location, nearby_clients()))
+
+    # The Google client is only imported when the endpoint is first used.
+    from api.collectors.google import GoogleCollector
+
+    # Define data.
+    places_api_key = os.environ['RYR_COLLECTOR_GOOGLE_PLACES_API_KEY']
+
+    # Prepare client.
+    gmap = GoogleCollector()
+    gmap.authenticate(api_key=places_api_key)
+
+    # Retrieve nearby places. The Google client is synchronous, so it runs in the default executor.
+    return await loop.run_in_executor(None, gmap.search_places_nearby, location)
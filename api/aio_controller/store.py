@@ -0,0 +1,34 @@
+"""Define the asynchronous endpoint for the store resource."""
+import sqlite3
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.connexion_json import encode
+from api.store import DEFAULT_RADIUS
+from api.store import MAX_LIMIT
+from api.store import PLACE_STORE
+from api.store import query_places
+
+
+async def search(bbox=None, location=None, radius=DEFAULT_RADIUS, prefix=None, limit=MAX_LIMIT):
+    """
+    Return the places of the local store located in a bounding box, within a radius, or matching a name prefix.
+
+    The store is queried directly from the event loop: the queries are answered from the indexes in well under a
+    millisecond.
+    """
+    if not PLACE_STORE.enabled:
+        return store_response({'error': {'message': 'The place store is not enabled.'}}, 503)
+    try:
+        results = query_places(PLACE_STORE, bbox, location, radius, prefix, limit)
+    except ValueError as e:
+        return store_response({'error': {'message': str(e)}}, 400)
+    except sqlite3.OperationalError as e:
+        # i.e. the database is locked, or its file is missing or unreadable.
+        return store_response({'error': {'message': f'The place store is unavailable: {e}'}}, 503)
+    return store_response({'status': 'OK', 'results': results})
+
+
+def store_response(body, status_code=200):
+    """Create a response serialized with the fast JSON encoder."""
+    return ConnexionResponse(status_code=status_code, body=encode(body), content_type='application/json')
@@ -0,0 +1,110 @@
+"""
+Define the audit store of the raw provider payloads.
+
+The collectors only need the raw responses of the providers long enough to convert them. When the raw payloads must
+be kept for auditing or debugging, they are stored in Redis instead, compressed and with a short expiry, rather than
+being pinned in the memory of the workers.
+
+Like the result cache, the audit store is best effort: if Redis is unavailable, the errors are logged and the payloads
+are dropped.
+"""
+import logging
+import os
+import zlib
+
+import orjson
+import redis
+
+from api.redis_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+# Compression level of the payloads, from 1 (fastest) to 9 (smallest).
+AUDIT_COMPRESSION_LEVEL = int(os.environ.get('RYR_COLLECTOR_AUDIT_COMPRESSION_LEVEL', 6))
+
+
+def compress(payload, level=AUDIT_COMPRESSION_LEVEL):
+    """
+    Compress a raw payload.
+
+    :param payload: a JSON serializable payload
+    :param int level: the compression level
+    :return: the compressed JSON representation of the payload.
+    :rtype: bytes
+    """
+    return zlib.compress(orjson.dumps(payload), level)
+
+
+def decompress(data):
+    """
+    Decompress a raw payload.
+
+    :param bytes data: the compressed JSON representation of the payload
+    :return: the payload.
+    """
+    return orjson.loads(zlib.decompress(data))
+
+
+class AuditStore:
+    """
+    Define the store of the raw provider payloads.
+
+    :param int ttl: number of seconds before the payloads expire. The store is disabled if 0.
+    :param client: the Redis client. Uses the shared client if `None`.
+    """
+
+    def __init__(self, ttl, client=None):
+        """Initialize the store."""
+        self.ttl = ttl
+        self._client = client
+
+    @property
+    def client(self):
+        """Return the Redis client."""
+        return self._client or get_client()
+
+    @property
+    def enabled(self):
+        """Check whether the payloads are stored."""
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(provider, kind, key):
+        """Return the Redis key storing a payload."""
+        return f'ryr:audit:{provider}:{kind}:{key}'
+
+    def put(self, provider, kind, key, payload):
+        """
+        Store a raw payload.
+
+        :param str provider: the provider which returned the payload
+        :param str kind: the kind of request, i.e. "search" or "details"
+        :param str key: the key identifying the request, i.e. the place ID
+        :param payload: the JSON serializable payload
+        """
+        if not self.enabled or payload is None:
+            return
+        try:
+            self.client.set(self._key(provider, kind, key), compress(payload), ex=self.ttl)
+        except (redis.exceptions.RedisError, TypeError) as e:
+            logger.warning(f'Cannot store the {kind} payload of "{provider}:{key}": {e}')
+
+    def get(self, provider, kind, key):
+        """
+        Retrieve a raw payload.
+
+        :param str provider: the provider which returned the payload
+        :param str kind: the kind of request, i.e. "search" or "details"
+        :param str key: the key identifying the request, i.e. the place ID
+        :return: the payload, or `None` if it is not stored.
+        """
+        try:
+            data = self.client.get(self._key(provider, kind, key))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read the {kind} payload of "{provider}:{key}": {e}')
+            return None
+        return decompress(data) if data is not None else None
+
+
+# Audit store shared by the collection tasks. It is disabled by default.
+AUDIT_STORE = AuditStore(int(os.environ.get('RYR_COLLECTOR_AUDIT_TTL', 0)))
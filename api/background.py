@@ -0,0 +1,37 @@
+"""
+Define the background calls of the asynchronous controllers.
+
+Some blocking calls do not contribute to the response, i.e. recording the popularity of a place. They run in the
+default executor without being awaited, so that the event loop keeps serving the requests. Their futures are kept until
+they are done, and their errors are logged instead of being lost with the futures.
+"""
+import asyncio
+import functools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Futures of the calls running in the background.
+_pending = set()
+
+
+def run_in_background(func, *args):
+    """
+    Run a blocking call in the default executor, without waiting for it.
+
+    :param func: the function to call
+    :param args: the arguments of the function
+    :return: the future of the call.
+    :rtype: asyncio.Future
+    """
+    future = asyncio.get_event_loop().run_in_executor(None, func, *args)
+    _pending.add(future)
+    future.add_done_callback(functools.partial(_done, getattr(func, '__qualname__', repr(func))))
+    return future
+
+
+def _done(name, future):
+    """Release the future of a background call, logging its error if any."""
+    _pending.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f'The background call to "{name}" failed: {future.exception()}')
@@ -0,0 +1,208 @@
+"""
+Export and import the stored places in a columnar format.
+
+The places of the local store (see the `store` module) are written to, or read from, Parquet or Arrow IPC files, one
+column per `BusinessInfo` field plus the place ID. The places are processed by chunks: the exports stream record batches
+to the file, and the imports read the record batches from a memory map, so that millions of places round-trip without
+being held in memory at once.
+
+The imported places can also be used to seed the place details cache.
+
+`pyarrow` is an optional dependency, installed with the `columnar` extra::
+
+    pip install api[columnar]
+    python -m api.bulk export places.parquet
+    python -m api.bulk import places.parquet --cache
+"""
+import argparse
+import dataclasses
+import logging
+import os
+import sys
+import time
+
+from api.cache import PLACE_DETAILS_CACHE
+from api.collectors.base import BusinessInfo
+from api.store import PlaceStore
+
+logger = logging.getLogger(__name__)
+
+# Number of places per record batch.
+CHUNK_SIZE = int(os.environ.get('RYR_API_BULK_CHUNK_SIZE', 65536))
+
+# File formats, by extension.
+FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+
+def file_format(path):
+    """
+    Guess the format of a file from its extension.
+
+    :param str path: path of the file
+    :return: "parquet" or "arrow".
+    :rtype: str
+    :raises ValueError: if the extension is unknown
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f'Unknown format "{extension}", expected one of {", ".join(sorted(FORMATS))}.')
+    return FORMATS[extension]
+
+
+def schema():
+    """
+    Create the Arrow schema of the places.
+
+    :return: the schema, with the place ID followed by the `BusinessInfo` fields.
+    :rtype: pyarrow.Schema
+    """
+    import pyarrow as pa
+
+    types = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+    fields = [pa.field('place_id', pa.string(), nullable=False)]
+    fields += [pa.field(field.name, types[field.type]) for field in dataclasses.fields(BusinessInfo)]
+    return pa.schema(fields)
+
+
+def to_record_batch(places, place_schema):
+    """
+    Convert a chunk of places to a record batch.
+
+    The details are converted by Arrow as a single struct array, rather than column by column in Python.
+
+    :param list(tuple) places: the places, as tuples containing their ID and their details as a dictionary
+    :param pyarrow.Schema place_schema: the schema of the places
+    :return: the record batch.
+    :rtype: pyarrow.RecordBatch
+    """
+    import pyarrow as pa
+
+    place_ids = pa.array([place_id for place_id, _ in places], type=pa.string())
+    details = pa.array([details for _, details in places], type=pa.struct(list(place_schema)[1:]))
+    return pa.RecordBatch.from_arrays([place_ids] + details.flatten(), schema=place_schema)
+
+
+def from_record_batch(batch):
+    """
+    Convert a record batch to a chunk of places.
+
+    The missing values are replaced by the defaults of the `BusinessInfo` fields.
+
+    :param pyarrow.RecordBatch batch: the record batch
+    :return: the places, as tuples containing their ID and their details as a dictionary.
+    :rtype: list(tuple)
+    """
+    import pyarrow as pa
+
+    defaults = {field.name: field.default for field in dataclasses.fields(BusinessInfo)}
+    names = batch.schema.names[1:]
+    columns = [
+        column.fill_null(defaults[name]) if column.null_count and name in defaults else column
+        for name, column in zip(names, batch.columns[1:])
+    ]
+    details = pa.StructArray.from_arrays(columns, names=names).to_pylist()
+    return list(zip(batch.column(0).to_pylist(), details))
+
+
+def export_places(store, path, chunk_size=CHUNK_SIZE):
+    """
+    Export the stored places to a file.
+
+    :param PlaceStore store: the store containing the places
+    :param str path: path of the Parquet or Arrow IPC file
+    :param int chunk_size: number of places per record batch
+    :return: the number of places exported.
+    :rtype: int
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    place_schema = schema()
+    if file_format(path) == 'parquet':
+        writer = pq.ParquetWriter(path, place_schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(path, place_schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    count = 0
+    with writer:
+        for places in store.iter_chunks(chunk_size):
+            writer.write_batch(to_record_batch(places, place_schema))
+            count += len(places)
+    return count
+
+
+def read_batches(path, chunk_size=CHUNK_SIZE):
+    """
+    Read the record batches of a file, using a memory map.
+
+    :param str path: path of the Parquet or Arrow IPC file
+    :param int chunk_size: maximum number of places per record batch, for the Parquet files
+    :return: the record batches.
+    :rtype: iterator(pyarrow.RecordBatch)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if file_format(path) == 'parquet':
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_size)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def import_places(store, path, cache=None, chunk_size=CHUNK_SIZE):
+    """
+    Import places from a file into the store, replacing the places already stored.
+
+    The places are written in a single transaction: the store is left untouched if the import fails. The cache is only
+    seeded once the transaction is committed, reading the file a second time, so that it never serves places which
+    were not stored.
+
+    :param PlaceStore store: the store receiving the places
+    :param str path: path of the Parquet or Arrow IPC file
+    :param ResultCache cache: the cache to seed with the details of the places. The cache is not seeded if `None`.
+    :param int chunk_size: maximum number of places per record batch, for the Parquet files
+    :return: the number of places imported.
+    :rtype: int
+    """
+    count = store.load(from_record_batch(batch) for batch in read_batches(path, chunk_size))
+    if cache is not None:
+        for batch in read_batches(path, chunk_size):
+            cache.set_many(from_record_batch(batch))
+    return count
+
+
+def main(argv=None):
+    """Export or import the stored places."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('path', help='path of the Parquet (.parquet) or Arrow IPC (.arrow, .feather) file')
+    parser.add_argument('--store', default=os.environ.get('RYR_API_STORE_PATH', ''), help='path of the place store')
+    parser.add_argument('--cache', action='store_true', help='also seed the place details cache when importing')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='number of places per record batch')
+    args = parser.parse_args(argv)
+
+    if not args.store:
+        parser.error('the place store is not configured, use --store or RYR_API_STORE_PATH')
+    try:
+        file_format(args.path)
+        import pyarrow  # noqa: F401 pylint: disable=unused-import,import-outside-toplevel
+    except ValueError as e:
+        parser.error(str(e))
+    except ImportError:
+        parser.error('pyarrow is not installed, install the "columnar" extra')
+
+    store = PlaceStore(args.store)
+    start = time.perf_counter()
+    if args.command == 'export':
+        count = export_places(store, args.path, args.chunk_size)
+    else:
+        count = import_places(store, args.path, PLACE_DETAILS_CACHE if args.cache else None, args.chunk_size)
+    print(f'{args.command}ed {count} places in {time.perf_counter() - start:.2f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Define the server-side cache of the collected results.
+
+The results are stored in Redis as compact JSON documents, along with a strong ETag computed from their content.
+Storing the ETag separately allows the conditional requests to be answered without even loading the cached document.
+
+The cache is an optimization: if Redis is unavailable, the errors are logged and the cache behaves as if it was empty.
+
+Each cache counts its hits and misses (see `ResultCache.stats`). The counters are per process.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+import orjson
+import redis
+
+from api.redis_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+
+def serialize(value):
+    """
+    Serialize a value to its canonical JSON representation.
+
+    The keys are sorted, so that the same value always produces the same representation, and therefore the same ETag.
+
+    :param value: a JSON serializable object
+    :return: the JSON representation of the value.
+    :rtype: bytes
+    """
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+
+def compute_etag(data):
+    """
+    Compute a strong ETag.
+
+    :param bytes data: the representation to compute the ETag for
+    :return: the quoted ETag.
+    :rtype: str
+    """
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+class ResultCache:
+    """
+    Define a cache of results, identified by a key.
+
+    :param str namespace: prefix of the Redis keys
+    :param int ttl: number of seconds before the cached results expire
+    :param client: the Redis client. Uses the shared client if `None`.
+    """
+
+    def __init__(self, namespace, ttl, client=None):
+        """Initialize the cache."""
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = client
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def client(self):
+        """Return the Redis client."""
+        return self._client or get_client()
+
+    def _keys(self, key):
+        """Return the Redis keys storing respectively the ETag and the body of a result."""
+        prefix = f'ryr:cache:{self.namespace}:{key}'
+        return f'{prefix}:etag', f'{prefix}:body'
+
+    def get(self, key):
+        """
+        Retrieve a result.
+
+        :param str key: the key identifying the result
+        :return: a tuple containing the ETag and the result, or `None` if the result is not cached.
+        :rtype: tuple(str, object)
+        """
+        try:
+            etag, body = self.client.mget(self._keys(key))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read "{key}" from the "{self.namespace}" cache: {e}')
+            etag = body = None
+        if not self._count(etag is not None and body is not None):
+            return None
+        return etag.decode(), orjson.loads(body)
+
+    def get_with_ttl(self, key):
+        """
+        Retrieve a result along with the number of seconds before it expires, in a single round trip.
+
+        The remaining time to live bounds how long the clients may keep the result: a fixed `max-age` would let them
+        keep it past its expiration in the cache.
+
+        :param str key: the key identifying the result
+        :return: a tuple containing the ETag, the result and its remaining time to live, or `None` if the result is not
+            cached.
+        :rtype: tuple(str, object, int)
+        """
+        etag_key, body_key = self._keys(key)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.mget([etag_key, body_key])
+            pipe.ttl(etag_key)
+            (etag, body), ttl = pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read "{key}" from the "{self.namespace}" cache: {e}')
+            etag = body = ttl = None
+        if not self._count(etag is not None and body is not None):
+            return None
+        # The TTL is negative if the result has no expiration, and it cannot exceed the TTL of the cache.
+        return etag.decode(), orjson.loads(body), min(ttl, self.ttl) if ttl is not None and ttl >= 0 else self.ttl
+
+    def _count(self, hit):
+        """Count a lookup, and return whether it is a hit."""
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+
+    def stats(self):
+        """
+        Report the usage of the cache.
+
+        :return: the number of results read from the cache and missing from it, and the hit rate, between 0 and 1.
+        :rtype: dict
+        """
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else None}
+
+    def etag(self, key):
+        """
+        Retrieve the ETag of a result without loading the result itself.
+
+        :param str key: the key identifying the result
+        :return: the ETag of the result, or `None` if the result is not cached.
+        :rtype: str
+        """
+        try:
+            etag = self.client.get(self._keys(key)[0])
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read "{key}" from the "{self.namespace}" cache: {e}')
+            return None
+        return etag.decode() if etag is not None else None
+
+    def missing(self, keys):
+        """
+        Find the results which are not cached.
+
+        :param list(str) keys: the keys identifying the results
+        :return: the keys of the results which are not cached, in the same order. All the keys are returned if the
+            cache cannot be read.
+        :rtype: list(str)
+        """
+        if not keys:
+            return []
+        try:
+            etags = self.client.mget([self._keys(key)[0] for key in keys])
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read from the "{self.namespace}" cache: {e}')
+            return list(keys)
+        return [key for key, etag in zip(keys, etags) if etag is None]
+
+    def remaining_ttls(self, keys):
+        """
+        Retrieve the number of seconds before some results expire.
+
+        :param list(str) keys: the keys identifying the results
+        :return: the remaining time to live of each result, in the same order. The results which are not cached, or
+            whose TTL cannot be read, have a remaining time to live of 0.
+        :rtype: list(int)
+        """
+        if not keys:
+            return []
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.ttl(self._keys(key)[0])
+            ttls = pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read from the "{self.namespace}" cache: {e}')
+            return [0] * len(keys)
+        return [max(ttl or 0, 0) for ttl in ttls]
+
+    def set(self, key, value):
+        """
+        Store a result.
+
+        :param str key: the key identifying the result
+        :param value: a JSON serializable result
+        :return: the ETag of the result. It is returned even if the result could not be stored.
+        :rtype: str
+        """
+        body = serialize(value)
+        etag = compute_etag(body)
+        etag_key, body_key = self._keys(key)
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(body_key, body, ex=self.ttl)
+            pipe.set(etag_key, etag, ex=self.ttl)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot write "{key}" to the "{self.namespace}" cache: {e}')
+        return etag
+
+    def set_many(self, items):
+        """
+        Store several results in a single round trip.
+
+        :param iterable items: the results, as tuples containing their key and a JSON serializable value
+        :return: the number of results stored.
+        :rtype: int
+        """
+        count = 0
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items:
+                body = serialize(value)
+                etag_key, body_key = self._keys(key)
+                pipe.set(body_key, body, ex=self.ttl)
+                pipe.set(etag_key, compute_etag(body), ex=self.ttl)
+                count += 1
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot write {count} results to the "{self.namespace}" cache: {e}')
+            return 0
+        return count
+
+
+# Nearby places, identified by location.
+PLACES_CACHE = ResultCache('places', int(os.environ.get('RYR_API_CACHE_PLACES_TTL', 300)))
+
+# Place details, identified by place ID. The Google place ID alone identifies a place: the name and address of the
+# requests only help matching it in the other providers, so that the requests sending a slightly different name or
+# address for the same place share the cached details. The refreshes, the prefetches and the bulk imports rely on it.
+PLACE_DETAILS_CACHE = ResultCache('place', int(os.environ.get('RYR_API_CACHE_PLACE_DETAILS_TTL', 3600)))
@@ -0,0 +1,268 @@
+"""
+Define helpers to use the Celery results from asyncio code.
+
+The Redis result backend publishes every result it stores on a channel named after its key. Rather than polling the
+backend for each pending result, a single thread per process subscribes to the channels of the pending results on one
+pub/sub connection, and hands the results over to the coroutines waiting for them. Each channel is unsubscribed once
+nobody waits for its result anymore, so that the process only receives the results it waits for. The event loop never
+blocks, and each waiting request costs a single read of the backend, however long it waits.
+
+With the other result backends, the results are polled, from the default executor.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from celery import states
+from celery.backends.redis import RedisBackend
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+
+from api.forking import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Number of seconds to wait before listening again after losing the pub/sub connection.
+RECONNECT_DELAY = 1.0
+
+# Maximum number of seconds between 2 updates of the subscriptions, while listening.
+SUBSCRIBE_INTERVAL = 0.05
+
+
+def _decode(value):
+    """Decode a Redis key or channel."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ResultListener:
+    """
+    Define the listener of the results published by the Redis result backend.
+
+    :param backend: the Redis result backend
+    """
+
+    def __init__(self, backend):
+        """Initialize the listener."""
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._subscriptions = {}
+        self._changed = threading.Event()
+        self._thread = None
+
+    def channel(self, task_id):
+        """Return the channel on which the result of a task is published."""
+        return _decode(self.backend.get_key_for_task(task_id))
+
+    def start(self):
+        """Start listening in a background thread, if not done yet."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ryr-result-listener', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Listen to the results, reconnecting if the connection is lost."""
+        while True:
+            try:
+                self._listen(self.backend.client.pubsub())
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f'Lost the connection listening to the results: {e}')
+                time.sleep(RECONNECT_DELAY)
+
+    def _listen(self, pubsub):
+        """
+        Keep the subscriptions of a pub/sub connection up to date, and hand the results published over.
+
+        The pub/sub connection is not thread-safe: the coroutines only record the channels they wait on, and this thread
+        applies the subscriptions between 2 reads.
+        """
+        subscribed = set()
+        while True:
+            self._changed.clear()
+            with self._lock:
+                channels = set(self._subscriptions)
+            if channels - subscribed:
+                pubsub.subscribe(*(channels - subscribed))
+            if subscribed - channels:
+                pubsub.unsubscribe(*(subscribed - channels))
+            subscribed = channels
+
+            # Sleep until a result is waited for.
+            if not subscribed:
+                self._changed.wait()
+                continue
+
+            message = pubsub.get_message(timeout=SUBSCRIBE_INTERVAL)
+            if message is None:
+                continue
+            if message['type'] == 'message':
+                self._wake(_decode(message['channel']), message['data'])
+            elif message['type'] == 'subscribe':
+                # The results published before the subscription were missed: the waiters check the backend again.
+                self._wake(_decode(message['channel']), None)
+
+    def _subscribe(self, channel):
+        """Subscribe to a channel, unless another coroutine already did."""
+        with self._lock:
+            self._subscriptions[channel] = self._subscriptions.get(channel, 0) + 1
+        self._changed.set()
+
+    def _unsubscribe(self, channel):
+        """Unsubscribe from a channel, unless another coroutine still waits on it."""
+        with self._lock:
+            self._subscriptions[channel] -= 1
+            if not self._subscriptions[channel]:
+                del self._subscriptions[channel]
+        self._changed.set()
+
+    def _wake(self, channel, data):
+        """Hand a published result over to the coroutines waiting for it."""
+        with self._lock:
+            waiters = list(self._waiters.get(channel, ()))
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_set_result, future, data)
+
+    def _register(self, channel, loop):
+        """Register a coroutine waiting for a result, and return the future it waits on."""
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.setdefault(channel, set()).add((loop, future))
+        return future
+
+    def _unregister(self, channel, loop, future):
+        """Unregister a coroutine waiting for a result."""
+        with self._lock:
+            waiters = self._waiters.get(channel)
+            if waiters is not None:
+                waiters.discard((loop, future))
+                if not waiters:
+                    del self._waiters[channel]
+
+    async def wait(self, async_result, timeout=None):
+        """
+        Wait for a result.
+
+        :param AsyncResult async_result: the result to wait for
+        :param float timeout: maximum number of seconds to wait for. Waits forever if `None`.
+        :return: the value returned by the task.
+        :raises celery.exceptions.TimeoutError: if the result is not ready before the timeout
+        """
+        self.start()
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        channel = self.channel(async_result.id)
+        self._subscribe(channel)
+        try:
+            while True:
+                meta = await self._wait_once(async_result, channel, loop, deadline)
+                if meta is not None and meta['status'] in states.READY_STATES:
+                    return self.outcome(meta)
+        finally:
+            self._unsubscribe(channel)
+
+    async def _wait_once(self, async_result, channel, loop, deadline):
+        """Check the backend for a result, then wait for it to be published, or to be woken up."""
+        future = self._register(channel, loop)
+        try:
+            # The result may have been stored before the subscription, or while the listener was disconnected.
+            meta = await loop.run_in_executor(None, self.backend.get_task_meta, async_result.id)
+            if meta['status'] in states.READY_STATES:
+                return meta
+            remaining = deadline - loop.time() if deadline is not None else None
+            try:
+                data = await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                raise CeleryTimeoutError('The operation timed out.')
+            # The listener wakes the waiters up without any result when they must check the backend again.
+            return self.backend.decode_result(data) if data is not None else None
+        finally:
+            self._unregister(channel, loop, future)
+
+    def outcome(self, meta):
+        """
+        Return the value of a ready result, or raise its error.
+
+        :param dict meta: the metadata of the result
+        :return: the value returned by the task.
+        :raises Exception: the error raised by the task, if it failed
+        """
+        if meta['status'] in states.PROPAGATE_STATES:
+            raise self.backend.exception_to_python(meta['result'])
+        return meta['result']
+
+
+def _set_result(future, data):
+    """Resolve a future, unless it is already done."""
+    if not future.done():
+        future.set_result(data)
+
+
+# Listeners of the current process, by URL of the result backend.
+_listeners = {}
+
+
+def get_listener(backend):
+    """
+    Return the listener of a result backend.
+
+    :param backend: the result backend
+    :return: the listener, or `None` if the backend does not publish its results.
+    :rtype: ResultListener
+    """
+    if not isinstance(backend, RedisBackend):
+        return None
+    # Each thread has its own instance of the backend: they share a single listener.
+    listener = _listeners.get(backend.url)
+    if listener is None:
+        listener = _listeners.setdefault(backend.url, ResultListener(backend))
+    return listener
+
+
+@register_after_fork
+def reset_listeners():
+    """Drop the listeners inherited from the parent process, whose thread did not survive the fork."""
+    _listeners.clear()
+
+
+async def poll_result(async_result, timeout=None, interval=0.05, max_interval=0.5):
+    """
+    Wait for a Celery result by polling the result backend from the default executor.
+
+    :param AsyncResult async_result: the result to wait for
+    :param float timeout: maximum number of seconds to wait for. Waits forever if `None`.
+    :param float interval: initial delay between 2 polls, in seconds
+    :param float max_interval: maximum delay between 2 polls, in seconds
+    :return: the value returned by the task.
+    :raises celery.exceptions.TimeoutError: if the result is not ready before the timeout
+    """
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+
+    while not await loop.run_in_executor(None, async_result.ready):
+        if deadline is not None and loop.time() >= deadline:
+            raise CeleryTimeoutError('The operation timed out.')
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+    return await loop.run_in_executor(None, async_result.get)
+
+
+async def wait_for_result(async_result, timeout=None, interval=0.05, max_interval=0.5):
+    """
+    Wait for a Celery result without blocking the event loop.
+
+    The result is received from the pub/sub channel of the Redis result backend, or polled with an exponential backoff
+    with the other backends.
+
+    :param AsyncResult async_result: the result to wait for
+    :param float timeout: maximum number of seconds to wait for. Waits forever if `None`.
+    :param float interval: initial delay between 2 polls, in seconds
+    :param float max_interval: maximum delay between 2 polls, in seconds
+    :return: the value returned by the task.
+    :raises celery.exceptions.TimeoutError: if the result is not ready before the timeout
+    """
+    listener = get_listener(async_result.backend)
+    if listener is not None:
+        return await listener.wait(async_result, timeout)
+    return await poll_result(async_result, timeout, interval, max_interval)
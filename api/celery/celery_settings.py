@@ -4,11 +4,19 @@ import os
 from celery.utils.log import get_task_logger
 from json_tricks.nonp import dumps
 from json_tricks.nonp import loads
+from kombu import Queue
 from kombu.serialization import register
 
+from api.celery.lanes import INTERACTIVE
+from api.celery.lanes import LANES
+from api.celery.lanes import PREFETCH
+from api.collectors.base import CODEC
+from api.hot_places import REFRESH_INTERVAL
+
 logger = get_task_logger(__name__)
 
-# Register json-tricks as json encoder
+# Register json-tricks as json encoder. It is still accepted, so that the messages sent before the switch to the codec
+# of the collector data classes can be consumed.
 register(
     'json_tricks.nonp',
     lambda obj: dumps(obj, conv_str_byte=True),
@@ -17,23 +25,65 @@ register(
     content_encoding='utf-8',
 )
 
+# Register the codec of the collector data classes. It produces the same JSON shape as json-tricks, much faster.
+register(
+    'ryr.json',
+    CODEC.dumps,
+    CODEC.loads,
+    content_type='application/x-ryr-json',
+    content_encoding='utf-8',
+)
+
+# Serializer of the tasks and of the results. The processes running the previous release only accept json-tricks: the
+# codec must only be enabled once every worker and API process accepts it, i.e. by deploying this release with
+# `CELERY_SERIALIZER=json_tricks.nonp` first, then switching to `ryr.json`. It stays opt-in until the next release.
+serializer = os.environ.get('CELERY_SERIALIZER', 'json_tricks.nonp')
+
 # Global configuration.
-accept_content = ['application/x-json-tricks', 'application/json']
+accept_content = ['application/x-ryr-json', 'application/x-json-tricks', 'application/json']
 imports = ('api.celery.tasks', )
 timezone = 'America/Chicago'
 
 # Beat configuration.
 beat_max_loop_interval = 5
+beat_schedule = {
+    'refresh-hot-places': {
+        'task': 'api.celery.tasks.refresh_hot_places',
+        'schedule': REFRESH_INTERVAL,
+    },
+}
 
-# Broker configuration.
-broker_url = os.environ.get('CELERY_BROKER_URL', 'rpc://')
+# Broker configuration. The priorities of the lanes rely on the priority steps of the Redis transport: with another
+# broker, the queues must be declared with their own priority support (i.e. `x-max-priority` for RabbitMQ).
+broker_url = os.environ.get('CELERY_BROKER_URL', 'redis://')
+broker_transport_options = {
+    'priority_steps': list(range(10)),
+    'queue_order_strategy': 'priority',
+}
 
 # Result configuration.
 result_backend = os.environ.get('CELERY_RESULT_BACKEND', 'redis://')
-result_serializer = 'json_tricks.nonp'
+# The results are read right after being produced, they do not need to be kept for the default 24 hours. This also
+# bounds the lifetime of the chord counters.
+result_expires = int(os.environ.get('CELERY_RESULT_EXPIRES', 600))
+result_serializer = serializer
+
+# Routing configuration. The callers choose the lane of the collection tasks, the background tasks have their own.
+task_queues = [Queue(lane.queue) for lane in LANES.values()]
+task_default_queue = LANES[INTERACTIVE].queue
+task_routes = {
+    task: dict(queue=LANES[PREFETCH].queue)
+    for task in (
+        'api.celery.tasks.cache_place_details',
+        'api.celery.tasks.prefetch_place_details',
+        'api.celery.tasks.refresh_hot_places',
+        'api.celery.tasks.refresh_places_details',
+    )
+}
 
 # Task configuration.
-task_serializer = 'json_tricks.nonp'
+task_serializer = serializer
 
-# Worker condiguration.
-worker_concurrency = 1
+# Worker condiguration. The workers only reserve 1 task at a time, so that the priorities are respected.
+worker_concurrency = int(os.environ.get('CELERY_WORKER_CONCURRENCY', 1))
+worker_prefetch_multiplier = 1
@@ -0,0 +1,43 @@
+"""
+Define the lanes of the collection work.
+
+Each lane is consumed from its own queue, so that the bulk work never delays the interactive requests, and the workers
+consuming each queue can be scaled independently:
+
+* interactive: the collections a client is waiting for,
+* batch: the bulk collections, i.e. backfills,
+* prefetch: the background collections warming the caches.
+
+Within a queue, the messages are also prioritized. With the Redis broker, 0 is the highest priority and 9 the lowest.
+"""
+from collections import namedtuple
+import os
+
+# Names of the lanes.
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+PREFETCH = 'prefetch'
+
+Lane = namedtuple('Lane', ['queue', 'priority'])
+
+# Queues and priorities of the lanes.
+LANES = {
+    INTERACTIVE: Lane('interactive', int(os.environ.get('RYR_CELERY_INTERACTIVE_PRIORITY', 0))),
+    BATCH: Lane('batch', int(os.environ.get('RYR_CELERY_BATCH_PRIORITY', 5))),
+    PREFETCH: Lane('prefetch', int(os.environ.get('RYR_CELERY_PREFETCH_PRIORITY', 9))),
+}
+
+
+def lane_options(lane):
+    """
+    Compute the options sending a task to a lane.
+
+    :param str lane: the name of the lane
+    :return: the `queue` and `priority` options, to be used with `apply_async` or `Signature.set`.
+    :rtype: dict
+    """
+    try:
+        queue, priority = LANES[lane]
+    except KeyError:
+        raise ValueError(f'The "{lane}" lane does not exist.')
+    return {'queue': queue, 'priority': priority}
@@ -0,0 +1,75 @@
+"""
+Record the waiting and service times of the Celery tasks.
+
+The tasks are stamped with their publication time when they are sent, by the API or by the workers. When a worker runs
+a task, it records how long the task waited in its queue and how long it ran, in a single round trip to Redis once the
+task is done (see `api.metrics`).
+"""
+import time
+
+from celery.signals import before_task_publish
+from celery.signals import task_postrun
+from celery.signals import task_prerun
+
+from api.metrics import PUBLISHED_AT_HEADER
+from api.metrics import TASK_METRICS
+
+# Prefix of the names of the tasks collecting the details of a place from a provider.
+PROVIDER_TASK_PREFIX = 'api.celery.tasks.collect_place_details_from_'
+
+# Start of the tasks being run by this process, by task ID, along with their queue and waiting time.
+_running = {}
+
+
+def task_provider(task_name, args, kwargs):
+    """
+    Find the provider queried by a task.
+
+    :param str task_name: the name of the task
+    :param tuple args: the positional arguments of the task
+    :param dict kwargs: the keyword arguments of the task
+    :return: the provider, or an empty string if the task does not query a provider.
+    :rtype: str
+    """
+    if not task_name.startswith(PROVIDER_TASK_PREFIX):
+        return ''
+    provider = task_name[len(PROVIDER_TASK_PREFIX):]
+    if provider == 'provider':
+        return kwargs.get('provider') or (args[0] if args else '')
+    return provider
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):  # pylint: disable=unused-argument
+    """Stamp a task with its publication time."""
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def start_timer(task_id=None, task=None, **kwargs):  # pylint: disable=unused-argument
+    """Record the start of a task, and how long it waited in its queue."""
+    # The tasks run eagerly do not go through the queues nor the workers.
+    if task.request.is_eager:
+        return
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    delivery_info = task.request.delivery_info or {}
+    # The clocks of the publisher and the worker may differ slightly.
+    wait_time = max(time.time() - published_at, 0.0) if published_at else None
+    _running[task_id] = (time.perf_counter(), delivery_info.get('routing_key'), wait_time)
+
+
+@task_postrun.connect
+def record_task(task_id=None, task=None, args=None, kwargs=None, **extra):  # pylint: disable=unused-argument
+    """Record the waiting and service times of a task."""
+    started = _running.pop(task_id, None)
+    if started is None:
+        return
+    start, queue, wait_time = started
+    TASK_METRICS.record(
+        task.name,
+        task_provider(task.name, args or (), kwargs or {}),
+        time.perf_counter() - start,
+        queue,
+        wait_time,
+    )
@@ -1,12 +1,30 @@
 """Define the Celery tasks."""
+import dataclasses
 import os
 
 from celery import chord
 from celery.utils.log import get_task_logger
 
-from api.collectors.base import BusinessInfo
-from api.collectors.generic import CollectorClient
+from api.cache import PLACE_DETAILS_CACHE
+from api.celery.lanes import INTERACTIVE
+from api.celery.lanes import lane_options
+from api.celery.lanes import PREFETCH
 from api.celery.worker import app
+from api.collectors.base import BusinessInfo
+from api.collectors.pipeline import CollectionPipeline
+from api.collectors.pipeline import get_client
+from api.collectors.registry import DETAILS
+from api.collectors.registry import REGISTRY
+from api.hot_places import HOT_PLACES
+from api.hot_places import HOT_PLACES_COUNT
+from api.hot_places import REFRESH_AHEAD
+from api.hot_places import REFRESH_BATCH_SIZE
+from api.hot_places import REFRESH_INTERVAL
+from api.hot_places import REFRESH_QUOTA
+from api.place_index import PLACE_INDEX
+from api.prefetch import prefetch_candidates
+from api.prefetch import PREFETCH_RATE_LIMIT
+from api.store import PLACE_STORE
 
 logger = get_task_logger(__name__)
 
@@ -18,53 +36,204 @@ def add(x, y):
     return int(x + y)
 
 
+# The results of the collection tasks run in a chord header must be stored for the chord callback to receive them. They
+# expire after `result_expires`, or are removed along with the combined result once the API has read it.
+@app.task(ignore_result=False)
+def collect_place_details_from_provider(provider, name, address, place_id=None, latitude=None, longitude=None):
+    """
+    Collect business information from a provider.
+
+    If the Google `place_id` is provided, the cross-provider index is looked up first to avoid searching for the
+    business in the other providers. The matches found by a search are added to the index.
+    """
+    client = get_client(provider, os.environ[REGISTRY.load(provider).API_KEY_VARIABLE])
+    details = CollectionPipeline(client, PLACE_INDEX).run(place_id, name, address, latitude, longitude)
+    if not details:
+        raise ValueError(f'{provider} did not return any result.')
+    return details
+
+
 @app.task(ignore_result=False)
 def collect_place_details_from_google(place_id):
     """Collect business information from Google."""
-    # Prepare client.
-    client = CollectorClient('google', api_key=os.environ['RYR_COLLECTOR_GOOGLE_PLACES_API_KEY'])
-    client.authenticate()
-
-    # Retrieve detailed results.
-    details = client.get_place_details(place_id)
-    return details
+    return collect_place_details_from_provider('google', None, None, place_id)
 
 
 @app.task(ignore_result=False)
-def collect_place_details_from_yelp(name, address):
+def collect_place_details_from_yelp(name, address, place_id=None, latitude=None, longitude=None):
     """Collect business information from Yelp."""
-    # Prepare client.
-    client = CollectorClient('yelp', api_key=os.environ['RYR_COLLECTOR_YELP_API_KEY'])
-    client.authenticate()
+    return collect_place_details_from_provider('yelp', name, address, place_id, latitude, longitude)
 
-    # Retrieve detailed results.
-    client.search_places(address, terms=name, limit=1)
-    place_summary = client.retrieve_search_summary(0)
 
-    if not place_summary:
-        raise ValueError('Yelp did not return any result.')
+def collection_header(place_id, name, address, latitude=None, longitude=None, **options):
+    """
+    Create the tasks collecting the details of a place from every enabled provider.
 
-    # Extract the place_id.
-    details = client.get_place_details(place_summary.place_id)
-    return details
+    :param dict options: the options of the tasks, i.e. their queue
+    :return: the signatures of the tasks, ordered by provider priority.
+    :rtype: list(Signature)
+    """
+    return [
+        collect_place_details_from_provider.s(provider, name, address, place_id, latitude, longitude).set(**options)
+        for provider in REGISTRY.enabled(DETAILS)
+    ]
 
 
 @app.task(ignore_result=False)
-def combine_collector_results(collector_results):
-    """Combine the results provided by several collectors."""
+def combine_collector_results(collector_results, place_id=None):
+    """
+    Combine the results provided by several collectors.
+
+    If the `place_id` is provided, the combined result is written to the local place store.
+    """
     c = BusinessInfo()
     for collector_result in collector_results:
         c = c.merge(collector_result)
 
+    if place_id:
+        PLACE_STORE.put(place_id, c)
     return c
 
 
-def collect_place_details(place_id, name, address):
-    """Collect the details of a specific place from all the provider."""
-    callback = combine_collector_results.s()
-    header = [
-        collect_place_details_from_google.s(place_id),
-        collect_place_details_from_yelp.s(name, address),
+@app.task(ignore_result=True)
+def cache_place_details(collector_results, place_id):
+    """Combine the results provided by several collectors and store them in the place details cache."""
+    details = combine_collector_results(collector_results, place_id)
+    PLACE_DETAILS_CACHE.set(place_id, dataclasses.asdict(details))
+
+
+@app.task(ignore_result=True, rate_limit=PREFETCH_RATE_LIMIT)
+def prefetch_place_details(place_id, name, address, latitude=None, longitude=None):
+    """
+    Collect the details of a specific place in the background and cache them.
+
+    Nothing is done if the details are already cached. The providers are queried by this task itself, one after the
+    other, rather than by a chord: the rate limit of the task therefore bounds the requests sent to the providers.
+    """
+    if PLACE_DETAILS_CACHE.etag(place_id):
+        logger.info(f'Details of "{place_id}" are already cached.')
+        return
+
+    collector_results = [
+        collect_place_details_from_provider(provider, name, address, place_id, latitude, longitude)
+        for provider in REGISTRY.enabled(DETAILS)
     ]
-    result = chord(header)(callback)
-    return result.get()
+    cache_place_details(collector_results, place_id)
+
+
+@app.task(ignore_result=True)
+def refresh_hot_places():
+    """
+    Refresh the cached details of the hottest places before they expire.
+
+    At most `REFRESH_QUOTA` places are refreshed, the ones expiring first having the priority. They are refreshed by
+    batches of `REFRESH_BATCH_SIZE` places, spread evenly until the next run instead of being sent in a single burst.
+    """
+    HOT_PLACES.decay()
+    hottest = HOT_PLACES.hottest(HOT_PLACES_COUNT)
+    ttls = PLACE_DETAILS_CACHE.remaining_ttls([place_id for place_id, _ in hottest])
+    expiring = sorted(
+        ((ttl, request) for (_, request), ttl in zip(hottest, ttls) if ttl < REFRESH_AHEAD),
+        key=lambda item: item[0],
+    )[:REFRESH_QUOTA]
+
+    batches = [[request for _, request in expiring[i:i + REFRESH_BATCH_SIZE]]
+               for i in range(0, len(expiring), REFRESH_BATCH_SIZE)]
+    for i, batch in enumerate(batches):
+        refresh_places_details.apply_async(
+            args=(batch, ), countdown=i * REFRESH_INTERVAL / len(batches), **lane_options(PREFETCH))
+    logger.info(f'Refreshing {len(expiring)} of the {len(hottest)} hottest places in {len(batches)} batches.')
+
+
+@app.task(ignore_result=True)
+def refresh_places_details(places):
+    """
+    Collect the details of several places from all the providers, then cache them.
+
+    Each provider retrieves the places whose ID it knows with batched requests, i.e. a single GraphQL request for up
+    to 20 Yelp businesses (see `CollectionPipeline.run_many`). The places are cached with the details of the providers
+    which returned them.
+
+    :param list(dict) places: the requests needed to collect the places, as recorded by `HOT_PLACES`
+    """
+    collector_results = {place['place_id']: [] for place in places}
+    for provider in REGISTRY.enabled(DETAILS):
+        client = get_client(provider, os.environ[REGISTRY.load(provider).API_KEY_VARIABLE])
+        for place_id, details in CollectionPipeline(client, PLACE_INDEX).run_many(places).items():
+            collector_results[place_id].append(details)
+
+    for place_id, results in collector_results.items():
+        if results:
+            cache_place_details(results, place_id)
+
+
+def schedule_prefetch(search_results, top):
+    """
+    Schedule the prefetching of the details of the first results of a nearby search.
+
+    The places whose details are already cached are skipped. Failing to schedule the tasks is not fatal.
+
+    :param dict search_results: a nearby search response
+    :param int top: maximum number of places to prefetch
+    :return: the IDs of the places being prefetched.
+    :rtype: list(str)
+    """
+    candidates = prefetch_candidates(search_results, top)
+    missing = set(PLACE_DETAILS_CACHE.missing([candidate['place_id'] for candidate in candidates]))
+    scheduled = []
+    for candidate in candidates:
+        if candidate['place_id'] not in missing:
+            continue
+        try:
+            prefetch_place_details.apply_async(kwargs=candidate, **lane_options(PREFETCH))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f'Cannot schedule the prefetching of "{candidate["place_id"]}": {e}')
+            break
+        scheduled.append(candidate['place_id'])
+    return scheduled
+
+
+def dispatch_place_details(place_id, name, address, latitude=None, longitude=None, lane=INTERACTIVE):
+    """
+    Start collecting the details of a specific place from all the providers.
+
+    The coordinates of the place are optional, but help matching it in the other providers.
+
+    :param str lane: the lane of the collection tasks, i.e. `BATCH` for the bulk collections
+    :return: the result of the task combining the information of all the providers.
+    :rtype: AsyncResult
+    """
+    options = lane_options(lane)
+    callback = combine_collector_results.s(place_id).set(**options)
+    return chord(collection_header(place_id, name, address, latitude, longitude, **options))(callback)
+
+
+def collect_place_details(place_id, name, address, latitude=None, longitude=None, lane=INTERACTIVE, timeout=None):
+    """
+    Collect the details of a specific place from all the provider.
+
+    :param float timeout: maximum number of seconds to wait for the details. Waits forever if `None`.
+    :raises celery.exceptions.TimeoutError: if the details are not collected before the timeout
+    """
+    result = dispatch_place_details(place_id, name, address, latitude, longitude, lane)
+    try:
+        return result.get(timeout=timeout)
+    finally:
+        forget_result(result)
+
+
+def forget_result(async_result):
+    """
+    Remove a result from the result backend, along with the results of the chord header which produced it.
+
+    The results are only read once. Removing them right away frees the backend instead of waiting for them to expire.
+    Failing to remove a result is not fatal.
+
+    :param AsyncResult async_result: the result to remove
+    """
+    try:
+        async_result.backend.forget(async_result.id)
+        if async_result.parent is not None:
+            async_result.parent.forget()
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(f'Cannot forget the result "{async_result.id}": {e}')
@@ -2,8 +2,22 @@
 
 from celery import Celery
 
+from api.celery import metrics  # noqa: F401 pylint: disable=unused-import
+from api.forking import register_after_fork
+
 # Celery worker application.
 app = Celery()
 app.config_from_object('api.celery.celery_settings')
 # TODO(remyg): This does not seem to work.
 app.autodiscover_tasks(['api.celery'])
+
+
+@register_after_fork
+def reset_pools():
+    """
+    Drop the broker connections and producers inherited from the parent process.
+
+    They are lazily re-created on first use. The result backend relies on redis-py, which already detects forks.
+    """
+    # Celery only runs this cleanup for the processes forked by `multiprocessing`.
+    app._after_fork()  # pylint: disable=protected-access
@@ -1,9 +1,17 @@
 """Define the base classes/function for the collectors."""
 
 import abc
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import os
 
-import json_tricks as json
+from api.collectors.codec import Codec
+from api.collectors.normalization import normalize_address
+from api.collectors.normalization import normalize_name
+from api.collectors.registry import DETAILS
+
+# Maximum number of concurrent requests sent by a collector fetching several places.
+BATCH_CONCURRENCY = int(os.environ.get('RYR_COLLECTOR_BATCH_CONCURRENCY', 4))
 
 
 @dataclass
@@ -27,6 +35,14 @@ class BusinessInfo:
         """Compute the business geolocation."""
         return f'{self.latitude},{self.longitude}'
 
+    def normalized_name(self) -> str:
+        """Compute the normalized form of the business name."""
+        return normalize_name(self.name)
+
+    def normalized_address(self) -> str:
+        """Compute the normalized form of the business address."""
+        return normalize_address(self.address)
+
     def merge(self, other):
         """
         Merge 2 BusinessInfo object together.
@@ -63,14 +79,17 @@ class BusinessInfo:
 
         return merged
 
-    def to_json(self, indent=2):
+    def to_json(self, indent=2, compact=False):
         """
         Serialize this instance to JSON.
 
         :param int indent: Number of spaces to use to indent the JSON representation
+        :param bool compact: Remove all the whitespace from the JSON representation, ignoring `indent`
         :return: a string representing an instance of this object.
         """
-        return json.dumps(self, sort_keys=True, indent=indent)
+        if compact:
+            return CODEC.encode_compact(self).decode()
+        return CODEC.encode(self, indent=indent)
 
     @classmethod
     def from_json(cls, json_obj):
@@ -80,7 +99,7 @@ class BusinessInfo:
         :param string json_obj: a JSON string containing the value to create an instance of this object
         :return: a `BusinessInfo` instance.
         """
-        return json.loads(json_obj)
+        return CODEC.decode(json_obj)
 
 
 @dataclass
@@ -90,6 +109,43 @@ class PlaceSearchSummary:
     place_id: str = ''
     name: str = ''
     address: str = ''
+    latitude: float = 0.0
+    longitude: float = 0.0
+    provider: str = ''
+
+    def normalized_name(self) -> str:
+        """Compute the normalized form of the place name."""
+        return normalize_name(self.name)
+
+    def normalized_address(self) -> str:
+        """Compute the normalized form of the place address."""
+        return normalize_address(self.address)
+
+    def to_json(self, indent=2, compact=False):
+        """
+        Serialize this instance to JSON.
+
+        :param int indent: Number of spaces to use to indent the JSON representation
+        :param bool compact: Remove all the whitespace from the JSON representation, ignoring `indent`
+        :return: a string representing an instance of this object.
+        """
+        if compact:
+            return CODEC.encode_compact(self).decode()
+        return CODEC.encode(self, indent=indent)
+
+    @classmethod
+    def from_json(cls, json_obj):
+        """
+        Create an instance of this object from a JSON string.
+
+        :param string json_obj: a JSON string containing the value to create an instance of this object
+        :return: a `PlaceSearchSummary` instance.
+        """
+        return CODEC.decode(json_obj)
+
+
+# Codec of the collector data classes.
+CODEC = Codec([BusinessInfo, PlaceSearchSummary])
 
 
 class AbstractCollector:
@@ -97,6 +153,15 @@ class AbstractCollector:
 
     __metaclass__ = abc.ABCMeta
 
+    # Name of the provider.
+    PROVIDER = ''
+
+    # Environment variable containing the API key of the provider.
+    API_KEY_VARIABLE = ''
+
+    # Capabilities of the collector (see the `registry` module).
+    CAPABILITIES = frozenset([DETAILS])
+
     def __init__(self):
         """Initialize the collector."""
         self.search_results = None
@@ -112,12 +177,46 @@ class AbstractCollector:
         """
         raise NotImplementedError
 
-    @abc.abstractmethod
-    def get_place_details(self, place_id):
+    def get_place_details(self, place_id, fields=None):
         """
         Retrieve the details of a specific place.
 
+        This function returns the raw result and caches it in the `self.result` property.
+
         :param str place_id: the ID of a place
+        :param list(str) fields: the fields to retrieve, if the provider supports it. Defaults to the fields needed to
+            create a `BusinessInfo`.
+        :return: a dictionary containing the place information.
+        :rtype: dict
+        """
+        self.result = self.fetch_place_details(place_id, fields)
+        return self.result
+
+    def get_places_details(self, place_ids, fields=None):
+        """
+        Retrieve the details of several places.
+
+        By default, the places are fetched one by one, with at most `BATCH_CONCURRENCY` concurrent requests. The
+        collectors able to fetch several places per request override this function.
+
+        :param list(str) place_ids: the IDs of the places
+        :param list(str) fields: the fields to retrieve, if the provider supports it
+        :return: the raw details of each place, by place ID.
+        :rtype: dict
+        """
+        if not place_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, len(place_ids))) as executor:
+            results = executor.map(lambda place_id: self.fetch_place_details(place_id, fields), place_ids)
+            return dict(zip(place_ids, results))
+
+    @abc.abstractmethod
+    def fetch_place_details(self, place_id, fields=None):
+        """
+        Fetch the details of a specific place, without caching them.
+
+        :param str place_id: the ID of a place
+        :param list(str) fields: the fields to retrieve, if the provider supports it
         :return: a dictionary containing the place information.
         :rtype: dict
         """
@@ -149,6 +248,27 @@ class AbstractCollector:
         raise NotImplementedError
 
     @abc.abstractmethod
+    def retrieve_search_summaries(self):
+        """
+        Retrieve the search information of all the places found by the last search.
+
+        :return: the summary information of the places, in the order of the results.
+        :rtype: list(PlaceSearchSummary)
+        """
+        raise NotImplementedError
+
+    def release(self):
+        """
+        Drop the raw payloads held by the collector.
+
+        :return: the raw payloads which were held, by kind of request ("search" or "details").
+        :rtype: dict
+        """
+        payloads = {'search': self.search_results, 'details': self.result}
+        self.search_results = None
+        self.result = None
+        return {kind: payload for kind, payload in payloads.items() if payload is not None}
+
     def to_business_info(self):
         """
         Convert the raw data to a BusinessInfo object.
@@ -156,6 +276,17 @@ class AbstractCollector:
         :return: A BusinessInfo object representing this instance.
         :rtype: BusinessInfo object
         """
+        return self.convert(self.result)
+
+    @abc.abstractmethod
+    def convert(self, result):
+        """
+        Convert the raw details of a place to a BusinessInfo object.
+
+        :param dict result: the raw details of a place
+        :return: A BusinessInfo object, or `None` if there is nothing to convert.
+        :rtype: BusinessInfo object
+        """
         raise NotImplementedError
 
 
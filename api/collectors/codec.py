@@ -0,0 +1,161 @@
+"""
+Define the JSON codec of the collector data classes.
+
+The data classes used to be serialized with `json_tricks`, which inspects every object and resolves the classes by
+importing their module while decoding. This codec only knows the registered classes and their fields, and produces the
+same JSON shape::
+
+    {"__instance_type__": ["api.collectors.base", "BusinessInfo"], "attributes": {...}}
+
+The attributes are sorted by name. The documents do not carry a version: the shape above is version 1. The following
+versions will add a `"__version__"` key to the envelope, so that the decoder can tell them apart.
+
+The codec of the `BusinessInfo` and `PlaceSearchSummary` classes is defined in the `base` module.
+"""
+import dataclasses
+import json
+
+import orjson
+
+# Version of the documents produced by the encoder.
+CODEC_VERSION = 1
+
+# Keys of the envelope.
+TYPE_KEY = '__instance_type__'
+ATTRIBUTES_KEY = 'attributes'
+VERSION_KEY = '__version__'
+
+
+class Codec:
+    """
+    Define the codec of the registered data classes.
+
+    :param list(type) classes: the data classes the codec can encode and decode
+    """
+
+    def __init__(self, classes):
+        """Initialize the codec."""
+        self.types = {}
+        self.classes = {}
+        self.fields = {}
+        for cls in classes:
+            self.register(cls)
+
+    def register(self, cls):
+        """
+        Register a data class.
+
+        :param type cls: the data class
+        """
+        instance_type = (cls.__module__, cls.__name__)
+        self.types[cls] = list(instance_type)
+        self.classes[instance_type] = cls
+        self.fields[cls] = tuple(sorted(field.name for field in dataclasses.fields(cls)))
+
+    def envelope(self, obj):
+        """
+        Create the envelope of an object.
+
+        :param obj: an instance of a registered class
+        :return: the envelope, containing the type and the sorted attributes of the object.
+        :rtype: dict
+        :raises TypeError: if the class of the object is not registered
+        """
+        cls = type(obj)
+        if cls not in self.types:
+            raise TypeError(f'{cls.__name__} is not registered.')
+        attributes = obj.__dict__
+        return {TYPE_KEY: self.types[cls], ATTRIBUTES_KEY: {name: attributes[name] for name in self.fields[cls]}}
+
+    def encode(self, obj, indent=None):
+        """
+        Encode an object, in the format of `json_tricks`.
+
+        :param obj: an instance of a registered class
+        :param int indent: number of spaces to indent the JSON representation with. It is not indented if `None`.
+        :return: the JSON representation of the object.
+        :rtype: str
+        """
+        return json.dumps(self.envelope(obj), indent=indent)
+
+    def encode_compact(self, obj):
+        """
+        Encode an object, without any whitespace.
+
+        :param obj: an instance of a registered class
+        :return: the compact JSON representation of the object.
+        :rtype: bytes
+        """
+        return orjson.dumps(self.envelope(obj))
+
+    def object_hook(self, value):
+        """
+        Convert a decoded envelope back to an object.
+
+        The values which are not envelopes are returned as is. It can be used as the `object_hook` of `json.loads`.
+
+        :param dict value: a decoded JSON object
+        :return: the object.
+        :raises ValueError: if the envelope has an unknown type or version
+        """
+        instance_type = value.get(TYPE_KEY)
+        if instance_type is None:
+            return value
+        version = value.get(VERSION_KEY, 1)
+        if version > CODEC_VERSION:
+            raise ValueError(f'Unsupported codec version {version}.')
+        cls = self.classes.get(tuple(instance_type))
+        if cls is None:
+            raise ValueError(f'Unknown type {".".join(instance_type)}.')
+        attributes = value[ATTRIBUTES_KEY]
+        return cls(**{name: attributes[name] for name in self.fields[cls] if name in attributes})
+
+    def decode(self, data):
+        """
+        Decode an object.
+
+        :param data: the JSON representation of the object
+        :type data: str or bytes
+        :return: the object.
+        :raises ValueError: if the representation is not valid
+        """
+        return self.object_hook(orjson.loads(data))
+
+    def default(self, obj):
+        """
+        Encode the registered objects nested in another value.
+
+        It can be used as the `default` function of `orjson.dumps`, along with `orjson.OPT_PASSTHROUGH_DATACLASS`.
+
+        :param obj: an instance of a registered class
+        :return: the envelope of the object.
+        :rtype: dict
+        :raises TypeError: if the class of the object is not registered
+        """
+        return self.envelope(obj)
+
+    def dumps(self, value):
+        """
+        Encode any JSON value, containing registered objects or not.
+
+        :param value: the value to encode
+        :return: the compact JSON representation of the value.
+        :rtype: bytes
+        """
+        return orjson.dumps(
+            value,
+            default=self.default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS,
+        )
+
+    def loads(self, data):
+        """
+        Decode any JSON value, containing registered objects or not.
+
+        :param data: the JSON representation of the value
+        :type data: str or bytes
+        :return: the value.
+        """
+        if isinstance(data, bytes):
+            data = data.decode()
+        return json.loads(data, object_hook=self.object_hook)
@@ -0,0 +1,19 @@
+"""
+Define the decoding of the provider responses.
+
+The provider responses are decoded with orjson, straight from the raw bytes of the body. `requests` decodes the body to
+a `str` first, then parses it with the standard library, which keeps 2 copies of the body in memory and is several
+times slower on the large search pages.
+"""
+import orjson
+
+
+def decode_response(response):
+    """
+    Decode the JSON body of a response.
+
+    :param requests.Response response: the response to decode
+    :return: the decoded body.
+    :raises ValueError: if the body is not valid JSON
+    """
+    return orjson.loads(response.content)
@@ -0,0 +1,98 @@
+"""
+Define the de-duplication of the places reported by several providers.
+
+The same business is usually reported by every provider, with slightly different coordinates and names. Two places are
+considered identical if they are close to each other and if their names are similar.
+
+Comparing every pair of places does not scale with providers returning hundreds of results. Instead, the places are
+hashed into a grid whose cells are as large as the maximum distance between duplicates: the duplicates of a place can
+only be located in its own cell or in one of the 8 surrounding cells.
+"""
+import math
+import os
+
+from api.collectors.matching import EARTH_RADIUS
+from api.collectors.matching import has_coordinates
+from api.collectors.matching import haversine
+from api.collectors.matching import trigram_similarity
+
+# Maximum distance, in meters, between 2 duplicates.
+DEDUP_RADIUS = float(os.environ.get('RYR_COLLECTOR_DEDUP_RADIUS', 50.0))
+
+# Minimum name similarity, between 0 and 1, of 2 duplicates.
+DEDUP_NAME_THRESHOLD = float(os.environ.get('RYR_COLLECTOR_DEDUP_NAME_THRESHOLD', 0.5))
+
+# Length, in meters, of a degree of latitude.
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+class SpatialGrid:
+    """
+    Define a grid bucketing places by their coordinates.
+
+    The width of the cells is computed at a reference latitude, which is accurate enough for the radius of a nearby
+    search.
+
+    :param float radius: size of the cells, in meters
+    :param float latitude: reference latitude
+    """
+
+    def __init__(self, radius, latitude=0.0):
+        """Initialize the grid."""
+        self.latitude_step = radius / METERS_PER_DEGREE
+        self.longitude_step = self.latitude_step / max(math.cos(math.radians(latitude)), 1e-6)
+        self.cells = {}
+
+    def cell(self, latitude, longitude):
+        """Compute the cell containing a point."""
+        return math.floor(latitude / self.latitude_step), math.floor(longitude / self.longitude_step)
+
+    def add(self, latitude, longitude, item):
+        """Add an item located at a point."""
+        self.cells.setdefault(self.cell(latitude, longitude), []).append(item)
+
+    def neighbors(self, latitude, longitude):
+        """Yield the items located in the cell containing a point, or in the surrounding cells."""
+        row, column = self.cell(latitude, longitude)
+        for i in (row - 1, row, row + 1):
+            for j in (column - 1, column, column + 1):
+                yield from self.cells.get((i, j), ())
+
+
+def deduplicate(summaries, radius=DEDUP_RADIUS, threshold=DEDUP_NAME_THRESHOLD):
+    """
+    Collapse the duplicated places.
+
+    The first occurrence of a place is kept, the following ones are attached to it as duplicates. The places without
+    coordinates are never considered as duplicates.
+
+    :param list(PlaceSearchSummary) summaries: the places, ordered by priority
+    :param float radius: maximum distance, in meters, between 2 duplicates
+    :param float threshold: minimum name similarity, between 0 and 1, of 2 duplicates
+    :return: a list of tuples containing each distinct place and the list of its duplicates.
+    :rtype: list(tuple(PlaceSearchSummary, list(PlaceSearchSummary)))
+    """
+    located = [s for s in summaries if has_coordinates(s.latitude, s.longitude)]
+    grid = SpatialGrid(radius, located[0].latitude if located else 0.0)
+    groups = []
+    for summary in summaries:
+        group = (summary, [])
+        if not has_coordinates(summary.latitude, summary.longitude):
+            groups.append(group)
+            continue
+
+        # Look for an existing place in the neighbor cells.
+        name = summary.normalized_name()
+        for kept, duplicates in grid.neighbors(summary.latitude, summary.longitude):
+            if kept.provider == summary.provider and summary.provider:
+                continue
+            if haversine(kept.latitude, kept.longitude, summary.latitude, summary.longitude) > radius:
+                continue
+            if trigram_similarity(kept.normalized_name(), name) < threshold:
+                continue
+            duplicates.append(summary)
+            break
+        else:
+            grid.add(summary.latitude, summary.longitude, group)
+            groups.append(group)
+    return groups
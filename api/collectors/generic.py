@@ -1,7 +1,12 @@
 """Defines a generic client for the collectors."""
+import os
 
-from api.collectors.google import GoogleCollector
-from api.collectors.yelp import YelpCollector
+from api.collectors.matching import best_match
+from api.collectors.registry import NEARBY_SEARCH
+from api.collectors.registry import REGISTRY
+
+# Number of search results to score when looking for a specific place.
+MATCH_PAGE_SIZE = int(os.environ.get('RYR_COLLECTOR_MATCH_PAGE_SIZE', 10))
 
 
 class CollectorClient:
@@ -10,7 +15,7 @@ class CollectorClient:
 
     :param str provider: name of the provider to use
 
-        The following providers are supported:
+        The providers are the collectors of the registry, i.e.:
             * yelp
             * google
 
@@ -40,15 +45,9 @@ class CollectorClient:
 
     def authenticate(self):
         """Authenticate."""
-        # Create collector.
-        if self.provider.lower() == 'yelp':
-            self.collector = YelpCollector()
-            self.collector.authenticate(self.api_key)
-        elif self.provider.lower() == 'google':
-            self.collector = GoogleCollector()
-            self.collector.authenticate(self.api_key)
-        else:
-            raise ValueError(f'The "{self.provider}" provider is not supported.')
+        # Create collector. The provider SDKs are only imported once a collector is actually needed.
+        self.collector = REGISTRY.load(self.provider.lower())()
+        self.collector.authenticate(self.api_key)
 
         self.collector.weight = self.weight
 
@@ -60,10 +59,31 @@ class CollectorClient:
         :returns: A dictionnary containing the detailed information of the place matching the `place_id`.
         :rtype: dict
         """
-        self.collector.get_place_details(place_id)
+        self.fetch_place_details(place_id)
         b = self.collector.to_business_info()
         return b
 
+    def fetch_place_details(self, place_id):
+        """
+        Retrieve the raw details of a place, without converting them.
+
+        :param str place_id: the ID of a place
+        :returns: A dictionnary containing the raw details of the place, as returned by the provider.
+        :rtype: dict
+        """
+        return self.collector.get_place_details(place_id)
+
+    def get_places_details(self, place_ids):
+        """
+        Retrieve the details of several places, using as few requests as the provider allows.
+
+        :param list(str) place_ids: the IDs of the places
+        :returns: the business information of each place found, by place ID.
+        :rtype: dict
+        """
+        results = self.collector.get_places_details(place_ids)
+        return {place_id: self.collector.convert(result) for place_id, result in results.items()}
+
     def retrieve_search_summary(self, index=0):
         """
         Retrieve the search information (ID, name and address) of a specific place.
@@ -74,6 +94,15 @@ class CollectorClient:
         """
         return self.collector.retrieve_search_summary(index)
 
+    def retrieve_search_summaries(self):
+        """
+        Retrieve the search information of all the places found.
+
+        :return: the summary information of the places, in the order of the results.
+        :rtype: list(PlaceSearchSummary)
+        """
+        return self.collector.retrieve_search_summaries()
+
     def search_places(self, address, terms=None, **kwargs):
         """
         Search for a business based on the provided search criteria.
@@ -87,25 +116,70 @@ class CollectorClient:
         """
         return self.collector.search_places(address, terms=terms, **kwargs)
 
-    def lookup_place(self, place_id=None, name=None, address=None):
+    def release(self):
+        """
+        Drop the raw payloads held by the collector.
+
+        :return: the raw payloads which were held, by kind of request ("search" or "details").
+        :rtype: dict
+        """
+        return self.collector.release()
+
+    def supports_nearby_search(self):
+        """Check whether the collector can search the places near a location."""
+        return NEARBY_SEARCH in self.collector.CAPABILITIES
+
+    def search_places_nearby(self, location, **kwargs):
+        """
+        Search places near a specific location.
+
+        The kwargs arguments are specific to the implementation of the collector.
+
+        :param str location: the latitude/longitude around which to search, i.e. "30.31,-97.72"
+        :return: A dict representing the places found.
+        :rtype: dict
+        """
+        return self.collector.search_places_nearby(location, **kwargs)
+
+    def match_place(self, name, address, latitude=None, longitude=None):
+        """
+        Search for a place and select the result matching it the best.
+
+        A single page of results is retrieved and every result is scored against the provided information.
+
+        :param str name: name of the place
+        :param str address: adress of the place
+        :param float latitude: latitude of the place, if known
+        :param float longitude: longitude of the place, if known
+        :return: a tuple containing the best result and its score, between 0 and 1, or `(None, 0.0)` if the search did
+            not return any result.
+        :rtype: tuple(PlaceSearchSummary, float)
+        """
+        self.search_places(
+            address=address,
+            terms=name,
+            limit=MATCH_PAGE_SIZE,
+        )
+        return best_match(self.retrieve_search_summaries(), name, address, latitude, longitude)
+
+    def lookup_place(self, place_id=None, name=None, address=None, latitude=None, longitude=None):
         """
         Look up for a place.
 
         :param str place_id: ID of the place to look for. Dependent of the collector used to perform the lookup.
         :param str name: name of the place
         :param str address: adress of the place
+        :param float latitude: latitude of the place, if known, to refine the search
+        :param float longitude: longitude of the place, if known, to refine the search
         :return: A dictionary containing the business information.
         :rtype: dict
         """
         if not place_id:
             if not (name and address):
                 raise ValueError('A name and a address must be provided.')
-            self.search_places(
-                address=address,
-                terms=name,
-                limit=1,
-            )
-            search_summary = self.retrieve_search_summary(0)
+            search_summary, _ = self.match_place(name, address, latitude, longitude)
+            if not search_summary:
+                raise ValueError('The search did not return any result.')
             lookup_id = search_summary.place_id
         else:
             lookup_id = place_id
@@ -1,15 +1,63 @@
 """Define the Google Collector."""
 
 import googlemaps
+import requests
 
 from api.collectors.base import AbstractClientCollector
 from api.collectors.base import BusinessInfo
 from api.collectors.base import PlaceSearchSummary
+from api.collectors.decoding import decode_response
+from api.collectors.registry import DETAILS
+from api.collectors.registry import NEARBY_SEARCH
+
+
+class OrjsonResponse(requests.Response):
+    """Define a response whose JSON body is decoded with orjson."""
+
+    def json(self, **kwargs):
+        """Decode the JSON body of the response."""
+        return decode_response(self)
+
+
+def decode_with_orjson(response, *args, **kwargs):
+    """
+    Make the JSON body of a response decoded with orjson.
+
+    This is a response hook of `requests`: the Google Maps client checks the status of the responses, then returns
+    their body, using `response.json()`.
+
+    :param requests.Response response: the response received
+    :return: the same response, decoding its body with orjson.
+    :rtype: OrjsonResponse
+    """
+    decoded = OrjsonResponse()
+    decoded.__dict__.update(response.__dict__)
+    return decoded
+
+
+def create_client(api_key):
+    """
+    Create a Google Maps client decoding the responses with orjson.
+
+    :param str api_key: Google Maps API key
+    :rtype: googlemaps.Client
+    """
+    return googlemaps.Client(key=api_key, requests_kwargs={'hooks': {'response': decode_with_orjson}})
 
 
 class GoogleCollector(AbstractClientCollector):
     """Define the Google Collector."""
 
+    PROVIDER = 'google'
+    API_KEY_VARIABLE = 'RYR_COLLECTOR_GOOGLE_PLACES_API_KEY'
+    CAPABILITIES = frozenset([DETAILS, NEARBY_SEARCH])
+
+    # Fields of the place details needed to create a BusinessInfo.
+    BUSINESS_INFO_FIELDS = ['formatted_address', 'formatted_phone_number', 'geometry', 'name', 'website']
+
+    # Fields of the search candidates needed to create a PlaceSearchSummary.
+    SEARCH_SUMMARY_FIELDS = ['formatted_address', 'geometry', 'name', 'place_id']
+
     def __init__(self):
         """Initialize the collector."""
         super(GoogleCollector, self).__init__()
@@ -19,18 +67,20 @@ class GoogleCollector(AbstractClientCollector):
 
     def authenticate(self, api_key):
         """Authenticate against Google."""
-        self.gmaps = googlemaps.Client(key=api_key)
+        self.gmaps = create_client(api_key)
 
-    def get_place_details(self, place_id):
+    def fetch_place_details(self, place_id, fields=None):
         """
-        Retrieve the details of a specific place.
+        Fetch the details of a specific place, without caching them.
+
+        Google bills and returns the requested fields only.
 
         :param str place_id: the ID of a place
+        :param list(str) fields: the fields to retrieve. Defaults to the fields needed to create a `BusinessInfo`.
         :return: a dictionary containing the place information.
         :rtype: dict
         """
-        self.result = self.gmaps.place(place_id)
-        return self.result
+        return self.gmaps.place(place_id, fields=fields or GoogleCollector.BUSINESS_INFO_FIELDS)
 
     def search_places(self, address, terms=None, **kwargs):
         """
@@ -43,7 +93,11 @@ class GoogleCollector(AbstractClientCollector):
         :return: A dict representing the places matching the search criteria.
         :rtype: dict
         """
-        self.search_results = self.gmaps.find_place(f'{address} {terms}', 'textquery')
+        self.search_results = self.gmaps.find_place(
+            f'{address} {terms}',
+            'textquery',
+            fields=GoogleCollector.SEARCH_SUMMARY_FIELDS,
+        )
         return self.search_results
 
     def search_places_nearby(self, location, **kwargs):
@@ -53,20 +107,20 @@ class GoogleCollector(AbstractClientCollector):
         :param str location: The latitude/longitude value for which you wish to obtain the
             closest, human-readable address. Can be a string, dict, list, or tuple.
         """
-        radius = kwargs.get('radius', 250)
+        radius = kwargs.pop('radius', 250)
         self.search_results = self.gmaps.places_nearby(location=location, radius=radius, **kwargs)
         return self.search_results
 
-    def to_business_info(self):
-        """Convert the raw data to a BusinessInfo object."""
+    def convert(self, result):
+        """Convert the raw details of a place to a BusinessInfo object."""
         # Ensure we have data to convert.
-        if not self.result:
+        if not result:
             return None
-        if not self.result.get('result'):
+        if not result.get('result'):
             return None
 
         # Define convenience variables.
-        r = self.result.get('result')
+        r = result.get('result')
         location = r.get('geometry', {}).get('location', {})
 
         # Populate the business information.
@@ -87,15 +141,37 @@ class GoogleCollector(AbstractClientCollector):
         :return: the summary information of a specific place.
         :rtype: PlaceSearchSummary
         """
-        if not self.search_results:
+        businesses = self._search_businesses()
+        if not businesses:
             return None
-        if not self.search_results.get('results'):
-            return None
-        search_summary = PlaceSearchSummary()
-        business = self.search_results.get('results')[index]
+        return self._to_search_summary(businesses[index])
+
+    def retrieve_search_summaries(self):
+        """
+        Retrieve the search information of all the places found.
+
+        :return: the summary information of the places, in the order of the results.
+        :rtype: list(PlaceSearchSummary)
+        """
+        return [self._to_search_summary(business) for business in self._search_businesses()]
+
+    def _search_businesses(self):
+        """Return the places found by the last search: the candidates of a text search, or the nearby places."""
+        if not self.search_results:
+            return []
+        return self.search_results.get('candidates') or self.search_results.get('results') or []
+
+    @staticmethod
+    def _to_search_summary(business):
+        """Convert a search result to a PlaceSearchSummary."""
+        search_summary = PlaceSearchSummary(provider=GoogleCollector.PROVIDER)
+        location = business.get('geometry', {}).get('location', {})
 
         search_summary.place_id = business.get('place_id', '')
         search_summary.name = business.get('name', '')
-        search_summary.address = business.get('vicinity', '')
+        # The text search returns the full address, the nearby search a simplified one.
+        search_summary.address = business.get('formatted_address', business.get('vicinity', ''))
+        search_summary.latitude = location.get('lat', 0.0)
+        search_summary.longitude = location.get('lng', 0.0)
 
         return search_summary
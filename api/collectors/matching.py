@@ -0,0 +1,129 @@
+"""
+Define the engine matching the search results of a provider against a requested place.
+
+The providers return their search results ordered by their own relevance criteria, which do not necessarily put the
+requested business first. Each candidate is therefore scored against the requested name, address and coordinates:
+
+* the names and addresses are compared using the trigram similarity of their normalized forms (see the
+  `normalization` module),
+* the coordinates are compared using the haversine distance.
+
+The best candidate of a single page of results is selected, instead of re-querying the provider.
+"""
+import math
+
+from api.collectors.normalization import normalize_address
+from api.collectors.normalization import normalize_name
+from api.collectors.normalization import trigrams
+
+# Mean radius of the Earth, in meters.
+EARTH_RADIUS = 6371008.8
+
+# Distance, in meters, beyond which 2 places are considered unrelated.
+MAX_DISTANCE = 500.0
+
+# Weights of the components of the score.
+NAME_WEIGHT = 0.5
+ADDRESS_WEIGHT = 0.3
+DISTANCE_WEIGHT = 0.2
+
+
+def trigram_similarity(a, b):
+    """
+    Compute the trigram similarity of 2 normalized texts.
+
+    :param str a: the first normalized text
+    :param str b: the second normalized text
+    :return: the Jaccard index of the trigrams of the texts, between 0 and 1.
+    :rtype: float
+    """
+    grams_a = trigrams(a)
+    grams_b = trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def name_similarity(a, b):
+    """Compute the similarity of 2 business names, between 0 and 1."""
+    return trigram_similarity(normalize_name(a), normalize_name(b))
+
+
+def address_similarity(a, b):
+    """Compute the similarity of 2 addresses, between 0 and 1."""
+    return trigram_similarity(normalize_address(a), normalize_address(b))
+
+
+def haversine(latitude1, longitude1, latitude2, longitude2):
+    """
+    Compute the great-circle distance between 2 points.
+
+    :return: the distance in meters.
+    :rtype: float
+    """
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    delta_phi = math.radians(latitude2 - latitude1)
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(delta_phi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2)**2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def has_coordinates(latitude, longitude):
+    """Check whether coordinates are known, (0, 0) being the default value."""
+    return latitude is not None and longitude is not None and (latitude, longitude) != (0.0, 0.0)
+
+
+def score_candidate(candidate, name=None, address=None, latitude=None, longitude=None):
+    """
+    Score a candidate against the requested place.
+
+    Only the components known for both the candidate and the requested place are taken into account.
+
+    :param PlaceSearchSummary candidate: the candidate
+    :param str name: the requested name
+    :param str address: the requested address
+    :param float latitude: the requested latitude
+    :param float longitude: the requested longitude
+    :return: the score, between 0 and 1.
+    :rtype: float
+    """
+    score = 0.0
+    total_weight = 0.0
+
+    if name and candidate.name:
+        score += NAME_WEIGHT * trigram_similarity(normalize_name(name), candidate.normalized_name())
+        total_weight += NAME_WEIGHT
+
+    if address and candidate.address:
+        score += ADDRESS_WEIGHT * trigram_similarity(normalize_address(address), candidate.normalized_address())
+        total_weight += ADDRESS_WEIGHT
+
+    if has_coordinates(latitude, longitude) and has_coordinates(candidate.latitude, candidate.longitude):
+        distance = haversine(latitude, longitude, candidate.latitude, candidate.longitude)
+        score += DISTANCE_WEIGHT * max(0.0, 1.0 - distance / MAX_DISTANCE)
+        total_weight += DISTANCE_WEIGHT
+
+    return score / total_weight if total_weight else 0.0
+
+
+def best_match(candidates, name=None, address=None, latitude=None, longitude=None):
+    """
+    Select the candidate matching the requested place the best.
+
+    In case of a tie, the candidate ranked first by the provider wins.
+
+    :param list(PlaceSearchSummary) candidates: the candidates
+    :param str name: the requested name
+    :param str address: the requested address
+    :param float latitude: the requested latitude
+    :param float longitude: the requested longitude
+    :return: a tuple containing the best candidate and its score, or `(None, 0.0)` if there is no candidate.
+    :rtype: tuple(PlaceSearchSummary, float)
+    """
+    best, best_score = None, 0.0
+    for candidate in candidates:
+        score = score_candidate(candidate, name, address, latitude, longitude)
+        if best is None or score > best_score:
+            best, best_score = candidate, score
+    return best, best_score
@@ -0,0 +1,86 @@
+"""
+Define the search of the places nearby a location across all the providers.
+
+Every provider supporting the nearby search is queried concurrently, then their results are merged into a single list,
+collapsing the businesses reported by several providers.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+import logging
+import os
+
+from api.collectors.dedup import deduplicate
+from api.collectors.generic import CollectorClient
+from api.collectors.registry import NEARBY_SEARCH
+from api.collectors.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Radius of the search, in meters.
+NEARBY_RADIUS = int(os.environ.get('RYR_COLLECTOR_NEARBY_RADIUS', 250))
+
+
+def nearby_clients():
+    """
+    Create the clients of the enabled providers supporting the nearby search.
+
+    The providers without API key are ignored.
+
+    :return: the authenticated clients, ordered by priority.
+    :rtype: list(CollectorClient)
+    """
+    clients = []
+    for provider in REGISTRY.enabled(NEARBY_SEARCH):
+        api_key = os.environ.get(REGISTRY.load(provider).API_KEY_VARIABLE)
+        if not api_key:
+            continue
+        client = CollectorClient(provider, api_key=api_key)
+        client.authenticate()
+        clients.append(client)
+    return clients
+
+
+def _search(client, location, radius):
+    """Search the places nearby a location using a specific client."""
+    client.search_places_nearby(location, radius=radius)
+    return client.retrieve_search_summaries()
+
+
+def to_result(place, duplicates):
+    """
+    Convert a distinct place and its duplicates to a search result.
+
+    :param PlaceSearchSummary place: the distinct place
+    :param list(PlaceSearchSummary) duplicates: the same place, as reported by other providers
+    :return: the search result.
+    :rtype: dict
+    """
+    result = asdict(place)
+    result['duplicates'] = [{'provider': d.provider, 'place_id': d.place_id} for d in duplicates]
+    return result
+
+
+def search_nearby(location, clients, radius=NEARBY_RADIUS):
+    """
+    Search the places nearby a location using several providers.
+
+    A provider failing does not fail the search, its results are simply missing.
+
+    :param str location: the latitude/longitude around which to search, i.e. "30.31,-97.72"
+    :param list(CollectorClient) clients: the authenticated clients, ordered by priority
+    :param int radius: radius of the search, in meters
+    :return: a search response whose results are the distinct places.
+    :rtype: dict
+    """
+    summaries = []
+    if clients:
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            futures = [executor.submit(_search, client, location, radius) for client in clients]
+        for client, future in zip(clients, futures):
+            try:
+                summaries.extend(future.result())
+            except Exception as e:
+                logger.warning(f'Cannot search the places nearby "{location}" with {client.provider}: {e}')
+
+    results = [to_result(place, duplicates) for place, duplicates in deduplicate(summaries)]
+    return {'status': 'OK', 'results': results}
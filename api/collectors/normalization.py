@@ -0,0 +1,127 @@
+"""
+Define the normalization of the business names and addresses.
+
+The providers format the same business differently ("221 West North Loop Boulevard" vs. "221 W N Loop Blvd, Suite
+100"). Comparing, de-duplicating or indexing businesses requires a canonical form of their names and addresses.
+
+The normalization tables are compiled once at import, and the normalized forms are memoized in bounded LRU caches since
+the same names and addresses are normalized over and over (every candidate of every search).
+"""
+import functools
+import os
+import re
+import unicodedata
+
+# Maximum number of normalized forms kept in each cache.
+CACHE_SIZE = int(os.environ.get('RYR_COLLECTOR_NORMALIZATION_CACHE_SIZE', 4096))
+
+# Abbreviations of the address components (USPS standard).
+ADDRESS_ABBREVIATIONS = {
+    'avenue': 'ave',
+    'boulevard': 'blvd',
+    'circle': 'cir',
+    'court': 'ct',
+    'drive': 'dr',
+    'expressway': 'expy',
+    'freeway': 'fwy',
+    'highway': 'hwy',
+    'lane': 'ln',
+    'parkway': 'pkwy',
+    'place': 'pl',
+    'road': 'rd',
+    'square': 'sq',
+    'street': 'st',
+    'terrace': 'ter',
+    'trail': 'trl',
+    'north': 'n',
+    'south': 's',
+    'east': 'e',
+    'west': 'w',
+    'northeast': 'ne',
+    'northwest': 'nw',
+    'southeast': 'se',
+    'southwest': 'sw',
+}
+
+# Secondary unit designators (i.e. "Suite 100", "Apt. 3B", "#12").
+UNIT_RE = re.compile(r'\b(?:suite|ste|unit|apt|apartment|bldg|building|floor|fl|room|rm)\b\.?\s*#?\s*[\w-]+|#\s*[\w-]+')
+
+# Characters which are not part of a word.
+NON_ALPHANUMERIC_RE = re.compile(r'[^\w\s]+')
+
+# Separators which are part of the business names.
+AMPERSAND_RE = re.compile(r'\s*&\s*')
+
+
+def _fold(text):
+    """Casefold a text and remove its accents."""
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def normalize_name(text):
+    """
+    Normalize a business name.
+
+    The name is casefolded, its accents and its punctuation are removed and "&" is replaced by "and".
+
+    :param str text: the name to normalize
+    :return: the normalized name, its tokens being separated by a single space.
+    :rtype: str
+    """
+    if not text:
+        return ''
+    text = AMPERSAND_RE.sub(' and ', _fold(text))
+    return ' '.join(NON_ALPHANUMERIC_RE.sub(' ', text).split())
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def normalize_address(text):
+    """
+    Normalize an address.
+
+    The address is casefolded, its accents, its punctuation and its secondary units are removed, and its components
+    are abbreviated.
+
+    :param str text: the address to normalize
+    :return: the normalized address, its tokens being separated by a single space.
+    :rtype: str
+    """
+    if not text:
+        return ''
+    text = UNIT_RE.sub(' ', _fold(text))
+    tokens = NON_ALPHANUMERIC_RE.sub(' ', text).split()
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def trigrams(normalized):
+    """
+    Compute the set of trigrams of a normalized text.
+
+    Each token is padded to take the beginning and the end of the words into account.
+
+    :param str normalized: a normalized text
+    :return: the set of trigrams.
+    :rtype: frozenset(str)
+    """
+    grams = set()
+    for token in normalized.split():
+        padded = f'  {token} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def cache_info():
+    """
+    Report the usage of the normalization caches.
+
+    :return: the statistics of each cache, as returned by `functools.lru_cache`.
+    :rtype: dict
+    """
+    return {
+        'name': normalize_name.cache_info(),
+        'address': normalize_address.cache_info(),
+        'trigrams': trigrams.cache_info(),
+    }
@@ -0,0 +1,226 @@
+"""
+Define the pipeline collecting the details of a place from a single provider.
+
+The whole collection runs in a single task per provider, as a sequence of stages:
+
+1. index: look up the match of the reference place in the cross-provider index,
+2. search: search for the place, if it is not indexed,
+3. match: select the search result matching the place the best,
+4. details: retrieve the details of the place,
+5. convert: convert the details to a `BusinessInfo`.
+
+The stages which are not needed are skipped, i.e. the details of a reference place are retrieved directly. The
+duration of every stage is recorded, and only the converted `BusinessInfo` leaves the task.
+
+The clients are kept for the lifetime of the process, so that the connections to the providers are reused from one
+collection to the next. Unless `RYR_COLLECTOR_RETAIN_RAW` is set, the raw provider payloads are dropped from the
+clients at the end of every collection, so that the pooled clients do not pin them in memory. They can be kept in the
+audit store instead (see the `audit` module).
+"""
+import contextlib
+import logging
+import os
+import time
+
+import requests
+
+from api.audit import AUDIT_STORE
+from api.collectors.generic import CollectorClient
+from api.collectors.generic import MATCH_PAGE_SIZE
+from api.collectors.matching import best_match
+from api.forking import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Provider whose place IDs identify the places in the API.
+REFERENCE_PROVIDER = 'google'
+
+# Whether the clients keep the raw payloads of their last requests.
+RETAIN_RAW = bool(int(os.environ.get('RYR_COLLECTOR_RETAIN_RAW', 0)))
+
+# Authenticated clients, by provider and API key.
+_clients = {}
+
+
+def get_client(provider, api_key):
+    """
+    Return the authenticated client of a provider, creating it if needed.
+
+    The clients keep the state of their last request, therefore a client must not be shared between threads. This
+    matches the Celery prefork pool, where each process runs a single task at a time.
+
+    :param str provider: name of the provider
+    :param str api_key: API key of the provider
+    :return: the authenticated client.
+    :rtype: CollectorClient
+    """
+    client = _clients.get((provider, api_key))
+    if client is None:
+        client = CollectorClient(provider, api_key=api_key)
+        client.authenticate()
+        _clients[(provider, api_key)] = client
+    return client
+
+
+@register_after_fork
+def reset_clients():
+    """Drop the clients, and their connections, inherited from the parent process."""
+    _clients.clear()
+
+
+class CollectionPipeline:
+    """
+    Define the collection of the details of a place from a single provider.
+
+    :param CollectorClient client: the authenticated client of the provider
+    :param PlaceIndex index: the cross-provider index. The index is not used if `None`.
+    :param str reference_provider: provider whose place IDs identify the places
+    :param bool retain_raw: whether the client keeps the raw payloads once the collection is over
+    :param AuditStore audit_store: the store receiving the raw payloads which are not retained
+    """
+
+    def __init__(
+            self,
+            client,
+            index=None,
+            reference_provider=REFERENCE_PROVIDER,
+            retain_raw=RETAIN_RAW,
+            audit_store=AUDIT_STORE,
+    ):
+        """Initialize the pipeline."""
+        self.client = client
+        self.index = index
+        self.reference_provider = reference_provider
+        self.retain_raw = retain_raw
+        self.audit_store = audit_store
+        self.timings = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Record the duration of a stage, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def run(self, place_id=None, name=None, address=None, latitude=None, longitude=None):
+        """
+        Collect the details of a place.
+
+        :param str place_id: the ID of the place in the reference provider
+        :param str name: name of the place
+        :param str address: address of the place
+        :param float latitude: latitude of the place, if known
+        :param float longitude: longitude of the place, if known
+        :return: the business information.
+        :rtype: BusinessInfo
+        :raises ValueError: if the place cannot be found
+        """
+        self.timings = {}
+        try:
+            return self._run(place_id, name, address, latitude, longitude)
+        finally:
+            if not self.retain_raw:
+                self.release(place_id or name)
+            stages = ' '.join(f'{stage}={duration * 1000:.1f}ms' for stage, duration in self.timings.items())
+            logger.info(f'Collected "{place_id or name}" from {self.client.provider}: {stages}')
+
+    def run_many(self, places):
+        """
+        Collect the details of several places.
+
+        The places whose ID is known in the provider, i.e. the places of the reference provider and the indexed
+        matches, are retrieved together, with as few requests as the provider allows. The other places are collected
+        one by one. The places which cannot be collected are skipped.
+
+        :param list(dict) places: the places, as dictionaries containing the arguments of `run`
+        :return: the business information of each place collected, by place ID in the reference provider.
+        :rtype: dict
+        """
+        provider = self.client.provider
+        place_ids = self._known_place_ids([place['place_id'] for place in places])
+        try:
+            found = self.client.get_places_details(list(place_ids.values()))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f'Cannot retrieve {len(place_ids)} places from {provider}: {e}')
+            found = {}
+        details = {
+            place_id: found[other_place_id]
+            for place_id, other_place_id in place_ids.items() if other_place_id in found
+        }
+        logger.info(f'Collected {len(details)} of {len(places)} places from {provider} in a batch.')
+
+        for place in places:
+            if place['place_id'] in details:
+                continue
+            try:
+                details[place['place_id']] = self.run(**place)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f'Cannot collect "{place["place_id"]}" from {provider}: {e}')
+        return details
+
+    def _known_place_ids(self, place_ids):
+        """Look up the IDs of the places in the provider, by ID in the reference provider."""
+        provider = self.client.provider
+        if provider == self.reference_provider:
+            return {place_id: place_id for place_id in place_ids}
+        if not self.index:
+            return {}
+        matches = {place_id: self.index.get(self.reference_provider, place_id, provider) for place_id in place_ids}
+        return {place_id: match.place_id for place_id, match in matches.items() if match}
+
+    def release(self, key):
+        """
+        Drop the raw payloads held by the client, storing them in the audit store if it is enabled.
+
+        :param str key: the key identifying the collection in the audit store
+        """
+        payloads = self.client.release()
+        if self.audit_store is not None and self.audit_store.enabled:
+            for kind, payload in payloads.items():
+                self.audit_store.put(self.client.provider, kind, key, payload)
+
+    def _run(self, place_id, name, address, latitude, longitude):
+        """Run the stages of the pipeline."""
+        provider = self.client.provider
+
+        # The reference provider knows the place already.
+        if place_id and provider == self.reference_provider:
+            return self._details(place_id)
+
+        # Use the indexed match if any.
+        if place_id and self.index:
+            with self.stage('index'):
+                match = self.index.get(self.reference_provider, place_id, provider)
+            if match:
+                try:
+                    return self._details(match.place_id)
+                except requests.exceptions.HTTPError as e:
+                    logger.info(f'Indexed {provider} place "{match.place_id}" cannot be retrieved ({e}).')
+                    self.index.forget(self.reference_provider, place_id, provider)
+
+        # Find the place matching the best.
+        if not (name and address):
+            raise ValueError('A name and a address must be provided.')
+        with self.stage('search'):
+            self.client.search_places(address=address, terms=name, limit=MATCH_PAGE_SIZE)
+        with self.stage('match'):
+            summary, score = best_match(self.client.retrieve_search_summaries(), name, address, latitude, longitude)
+        if not summary:
+            raise ValueError(f'{provider} did not return any result.')
+
+        details = self._details(summary.place_id)
+
+        # Index the match.
+        if place_id and self.index and details:
+            self.index.set(self.reference_provider, place_id, provider, summary.place_id, score)
+
+        return details
+
+    def _details(self, place_id):
+        """Retrieve the details of a place and convert them."""
+        with self.stage('details'):
+            self.client.fetch_place_details(place_id)
+        with self.stage('convert'):
+            return self.client.to_business_info()
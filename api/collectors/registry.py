@@ -0,0 +1,160 @@
+"""
+Define the registry of the collectors.
+
+The collectors are declared as entry points of the ``ryr.collectors`` group, each entry point targeting a collector
+class. The collectors of this package are also declared as built-ins, so that the registry works without the package
+being installed (i.e. when running from the sources).
+
+Nothing is imported until a collector is actually used: the entry points are discovered on the first lookup, and each
+provider module, with its SDK, is only imported when its collector is first loaded.
+
+Each collector declares its capabilities in its `CAPABILITIES` attribute. The capabilities of the built-in collectors
+are also declared statically, so that the collectors having a capability are selected without importing any of them.
+The capabilities of the other collectors are read from their class, once loaded, unless they are declared when
+registering them.
+"""
+import importlib
+import os
+
+# Entry point group of the collectors.
+ENTRY_POINT_GROUP = 'ryr.collectors'
+
+# Capabilities of the collectors.
+DETAILS = 'details'
+NEARBY_SEARCH = 'nearby_search'
+BATCH = 'batch'
+
+# Collectors provided by this package.
+BUILTIN_COLLECTORS = {
+    'google': 'api.collectors.google:GoogleCollector',
+    'yelp': 'api.collectors.yelp:YelpCollector',
+}
+
+# Capabilities of the collectors provided by this package, matching their `CAPABILITIES` attribute.
+BUILTIN_CAPABILITIES = {
+    'google': frozenset([DETAILS, NEARBY_SEARCH]),
+    'yelp': frozenset([BATCH, DETAILS, NEARBY_SEARCH]),
+}
+
+# Collectors in use, ordered by priority.
+ENABLED_COLLECTORS = [
+    name.strip() for name in os.environ.get('RYR_COLLECTORS_ENABLED', 'google,yelp').split(',') if name.strip()
+]
+
+
+def _load_target(target):
+    """Import an object designated by a "module:attribute" string."""
+    module_name, _, attribute = target.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _iter_entry_points(group):
+    """Yield the entry points of a group."""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # Python < 3.8.
+        from pkg_resources import iter_entry_points
+        yield from iter_entry_points(group)
+        return
+    eps = entry_points()
+    yield from eps.select(group=group) if hasattr(eps, 'select') else eps.get(group, [])
+
+
+class CollectorRegistry:
+    """
+    Define a registry of collectors, loaded lazily.
+
+    :param str group: the entry point group declaring the collectors
+    :param dict builtins: the built-in collectors, as "module:attribute" strings, by name
+    :param dict capabilities: the capabilities declared statically, by name. Defaults to the capabilities of the
+        built-in collectors.
+    """
+
+    def __init__(self, group=ENTRY_POINT_GROUP, builtins=None, capabilities=None):
+        """Initialize the registry."""
+        self.group = group
+        self.builtins = dict(builtins if builtins is not None else BUILTIN_COLLECTORS)
+        self.declared = dict(capabilities if capabilities is not None else BUILTIN_CAPABILITIES)
+        self._sources = None
+        self._collectors = {}
+
+    @property
+    def sources(self):
+        """Return the sources of the collectors by name, discovering them on first use."""
+        if self._sources is None:
+            sources = dict(self.builtins)
+            sources.update({entry_point.name: entry_point for entry_point in _iter_entry_points(self.group)})
+            self._sources = sources
+        return self._sources
+
+    def names(self):
+        """Return the names of the known collectors."""
+        return sorted(self.sources)
+
+    def register(self, name, collector, capabilities=None):
+        """
+        Register a collector.
+
+        :param str name: the name of the provider
+        :param collector: the collector class, or a "module:attribute" string designating it
+        :param capabilities: the capabilities of the collector. They are read from the collector class if `None`.
+        """
+        self.sources[name] = collector
+        self._collectors.pop(name, None)
+        if capabilities is None:
+            self.declared.pop(name, None)
+        else:
+            self.declared[name] = frozenset(capabilities)
+
+    def load(self, name):
+        """
+        Load the class of a collector.
+
+        :param str name: the name of the provider
+        :return: the collector class.
+        :raises ValueError: if the provider is not supported
+        """
+        collector = self._collectors.get(name)
+        if collector is None:
+            try:
+                source = self.sources[name]
+            except KeyError:
+                raise ValueError(f'The "{name}" provider is not supported.')
+            if isinstance(source, str):
+                collector = _load_target(source)
+            elif hasattr(source, 'load'):
+                collector = source.load()
+            else:
+                collector = source
+            self._collectors[name] = collector
+        return collector
+
+    def capabilities(self, name):
+        """
+        Return the capabilities of a collector.
+
+        The collector is only loaded if its capabilities are not declared statically.
+
+        :param str name: the name of the provider
+        :rtype: frozenset(str)
+        """
+        if name in self.declared:
+            return self.declared[name]
+        return frozenset(self.load(name).CAPABILITIES)
+
+    def enabled(self, capability=None, names=None):
+        """
+        Return the enabled collectors, optionally having a capability.
+
+        :param str capability: the capability the collectors must have. All the collectors are returned if `None`.
+        :param list(str) names: the enabled collectors. Defaults to `ENABLED_COLLECTORS`.
+        :return: the names of the collectors, ordered by priority.
+        :rtype: list(str)
+        """
+        names = ENABLED_COLLECTORS if names is None else names
+        return [name for name in names if capability is None or capability in self.capabilities(name)]
+
+
+# Registry of the collectors.
+REGISTRY = CollectorRegistry()
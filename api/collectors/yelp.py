@@ -6,12 +6,36 @@ import requests
 from api.collectors.base import AbstractRestCollector
 from api.collectors.base import BusinessInfo
 from api.collectors.base import PlaceSearchSummary
+from api.collectors.decoding import decode_response
+from api.collectors.registry import BATCH
+from api.collectors.registry import DETAILS
+from api.collectors.registry import NEARBY_SEARCH
 
 
 class YelpCollector(AbstractRestCollector):
     """Define the Yelp Collector."""
 
     BASE_URL = "https://api.yelp.com/"
+    PROVIDER = 'yelp'
+    API_KEY_VARIABLE = 'RYR_COLLECTOR_YELP_API_KEY'
+    CAPABILITIES = frozenset([BATCH, DETAILS, NEARBY_SEARCH])
+
+    # Maximum number of results returned by a search.
+    MAX_LIMIT = 50
+
+    # Maximum number of businesses retrieved by a GraphQL request.
+    GRAPHQL_BATCH_SIZE = 20
+
+    # Fields of the businesses needed to create a BusinessInfo.
+    GRAPHQL_BUSINESS_FIELDS = (
+        'id name phone location { formatted_address } coordinates { latitude longitude } categories { title }')
+
+    def __init__(self):
+        """Initialize the collector."""
+        super(YelpCollector, self).__init__()
+
+        # The HTTP session, keeping the connections to Yelp alive between the requests.
+        self.session = requests.Session()
 
     def authenticate(self, api_key):
         """
@@ -25,13 +49,12 @@ class YelpCollector(AbstractRestCollector):
         # Prepare the header for the future requests.
         self.headers['Authorization'] = f'Bearer {api_key}'
 
-    def get_place_details(self, place_id):
+    def fetch_place_details(self, place_id, fields=None):
         """
-        Retrieve the details of a place.
-
-        This function returns the raw result of the search and caches it in the `self.result` property.
+        Fetch the details of a place, without caching them.
 
         :param str place_id: the ID of a place
+        :param list(str) fields: ignored, Yelp always returns all the fields.
         :returns: A dictionnary containing the detailed information of the place matching the `place_id`.
         :rtype: dict
         """
@@ -40,12 +63,59 @@ class YelpCollector(AbstractRestCollector):
         url = urllib.parse.urljoin(YelpCollector.BASE_URL, DETAILS_ROUTE)
 
         # Query the server.
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers)
         if response.status_code != 200:
             response.raise_for_status()
-        self.result = response.json()
+        return decode_response(response)
+
+    def get_places_details(self, place_ids, fields=None):
+        """
+        Retrieve the details of several places using the GraphQL API.
 
-        return self.result
+        Up to `GRAPHQL_BATCH_SIZE` businesses are fetched per request, only with the fields needed to create a
+        `BusinessInfo`. The details are returned in the same shape as the ones of the REST API.
+
+        :param list(str) place_ids: the IDs of the places
+        :param list(str) fields: ignored, the fields needed to create a `BusinessInfo` are retrieved.
+        :return: the raw details of each place found, by place ID.
+        :rtype: dict
+        """
+        url = urllib.parse.urljoin(YelpCollector.BASE_URL, 'v3/graphql')
+        details = {}
+        for start in range(0, len(place_ids), YelpCollector.GRAPHQL_BATCH_SIZE):
+            batch = place_ids[start:start + YelpCollector.GRAPHQL_BATCH_SIZE]
+
+            # Query the server, each business being aliased by its position in the batch.
+            response = self.session.post(url, headers=self.headers, json=self._graphql_query(batch))
+            if response.status_code != 200:
+                response.raise_for_status()
+            data = decode_response(response).get('data') or {}
+
+            # Convert the businesses to the REST format. The businesses which were not found are ignored.
+            for i, place_id in enumerate(batch):
+                business = data.get(f'b{i}')
+                if business:
+                    details[place_id] = self._from_graphql(business)
+        return details
+
+    @staticmethod
+    def _graphql_query(place_ids):
+        """Create the GraphQL query retrieving several businesses."""
+        variables = ', '.join(f'$id{i}: String' for i in range(len(place_ids)))
+        businesses = ' '.join(
+            f'b{i}: business(id: $id{i}) {{ {YelpCollector.GRAPHQL_BUSINESS_FIELDS} }}' for i in range(len(place_ids)))
+        values = {f'id{i}': place_id for i, place_id in enumerate(place_ids)}
+        return {'query': f'query ({variables}) {{ {businesses} }}', 'variables': values}
+
+    @staticmethod
+    def _from_graphql(business):
+        """Convert a business returned by the GraphQL API to the format of the REST API."""
+        result = dict(business)
+        formatted_address = (business.get('location') or {}).get('formatted_address') or ''
+        result['location'] = {'display_address': formatted_address.split('\n') if formatted_address else []}
+        result['coordinates'] = business.get('coordinates') or {}
+        result['categories'] = business.get('categories') or []
+        return result
 
     def search_places(self, address, terms=None, **kwargs):
         """
@@ -70,27 +140,50 @@ class YelpCollector(AbstractRestCollector):
             querystring['limit'] = kwargs.get('limit')
 
         # Query the server.
-        response = requests.get(url, headers=self.headers, params=querystring)
-        self.search_results = response.json()
+        response = self.session.get(url, headers=self.headers, params=querystring)
+        self.search_results = decode_response(response)
 
         return self.search_results
 
     def search_places_nearby(self, location, **kwargs):
         """
-        Search places nearby.
+        Search places near a specific location.
 
-        This collector does not support this search method.
+        :param str location: The latitude/longitude value around which to retrieve the places, i.e. "30.31,-97.72".
+        :param int radius: Optional. Search radius in meters. Defaults to 250.
+        :param int limit: Optional. Number of results to return. Defaults to 50, the maximum allowed by Yelp.
+        :returns: A dictionnary containing the results of the research.
+        :rtype: dict
         """
-        raise NotImplementedError
+        # Prepare the route.
+        SEARCH_ROUTE = 'v3/businesses/search'
+        url = urllib.parse.urljoin(YelpCollector.BASE_URL, SEARCH_ROUTE)
 
-    def to_business_info(self):
-        """Convert the raw data to a BusinessInfo object."""
+        # Prepare the quesrystring.
+        latitude, longitude = (coordinate.strip() for coordinate in location.split(','))
+        querystring = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'radius': kwargs.get('radius', 250),
+            'limit': kwargs.get('limit', YelpCollector.MAX_LIMIT),
+        }
+
+        # Query the server.
+        response = self.session.get(url, headers=self.headers, params=querystring)
+        if response.status_code != 200:
+            response.raise_for_status()
+        self.search_results = decode_response(response)
+
+        return self.search_results
+
+    def convert(self, result):
+        """Convert the raw details of a place to a BusinessInfo object."""
         # Ensure we have data to convert.
-        if not self.result:
+        if not result:
             return None
 
         # Define convenience variables.
-        r = self.result
+        r = result
         location = r.get('location', {})
         coordinates = r.get('coordinates', {})
 
@@ -110,12 +203,30 @@ class YelpCollector(AbstractRestCollector):
             return None
         if not self.search_results.get('businesses'):
             return None
-
-        search_summary = PlaceSearchSummary()
         business = self.search_results.get('businesses')[index]
+        return self._to_search_summary(business)
+
+    def retrieve_search_summaries(self):
+        """
+        Retrieve the search information of all the places found.
+
+        :return: the summary information of the places, in the order of the results.
+        :rtype: list(PlaceSearchSummary)
+        """
+        if not self.search_results:
+            return []
+        return [self._to_search_summary(business) for business in self.search_results.get('businesses', [])]
+
+    @staticmethod
+    def _to_search_summary(business):
+        """Convert a search result to a PlaceSearchSummary."""
+        search_summary = PlaceSearchSummary(provider=YelpCollector.PROVIDER)
+        coordinates = business.get('coordinates', {})
 
         search_summary.place_id = business.get('id', '')
         search_summary.name = business.get('name', '')
         search_summary.address = ' '.join(business.get('location', {}).get('display_address', ''))
+        search_summary.latitude = coordinates.get('latitude', 0.0)
+        search_summary.longitude = coordinates.get('longitude', 0.0)
 
         return search_summary
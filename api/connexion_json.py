@@ -0,0 +1,44 @@
+"""
+Define the JSON encoder used to serialize the API responses.
+
+`orjson` is used instead of the standard library. It is several times faster and produces compact documents. The
+module mimics the `json` module interface so that it can be used by a connexion `Jsonifier`.
+"""
+import orjson
+
+# Like the standard library, accept non-string keys (i.e. HTTP status codes).
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def encode(obj):
+    """
+    Serialize an object to compact JSON.
+
+    :param obj: the object to serialize. Dataclasses are supported natively.
+    :return: the JSON document.
+    :rtype: bytes
+    """
+    return orjson.dumps(obj, option=OPTIONS)
+
+
+def dumps(obj, **kwargs):
+    """
+    Serialize an object to compact JSON.
+
+    The `json.dumps` keyword arguments (e.g. `indent`) are accepted but ignored, since the responses are always compact.
+
+    :param obj: the object to serialize
+    :return: the JSON document.
+    :rtype: str
+    """
+    return orjson.dumps(obj, option=OPTIONS).decode()
+
+
+def loads(s, **kwargs):
+    """
+    Deserialize a JSON document.
+
+    :param s: the JSON document, as a string or as bytes
+    :return: the deserialized object.
+    """
+    return orjson.loads(s)
@@ -1,6 +1,7 @@
 """Add a route to ReDoc."""
 
 from flask import render_template_string
+import jinja2
 
 REDOC_TEMPLATE = '''
 <!DOCTYPE html>
@@ -47,3 +48,22 @@ def add_redoc_route(app, spec_url):
     :param str penapi_json_url: the URL of the OpenAPI JSON spec
     """
     app.app.add_url_rule('/redoc', 'redoc', redoc_view, defaults={'spec_url': spec_url})
+
+
+def add_aiohttp_redoc_route(app, spec_url):
+    """
+    Add a '/redoc' route pointing to de ReDoc page to an aiohttp based application.
+
+    :param AioHttpApp app: the connexion application
+    :param str spec_url: the URL of the OpenAPI JSON spec
+    """
+    # Imported here since aiohttp is only required by the asynchronous application.
+    from aiohttp import web
+
+    page = jinja2.Template(REDOC_TEMPLATE).render(spec_url=spec_url)
+
+    async def aiohttp_redoc_view(request):
+        """Render OpenAPI specification using ReDoc."""
+        return web.Response(text=page, content_type='text/html')
+
+    app.app.router.add_get('/redoc', aiohttp_redoc_view)
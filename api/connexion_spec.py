@@ -0,0 +1,201 @@
+"""
+Pre-parse the OpenAPI specification and cache it as a precompiled artifact.
+
+Parsing and validating the YAML specification is the most expensive part of the application startup. The
+specification is therefore parsed and validated once, then pickled next to a digest of its source. Every other process
+loading the same specification reuses the artifact instead of parsing the YAML again.
+
+The artifact can be built ahead of time (i.e. when building the Docker image) with::
+
+    python -m api.connexion_spec openapi/openapi.yaml /var/cache/ryr-api
+
+Loading a pickle runs arbitrary code, so the artifacts are only read from a trusted directory: owned by the current
+user or by root, and writable by its owner only. The directory is created with the 0700 mode if it does not exist.
+The artifacts found in any other directory are ignored, and the specification is parsed as if caching was disabled.
+
+The digest covers the version of connexion and of Python along with the specification, so that upgrading them never
+reuses a stale artifact.
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import tempfile
+
+import yaml
+
+ARTIFACT_EXTENSION = 'pickle'
+
+
+def connexion_version():
+    """
+    Return the version of connexion.
+
+    :return: the version, or an empty string if connexion is not installed.
+    :rtype: str
+    """
+    try:
+        from importlib import metadata
+    except ImportError:
+        # Python < 3.8.
+        import connexion
+
+        return getattr(connexion, '__version__', '')
+    try:
+        return metadata.version('connexion')
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+def specification_digest(content, version=None):
+    """
+    Compute the digest identifying a specification.
+
+    :param bytes content: the raw content of the specification file
+    :param str version: the version of connexion. Uses the installed version if `None`.
+    :return: the hexadecimal SHA-256 digest of the content, the version of connexion and the version of Python.
+    :rtype: str
+    """
+    version = connexion_version() if version is None else version
+    python_version = '.'.join(str(part) for part in sys.version_info[:2])
+    digest = hashlib.sha256(f'connexion={version};python={python_version};'.encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def is_trusted(path):
+    """
+    Check whether a file or a directory can be trusted.
+
+    :param str path: the path to check
+    :return: `True` if the path is owned by the current user or by root, and is not writable by the group nor by the
+        other users.
+    :rtype: bool
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_ISLNK(st.st_mode):
+        return False
+    return st.st_uid in (os.getuid(), 0) and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def private_directory(path):
+    """
+    Create a private directory if needed, and check it can be trusted.
+
+    :param str path: path of the directory
+    :return: `True` if the directory exists and can be trusted.
+    :rtype: bool
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    except OSError:
+        return False
+    return is_trusted(path)
+
+
+def artifact_path(specification_path, cache_dir, digest):
+    """
+    Compute the path of the artifact matching a specification.
+
+    :param str specification_path: path of the YAML specification
+    :param str cache_dir: directory containing the artifacts
+    :param str digest: digest of the specification content
+    :return: the path of the artifact.
+    :rtype: str
+    """
+    name = os.path.splitext(os.path.basename(specification_path))[0]
+    return os.path.join(cache_dir, f'{name}.{digest[:16]}.{ARTIFACT_EXTENSION}')
+
+
+def parse_specification(content):
+    """
+    Parse and validate an OpenAPI specification.
+
+    :param bytes content: the raw content of the specification file
+    :return: the parsed specification.
+    :rtype: dict
+    """
+    # The validator is only needed when building the artifact.
+    from openapi_spec_validator import validate_v3_spec
+    from openapi_spec_validator.loaders import ExtendedSafeLoader
+
+    # Use the same loader as connexion to ensure the specification is interpreted identically.
+    specification = yaml.load(content, ExtendedSafeLoader)
+    validate_v3_spec(specification)
+    return specification
+
+
+def write_artifact(path, specification):
+    """
+    Atomically write the artifact to disk.
+
+    The artifact is written to a temporary file first, only readable by its owner, then moved to its final
+    destination. This allows several workers to start concurrently without ever reading a partial artifact.
+
+    :param str path: path of the artifact
+    :param dict specification: the parsed specification
+    """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(specification, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_specification(specification_path, cache_dir=None):
+    """
+    Load a specification, using the precompiled artifact if it exists.
+
+    If the artifact does not exist or cannot be read, the specification is parsed, validated and a new artifact is
+    written. Failing to write the artifact is not fatal.
+
+    :param str specification_path: path of the YAML specification
+    :param str cache_dir: directory containing the artifacts. Caching is disabled if `None`, or if the directory cannot
+        be trusted.
+    :return: the parsed specification.
+    :rtype: dict
+    """
+    with open(specification_path, 'rb') as f:
+        content = f.read()
+
+    if not cache_dir or not private_directory(cache_dir):
+        return parse_specification(content)
+
+    path = artifact_path(specification_path, cache_dir, specification_digest(content))
+    if is_trusted(path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError):
+            pass
+
+    specification = parse_specification(content)
+    try:
+        write_artifact(path, specification)
+    except OSError:
+        pass
+    return specification
+
+
+def main(argv=None):
+    """Build the artifact of a specification."""
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print('usage: python -m api.connexion_spec SPECIFICATION CACHE_DIR', file=sys.stderr)
+        return 2
+    specification_path, cache_dir = argv
+    load_specification(specification_path, cache_dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,29 @@
 """Define utilities to create and configure a connexion app."""
 
+import importlib
 import os
 
 import connexion
+from connexion.apis.flask_api import FlaskApi
 from connexion.resolver import RestyResolver
+from connexion.utils import Jsonifier
+from flask_compress import Compress
 from flask_cors import CORS
 from werkzeug.utils import import_string
 
+from api import connexion_json
+from api.connexion_redoc import add_aiohttp_redoc_route
 from api.connexion_redoc import add_redoc_route
+from api.connexion_spec import load_specification
+
+
+class FastJsonFlaskApi(FlaskApi):
+    """Define a Flask API serializing the responses with the fast JSON encoder."""
+
+    @classmethod
+    def _set_jsonifier(cls):
+        """Use the fast JSON encoder. The jsonifier is set by the metaclass of the APIs when the class is created."""
+        cls.jsonifier = Jsonifier(connexion_json)
 
 
 def from_object(obj):
@@ -38,27 +54,141 @@ def from_object(obj):
     return d
 
 
-def create_connexion_app():
-    """Create and configure a connexion app."""
-    settings_module = os.environ['CONNEXION_SETTINGS_MODULE']
-    settings = from_object(settings_module)
+def load_settings():
+    """Load the settings from the module defined by the `CONNEXION_SETTINGS_MODULE` environment variable."""
+    return from_object(os.environ['CONNEXION_SETTINGS_MODULE'])
 
-    app_options = {
+
+def preload_modules():
+    """Import the modules listed in the `PRELOAD_MODULES` setting."""
+    settings = load_settings()
+    for module in settings.get('PRELOAD_MODULES', []):
+        importlib.import_module(module)
+
+
+def app_options(settings):
+    """Prepare the options common to all the connexion apps."""
+    return {
         'import_name': __name__,
         'port': settings['PORT'],
         'specification_dir': settings['SPECIFICATION_DIR'],
         'debug': settings['DEBUG']
     }
-    app = connexion.FlaskApp(**app_options)
 
-    # Add the specification file.
-    app.add_api(settings['SPECIFICATION_FILE'], resolver=RestyResolver(settings['RESOLVER_MODULE_NAME']))
+
+def load_settings_specification(settings):
+    """Load the specification, reusing the precompiled artifact when available."""
+    return load_specification(
+        os.path.join(settings['SPECIFICATION_DIR'], settings['SPECIFICATION_FILE']),
+        settings.get('SPECIFICATION_CACHE_DIR'),
+    )
+
+
+def aiohttp_cors_middleware():
+    """
+    Create a middleware adding CORS support to an aiohttp app.
+
+    Like the default `flask_cors` configuration, all the origins are allowed.
+    """
+    from aiohttp import web
+
+    @web.middleware
+    async def cors_middleware(request, handler):
+        """Answer the preflight requests and add the CORS headers to the responses."""
+        if request.method == 'OPTIONS' and 'Access-Control-Request-Method' in request.headers:
+            response = web.Response()
+            response.headers['Access-Control-Allow-Methods'] = request.headers['Access-Control-Request-Method']
+            if 'Access-Control-Request-Headers' in request.headers:
+                response.headers['Access-Control-Allow-Headers'] = request.headers['Access-Control-Request-Headers']
+        else:
+            response = await handler(request)
+        origin = request.headers.get('Origin')
+        response.headers['Access-Control-Allow-Origin'] = origin or '*'
+        if origin:
+            # The response depends on the origin: the shared caches must not serve it to the other origins.
+            vary = response.headers.get('Vary')
+            response.headers['Vary'] = f'{vary}, Origin' if vary else 'Origin'
+        return response
+
+    return cors_middleware
+
+
+def aiohttp_compression_middleware(min_size):
+    """
+    Create a middleware compressing the responses of an aiohttp app.
+
+    The encoding is negotiated by aiohttp from the `Accept-Encoding` header of the request.
+
+    :param int min_size: minimum size of the body, in bytes, for the response to be compressed
+    """
+    from aiohttp import web
+
+    @web.middleware
+    async def compression_middleware(request, handler):
+        """Compress the large responses."""
+        response = await handler(request)
+        body = getattr(response, 'body', None)
+        if isinstance(body, bytes) and len(body) >= min_size:
+            response.enable_compression()
+            # The bytes sent depend on the negotiated encoding: the ETag of the representation becomes weak.
+            etag = response.headers.get('ETag')
+            if etag and not etag.startswith('W/'):
+                response.headers['ETag'] = f'W/{etag}'
+            vary = response.headers.get('Vary')
+            if not vary:
+                response.headers['Vary'] = 'Accept-Encoding'
+            elif 'accept-encoding' not in vary.lower():
+                response.headers['Vary'] = f'{vary}, Accept-Encoding'
+        return response
+
+    return compression_middleware
+
+
+def create_connexion_app():
+    """Create and configure a connexion app."""
+    settings = load_settings()
+    app = connexion.FlaskApp(**app_options(settings))
+    # Serialize the responses with the fast JSON encoder, without altering the other apps.
+    app.api_cls = FastJsonFlaskApi
+
+    # Add the specification.
+    specification = load_settings_specification(settings)
+    app.add_api(specification, resolver=RestyResolver(settings['RESOLVER_MODULE_NAME']))
 
     # Add an extra route to for redoc.
     openapi_json_url = f'{settings["BASE_URL"]}/1.0/openapi.json'
     add_redoc_route(app, openapi_json_url)
 
+    # Add compression support.
+    app.app.config.update({key: value for key, value in settings.items() if key.startswith('COMPRESS_')})
+    Compress(app.app)
+
     # Add CORS support.
     CORS(app.app)
 
     return app
+
+
+def create_aiohttp_app():
+    """Create and configure a connexion app served by aiohttp, using the asynchronous controllers."""
+    settings = load_settings()
+    app = connexion.AioHttpApp(**app_options(settings))
+
+    # Add the specification.
+    specification = load_settings_specification(settings)
+    # The aiohttp request is passed to the handlers declaring a `request` argument.
+    app.add_api(
+        specification,
+        resolver=RestyResolver(settings['ASYNC_RESOLVER_MODULE_NAME']),
+        pass_context_arg_name='request',
+    )
+
+    # Add an extra route to for redoc.
+    openapi_json_url = f'{settings["BASE_URL"]}/1.0/openapi.json'
+    add_aiohttp_redoc_route(app, openapi_json_url)
+
+    # Add CORS and compression support.
+    app.app.middlewares.append(aiohttp_cors_middleware())
+    app.app.middlewares.append(aiohttp_compression_middleware(settings['COMPRESS_MIN_SIZE']))
+
+    return app
@@ -1,8 +1,25 @@
 """Define the endpoint for the health resource."""
 from connexion.lifecycle import ConnexionResponse
 
+from api.admission import ADMISSION
+from api.health import HEALTH_CHECK
 
-def search():
-    """Provide server status information."""
-    content = {'status': 'ok'}
-    return ConnexionResponse(body=content)
+
+def search(detailed=False):
+    """
+    Provide server status information.
+
+    The worker is reported as saturated, with a 503, when it cannot admit any new collection, so that the readiness
+    probe takes it out of the load balancing until it drains.
+
+    If `detailed` is set, the dependencies of the API are also probed. A failing dependency reports the API as degraded,
+    without changing the status code.
+    """
+    saturated = ADMISSION.saturated
+    content = {'status': 'saturated' if saturated else 'ok', 'admission': ADMISSION.stats()}
+    if detailed:
+        report = HEALTH_CHECK.report()
+        content = {**report, **content}
+        if not saturated:
+            content['status'] = report['status']
+    return ConnexionResponse(status_code=503 if saturated else 200, body=content)
@@ -0,0 +1,10 @@
+"""Define the endpoint for the metrics resource."""
+from connexion.lifecycle import ConnexionResponse
+
+from api.metrics import collect
+from api.metrics import CONTENT_TYPE
+
+
+def search():
+    """Expose the metrics driving the autoscaling of the Celery workers, in the Prometheus text format."""
+    return ConnexionResponse(body=collect(), content_type=CONTENT_TYPE)
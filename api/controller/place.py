@@ -3,14 +3,48 @@ import dataclasses
 
 from connexion.lifecycle import ConnexionResponse
 
-from api.celery.tasks import collect_place_details
+from api.admission import ADMISSION
+from api.admission import COLLECT_TIMEOUT
+from api.admission import Overloaded
+from api.admission import overloaded_response
+from api.admission import timed_out_response
+from api.cache import PLACE_DETAILS_CACHE
+from api.hot_places import HOT_PLACES
+from api.hot_places import place_request
+from api.http_cache import cache_headers
 
 
 def post(body):
     """Provide detailed information about a specific place."""
-    result = collect_place_details(
-        body['place_id'],
-        body['name'],
-        body['address'],
-    )
-    return ConnexionResponse(body=dataclasses.asdict(result))
+    # Track the popularity of the place, to refresh its details before they expire.
+    HOT_PLACES.record(body['place_id'], place_request(body))
+
+    # Serve the cached result if any.
+    cached = PLACE_DETAILS_CACHE.get_with_ttl(body['place_id'])
+    if cached:
+        etag, details, ttl = cached
+        return ConnexionResponse(body=details, headers=cache_headers(etag, ttl, public=False))
+
+    # Celery and the collectors are only imported when the endpoint is first used.
+    from celery.exceptions import TimeoutError as CeleryTimeoutError
+
+    from api.celery.tasks import collect_place_details
+
+    # Only the requests calling the providers go through the admission control.
+    try:
+        with ADMISSION.admit():
+            result = collect_place_details(
+                body['place_id'],
+                body['name'],
+                body['address'],
+                body.get('latitude'),
+                body.get('longitude'),
+                timeout=COLLECT_TIMEOUT,
+            )
+    except Overloaded as e:
+        return overloaded_response(e)
+    except CeleryTimeoutError:
+        return timed_out_response()
+    details = dataclasses.asdict(result)
+    etag = PLACE_DETAILS_CACHE.set(body['place_id'], details)
+    return ConnexionResponse(body=details, headers=cache_headers(etag, PLACE_DETAILS_CACHE.ttl, public=False))
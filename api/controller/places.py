@@ -1,13 +1,81 @@
 """Define the endpoint for the places resource."""
 import os
 
+import connexion
 from connexion.lifecycle import ConnexionResponse
 
-from api.collectors.google import GoogleCollector
+from api.admission import ADMISSION
+from api.admission import Overloaded
+from api.admission import overloaded_response
+from api.cache import PLACES_CACHE
+from api.http_cache import cache_headers
+from api.http_cache import etag_matches
+from api.http_cache import not_modified
+from api.http_cache import variant_etag
+from api.prefetch import PREFETCH_TOP
+from api.projection import canonical_fields
+from api.projection import project_search_results
 
 
-def search(location):
-    """Return a list of all places nearby our coordinates."""
+def search(location, fields=None, merged=False):
+    """
+    Return a list of all places nearby our coordinates.
+
+    Only Google is queried by default. If `merged` is set, every provider supporting the nearby search is queried and
+    their results are merged into a single list of distinct places.
+    """
+    cache_key = f'merged:{location}' if merged else location
+    # The lists of fields selecting the same projection share their ETag.
+    fields = canonical_fields(fields)
+
+    # Answer the conditional requests without touching the providers.
+    if_none_match = connexion.request.headers.get('If-None-Match')
+    if if_none_match:
+        etag = PLACES_CACHE.etag(cache_key)
+        if etag and etag_matches(if_none_match, variant_etag(etag, fields)):
+            return not_modified(variant_etag(etag, fields), PLACES_CACHE.ttl)
+
+    # Serve the cached result if any.
+    cached = PLACES_CACHE.get_with_ttl(cache_key)
+    if cached:
+        etag, places_nearby, max_age = cached
+    else:
+        # Only the requests calling the providers go through the admission control.
+        try:
+            with ADMISSION.admit():
+                places_nearby = search_providers(location, merged)
+        except Overloaded as e:
+            return overloaded_response(e)
+        etag = PLACES_CACHE.set(cache_key, places_nearby)
+        max_age = PLACES_CACHE.ttl
+
+    # Warm the place details cache for the first results.
+    if PREFETCH_TOP:
+        from api.celery.tasks import schedule_prefetch
+        schedule_prefetch(places_nearby, PREFETCH_TOP)
+
+    body = project_search_results(places_nearby, fields)
+    return ConnexionResponse(body=body, headers=cache_headers(variant_etag(etag, fields), max_age))
+
+
+def search_providers(location, merged):
+    """
+    Query the providers for the places nearby our coordinates.
+
+    :param str location: the coordinates
+    :param bool merged: query every provider supporting the nearby search, rather than Google only
+    :return: the places nearby.
+    """
+    if merged:
+        # The collectors are only imported when the endpoint is first used.
+        from api.collectors.nearby import nearby_clients
+        from api.collectors.nearby import search_nearby
+
+        return search_nearby(location, nearby_clients())
+
+    # The Google client is only imported when the endpoint is first used.
+    from api.collectors.google import GoogleCollector
+
     # Define data.
     places_api_key = os.environ['RYR_COLLECTOR_GOOGLE_PLACES_API_KEY']
 
@@ -15,6 +83,5 @@ def search(location):
     gmap = GoogleCollector()
     gmap.authenticate(api_key=places_api_key)
 
-    # Retrieve nearby places.
-    places_nearby = gmap.search_places_nearby(location)
-    return ConnexionResponse(body=places_nearby)
+    # Retrieve nearby places. The full payload is cached, so that all the projections can be served from it.
+    return gmap.search_places_nearby(location)
@@ -0,0 +1,23 @@
+"""Define the endpoint for the store resource."""
+import sqlite3
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.store import DEFAULT_RADIUS
+from api.store import MAX_LIMIT
+from api.store import PLACE_STORE
+from api.store import query_places
+
+
+def search(bbox=None, location=None, radius=DEFAULT_RADIUS, prefix=None, limit=MAX_LIMIT):
+    """Return the places of the local store located in a bounding box, within a radius, or matching a name prefix."""
+    if not PLACE_STORE.enabled:
+        return ConnexionResponse(status_code=503, body={'error': {'message': 'The place store is not enabled.'}})
+    try:
+        results = query_places(PLACE_STORE, bbox, location, radius, prefix, limit)
+    except ValueError as e:
+        return ConnexionResponse(status_code=400, body={'error': {'message': str(e)}})
+    except sqlite3.OperationalError as e:
+        # i.e. the database is locked, or its file is missing or unreadable.
+        return ConnexionResponse(status_code=503, body={'error': {'message': f'The place store is unavailable: {e}'}})
+    return ConnexionResponse(body={'status': 'OK', 'results': results})
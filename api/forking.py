@@ -0,0 +1,51 @@
+"""
+Manage the resources which must be re-created in every forked worker.
+
+When gunicorn preloads the application, everything built at import time is created once in the master process and
+shared with the workers through copy-on-write. This is perfect for read-only data (specification, routing tables,
+modules), but not for network resources: a socket opened in the master must never be used by several workers.
+
+The same goes for the Celery prefork pool, whose worker processes are forked from the main worker process.
+
+Modules owning such resources register a callback dropping them, and the callbacks are run in every child process right
+after `os.fork`, whoever forks: gunicorn, the Celery pool, or `multiprocessing`. The resources are then lazily
+re-created by each process on first use.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Callbacks to run in the child process after a fork.
+_after_fork_callbacks = []
+
+
+def register_after_fork(callback):
+    """
+    Register a function to call in the child process after a fork.
+
+    This function can also be used as a decorator.
+
+    :param callable callback: function to call, without any argument
+    :return: the callback.
+    """
+    if callback not in _after_fork_callbacks:
+        _after_fork_callbacks.append(callback)
+    return callback
+
+
+def run_after_fork_callbacks():
+    """
+    Run all the registered callbacks.
+
+    A failing callback is logged but does not prevent the other ones from running, nor the worker from starting.
+    """
+    for callback in list(_after_fork_callbacks):
+        try:
+            callback()
+        except Exception:
+            logger.exception(f'After fork callback "{callback.__qualname__}" failed.')
+
+
+# The callbacks run after every fork, provided this module was imported before it.
+os.register_at_fork(after_in_child=run_after_fork_callbacks)
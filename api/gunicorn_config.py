@@ -0,0 +1,43 @@
+"""
+Define the gunicorn configuration.
+
+Use it with ``gunicorn -c python:api.gunicorn_config api.wsgi``. When started with ``--preload``, the application,
+the specification and the heavy modules are loaded once in the master process and shared with the workers through
+copy-on-write. The network resources are re-created in each worker after the fork (see `api.forking`).
+
+The WSGI workers are threaded: a sync worker runs a single request at a time, so the admission control of the
+collections (see `api.admission`) would never see concurrent requests, and the requests would pile up in the socket
+backlog instead of being rejected. Each worker runs enough threads to fill the collection slots and their wait queue,
+plus `RYR_API_SPARE_THREADS` threads serving the health checks and the cached reads when they are full. The asyncio
+workers override the worker class from the command line, and ignore the threads.
+"""
+import gc
+import os
+
+from api.admission import ADMISSION_LIMIT
+from api.admission import ADMISSION_QUEUE_SIZE
+
+# Number of threads serving the requests which do not wait for a collection slot.
+SPARE_THREADS = int(os.environ.get('RYR_API_SPARE_THREADS', 4))
+
+worker_class = 'gthread'
+threads = ADMISSION_LIMIT + ADMISSION_QUEUE_SIZE + SPARE_THREADS
+
+
+def when_ready(server):
+    """Load the heavy modules in the master process when the application is preloaded."""
+    if not server.cfg.preload_app:
+        return
+
+    from api.connexion_utils import preload_modules
+    preload_modules()
+
+
+def pre_fork(server, worker):
+    """
+    Freeze the objects allocated by the master process.
+
+    Moving them to the permanent generation prevents the garbage collector of the workers from touching them, which
+    would otherwise copy the memory pages they live in.
+    """
+    gc.freeze()
@@ -0,0 +1,234 @@
+"""
+Define the deep health checks of the API.
+
+The basic health check only reports the state of the worker answering it. The deep health check also probes the
+dependencies of the API, and reports:
+
+* the round trip time to Redis, along with the usage of the shared connection pool,
+* the round trip time to the broker, along with the number of messages waiting in each queue,
+* the round trip time to the result backend,
+* the number of Celery workers, and the number of workers consuming each queue,
+* the hit rates of the result caches of the process which answered.
+
+Probing the dependencies is not free: the probes are therefore run at most once every `RYR_API_HEALTH_PROBE_TTL`
+seconds per process, and their report is cached in the meantime. While a thread runs the probes, the other ones keep
+serving the previous report. A failing probe is reported as such, along with the error, and marks the API as degraded:
+the other probes are still run.
+
+Probing the Celery workers is the most expensive: it broadcasts a request to all of them, and waits for their answers.
+Its report is therefore shared by all the API processes through Redis, and a single process at a time broadcasts the
+request.
+"""
+import logging
+import math
+import os
+import threading
+import time
+
+import orjson
+import redis
+
+from api.cache import PLACE_DETAILS_CACHE
+from api.cache import PLACES_CACHE
+from api.redis_pool import get_client
+from api.redis_pool import pool_stats
+
+# Number of seconds during which the report of the probes is reused.
+HEALTH_PROBE_TTL = float(os.environ.get('RYR_API_HEALTH_PROBE_TTL', 5))
+
+# Number of seconds to wait for the Celery workers to answer.
+HEALTH_PROBE_TIMEOUT = float(os.environ.get('RYR_API_HEALTH_PROBE_TIMEOUT', 1))
+
+# ID of the task whose result is read to probe the result backend. It never exists.
+PROBE_TASK_ID = 'ryr-health-probe'
+
+# Redis keys of the report of the Celery workers shared by the API processes, and of the lock of its refresh.
+WORKERS_REPORT_KEY = 'ryr:health:workers'
+WORKERS_LOCK_KEY = 'ryr:health:workers:lock'
+
+logger = logging.getLogger(__name__)
+
+
+class HealthCheck:
+    """
+    Define the deep health check of the API.
+
+    :param float ttl: number of seconds during which the report is reused
+    :param float timeout: number of seconds to wait for the Celery workers to answer
+    :param app: the Celery application. Uses the application of the workers if `None`.
+    :param redis_client: the Redis client. Uses the shared client if `None`.
+    """
+
+    def __init__(self, ttl, timeout, app=None, redis_client=None):
+        """Initialize the health check."""
+        self.ttl = ttl
+        self.timeout = timeout
+        self._app = app
+        self._redis_client = redis_client
+        self._lock = threading.Lock()
+        self._report = None
+        self._expires = 0.0
+
+    @property
+    def app(self):
+        """Return the Celery application."""
+        if self._app is None:
+            # Celery is only imported when the deep health check is first used.
+            from api.celery.worker import app
+
+            self._app = app
+        return self._app
+
+    @property
+    def redis_client(self):
+        """Return the Redis client."""
+        return self._redis_client or get_client()
+
+    def probe_redis(self):
+        """
+        Probe Redis.
+
+        :return: the usage of the shared connection pool.
+        :rtype: dict
+        """
+        self.redis_client.ping()
+        return {'pool': pool_stats()}
+
+    def probe_broker(self):
+        """
+        Probe the broker.
+
+        :return: the number of messages waiting in each queue.
+        :rtype: dict
+        """
+        queues = {}
+        with self.app.connection_for_read() as connection:
+            connection.connect()
+            channel = connection.default_channel
+            for name, queue in self.app.amqp.queues.items():
+                queues[name] = queue(channel).queue_declare().message_count
+        return {'queues': queues}
+
+    def probe_result_backend(self):
+        """
+        Probe the result backend.
+
+        :return: nothing else than the round trip time.
+        :rtype: dict
+        """
+        self.app.backend.get_task_meta(PROBE_TASK_ID)
+        return {}
+
+    def probe_workers(self):
+        """
+        Probe the Celery workers, reusing the report shared by the API processes while it is fresh.
+
+        If the report expired, a single process refreshes it: the other ones report the previous one in the meantime.
+        The workers are probed directly if Redis is unavailable.
+
+        :return: the number of workers, the number of workers consuming each queue, and when they were probed.
+        :rtype: dict
+        """
+        try:
+            shared = self.redis_client.get(WORKERS_REPORT_KEY)
+            report = orjson.loads(shared) if shared is not None else None
+            if report is not None and time.time() - report['checked_at'] < self.ttl:
+                return report
+            # The lock expires once the workers had the time to answer, even if its owner died.
+            refresh = self.redis_client.set(WORKERS_LOCK_KEY, 1, nx=True, ex=math.ceil(self.timeout) + 1)
+            if not refresh and report is not None:
+                return report
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read the shared report of the Celery workers: {e}')
+
+        report = self.inspect_workers()
+        try:
+            self.redis_client.set(WORKERS_REPORT_KEY, orjson.dumps(report), ex=math.ceil(self.ttl) * 10 + 1)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot share the report of the Celery workers: {e}')
+        return report
+
+    def inspect_workers(self):
+        """
+        Ask the Celery workers which queues they consume.
+
+        :return: the number of workers, the number of workers consuming each queue, and when they were probed.
+        :rtype: dict
+        """
+        active_queues = self.app.control.inspect(timeout=self.timeout).active_queues() or {}
+        consumers = {name: 0 for name in self.app.amqp.queues}
+        for queues in active_queues.values():
+            for queue in queues:
+                consumers[queue['name']] = consumers.get(queue['name'], 0) + 1
+        return {'workers': len(active_queues), 'consumers': consumers, 'checked_at': time.time()}
+
+    @staticmethod
+    def _run_probe(probe):
+        """
+        Run a probe, measuring its round trip time.
+
+        :param callable probe: the probe
+        :return: the status and the latency of the probe, in milliseconds, along with its report, or the error if it
+            failed.
+        :rtype: dict
+        """
+        start = time.perf_counter()
+        try:
+            report = probe()
+        except Exception as e:  # pylint: disable=broad-except
+            return {'status': 'error', 'error': str(e) or type(e).__name__}
+        return {'status': 'ok', 'latency': round((time.perf_counter() - start) * 1000, 3), **report}
+
+    def run(self):
+        """
+        Run all the probes.
+
+        :return: the overall status, i.e. "ok" or "degraded", the reports of the probes and the usage of the caches of
+            the current process.
+        :rtype: dict
+        """
+        dependencies = {
+            'redis': self._run_probe(self.probe_redis),
+            'broker': self._run_probe(self.probe_broker),
+            'result_backend': self._run_probe(self.probe_result_backend),
+            'workers': self._run_probe(self.probe_workers),
+        }
+        healthy = all(dependency['status'] == 'ok' for dependency in dependencies.values())
+        # The usage of the caches is counted by each process.
+        caches = {
+            cache.namespace: dict(cache.stats(), scope='process')
+            for cache in (PLACES_CACHE, PLACE_DETAILS_CACHE)
+        }
+        return {
+            'status': 'ok' if healthy else 'degraded',
+            'checked_at': time.time(),
+            'dependencies': dependencies,
+            'caches': caches,
+        }
+
+    def report(self):
+        """
+        Return the report of the probes, running them if the previous report expired.
+
+        Only one thread runs the probes at a time. The other ones return the previous report meanwhile, or wait for the
+        first one.
+
+        :return: the report (see `run`).
+        :rtype: dict
+        """
+        report = self._report
+        if report is not None and time.monotonic() < self._expires:
+            return report
+        if not self._lock.acquire(blocking=report is None):
+            return report
+        try:
+            if self._report is None or time.monotonic() >= self._expires:
+                self._report = self.run()
+                self._expires = time.monotonic() + self.ttl
+            return self._report
+        finally:
+            self._lock.release()
+
+
+# Deep health check of the API.
+HEALTH_CHECK = HealthCheck(HEALTH_PROBE_TTL, HEALTH_PROBE_TIMEOUT)
@@ -0,0 +1,148 @@
+"""
+Define the tracking of the most requested places.
+
+The details of the places are cached for a while, then collected again on the next request. For the places requested
+all the time, this means a regular cache miss, and a burst of provider calls whenever many entries expire together.
+
+The accesses to the place details are therefore counted in a Redis sorted set, along with the request needed to
+collect them again. A periodic task refreshes the hottest entries shortly before they expire. The counts decay at
+every refresh, so that the places which are not requested anymore are eventually evicted.
+
+Like the result cache, the tracking is an optimization: if Redis is unavailable, the errors are logged and nothing is
+tracked.
+"""
+import logging
+import os
+
+import orjson
+import redis
+
+from api.redis_pool import get_client
+from api.redis_pool import LuaScript
+
+logger = logging.getLogger(__name__)
+
+# Number of seconds between 2 refreshes.
+REFRESH_INTERVAL = int(os.environ.get('RYR_API_REFRESH_INTERVAL', 60))
+
+# Number of seconds before their expiration during which the entries get refreshed.
+REFRESH_AHEAD = int(os.environ.get('RYR_API_REFRESH_AHEAD', 300))
+
+# Maximum number of entries refreshed at each refresh, to bound the provider calls.
+REFRESH_QUOTA = int(os.environ.get('RYR_API_REFRESH_QUOTA', 20))
+
+# Maximum number of entries refreshed by a single task, their details being retrieved with batched requests.
+REFRESH_BATCH_SIZE = int(os.environ.get('RYR_API_REFRESH_BATCH_SIZE', 10))
+
+# Number of hottest entries eligible for a refresh.
+HOT_PLACES_COUNT = int(os.environ.get('RYR_API_HOT_PLACES_COUNT', 100))
+
+# Maximum number of tracked entries.
+HOT_PLACES_CAPACITY = int(os.environ.get('RYR_API_HOT_PLACES_CAPACITY', 1000))
+
+# Factor applied to the access counts at each refresh.
+HOT_PLACES_DECAY = float(os.environ.get('RYR_API_HOT_PLACES_DECAY', 0.9))
+
+# Maximum number of entries evicted per command. `unpack` is limited by the Lua stack, to about 8000 values.
+EVICTION_CHUNK = 1000
+
+# Apply the decay factor to the access counts, then evict the coldest entries beyond the capacity along with their
+# requests, by chunks. KEYS: scores, requests. ARGV: decay factor, capacity, chunk size.
+DECAY_SCRIPT = LuaScript("""
+redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', ARGV[1])
+local excess = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[2])
+local evicted = 0
+while evicted < excess do
+    local chunk = redis.call('ZRANGE', KEYS[1], 0, math.min(excess - evicted, tonumber(ARGV[3])) - 1)
+    redis.call('HDEL', KEYS[2], unpack(chunk))
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, #chunk - 1)
+    evicted = evicted + #chunk
+end
+return evicted
+""")
+
+
+class AccessTracker:
+    """
+    Define a tracker of the access frequency of cached entries.
+
+    :param str namespace: prefix of the Redis keys
+    :param int capacity: maximum number of tracked entries
+    :param float decay: factor applied to the access counts by `decay`
+    :param client: the Redis client. Uses the shared client if `None`.
+    """
+
+    def __init__(self, namespace, capacity, decay, client=None):
+        """Initialize the tracker."""
+        self.capacity = capacity
+        self.decay_factor = decay
+        self._client = client
+        self.scores_key = f'ryr:hot:{namespace}:scores'
+        self.requests_key = f'ryr:hot:{namespace}:requests'
+
+    @property
+    def client(self):
+        """Return the Redis client."""
+        return self._client or get_client()
+
+    def record(self, key, request):
+        """
+        Record an access to an entry.
+
+        :param str key: the key identifying the entry
+        :param dict request: the JSON serializable request needed to collect the entry again
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            # The argument order of ZINCRBY differs between the versions of redis-py.
+            pipe.execute_command('ZINCRBY', self.scores_key, 1, key)
+            pipe.hset(self.requests_key, key, orjson.dumps(request))
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot record the access to "{key}": {e}')
+
+    def hottest(self, count):
+        """
+        Retrieve the most accessed entries.
+
+        :param int count: maximum number of entries to retrieve
+        :return: a list of tuples containing the key and the request of each entry, the most accessed first.
+        :rtype: list(tuple(str, dict))
+        """
+        try:
+            keys = self.client.zrevrange(self.scores_key, 0, count - 1)
+            requests = self.client.hmget(self.requests_key, keys) if keys else []
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read the hottest entries: {e}')
+            return []
+        return [(key.decode(), orjson.loads(request)) for key, request in zip(keys, requests) if request is not None]
+
+    def decay(self):
+        """
+        Apply the decay factor to the access counts and evict the coldest entries beyond the capacity.
+
+        Everything happens atomically, in a single round trip.
+        """
+        try:
+            DECAY_SCRIPT(
+                [self.scores_key, self.requests_key],
+                [self.decay_factor, self.capacity, EVICTION_CHUNK],
+                client=self.client,
+            )
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot decay the access counts: {e}')
+
+
+def place_request(body):
+    """
+    Extract the request needed to collect the details of a place again.
+
+    :param dict body: the body of a place details request
+    :return: the arguments of the collection of the place details.
+    :rtype: dict
+    """
+    return {key: body.get(key) for key in ('place_id', 'name', 'address', 'latitude', 'longitude')}
+
+
+# Tracker of the place details requests.
+HOT_PLACES = AccessTracker('place', HOT_PLACES_CAPACITY, HOT_PLACES_DECAY)
@@ -0,0 +1,82 @@
+"""Define the helpers implementing HTTP caching (ETag, Cache-Control and conditional requests)."""
+import re
+
+from connexion.lifecycle import ConnexionResponse
+
+from api.cache import compute_etag
+
+# Suffix added to the ETags by Flask-Compress, identifying the content coding of the response (i.e. `"abc:gzip"`).
+ENCODING_SUFFIX_RE = re.compile(r':[\w-]+"$')
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check whether an `If-None-Match` header matches an ETag.
+
+    :param str if_none_match: value of the `If-None-Match` header
+    :param str etag: the current ETag of the resource
+    :return: `True` if the client already has the current representation.
+    :rtype: bool
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    # The comparison is weak, as mandated by RFC 7232, section 3.2. The content coding does not change the
+    # representation being validated either.
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if ENCODING_SUFFIX_RE.sub('"', candidate) == etag:
+            return True
+    return False
+
+
+def variant_etag(etag, variant):
+    """
+    Derive the ETag of a variant of a representation.
+
+    The variant is a deterministic transformation of the representation (i.e. a field projection), so its ETag can be
+    derived from the ETag of the representation without serializing the variant.
+
+    :param str etag: the ETag of the full representation
+    :param str variant: a canonical string identifying the variant (see `api.projection.canonical_fields`). The ETag is
+        returned unchanged if empty.
+    :return: the ETag of the variant.
+    :rtype: str
+    """
+    if not variant:
+        return etag
+    return compute_etag(f'{etag}{variant}'.encode())
+
+
+def cache_headers(etag, max_age, public=True):
+    """
+    Prepare the HTTP caching headers.
+
+    :param str etag: the ETag of the resource
+    :param int max_age: number of seconds the response can be cached for
+    :param bool public: whether shared caches (i.e. CDN) are allowed to store the response
+    :return: the headers.
+    :rtype: dict
+    """
+    visibility = 'public' if public else 'private'
+    return {
+        'ETag': etag,
+        'Cache-Control': f'{visibility}, max-age={max_age}',
+    }
+
+
+def not_modified(etag, max_age, public=True):
+    """
+    Create a `304 Not Modified` response.
+
+    :param str etag: the ETag of the resource
+    :param int max_age: number of seconds the response can be cached for
+    :param bool public: whether shared caches (i.e. CDN) are allowed to store the response
+    :return: the response.
+    :rtype: ConnexionResponse
+    """
+    return ConnexionResponse(status_code=304, headers=cache_headers(etag, max_age, public))
@@ -0,0 +1,232 @@
+"""
+Define the metrics driving the autoscaling of the Celery workers.
+
+The workers are sized after the demand rather than the peak, using:
+
+* the backlog of each queue, i.e. the number of messages waiting in it, read from the broker,
+* the age of the oldest message waiting in each queue, read from the broker,
+* the time spent by the tasks waiting in each queue, from their publication to their start,
+* the time spent by the workers running the tasks, by task and by provider.
+
+The tasks are stamped with their publication time in a message header. The workers record the waiting and service
+times in Redis as running sums and counts (see `api.celery.metrics`), so that the metrics of all the workers are
+aggregated, and the averages over any period can be computed from their increase. These times are only known once the
+tasks start: the age of the oldest waiting message, read from the header of the message at the head of each queue,
+reports a growing wait right away, even when no worker consumes the queue.
+
+The metrics are exposed in the Prometheus text format, to be scraped and served to the Kubernetes autoscalers by an
+external metrics adapter (see `charts/prometheus-adapter`).
+
+Like the result cache, the metrics are best effort: if Redis is unavailable, the errors are logged and the metrics are
+dropped.
+"""
+import logging
+import time
+
+import orjson
+import redis
+
+from api.health import HEALTH_CHECK
+from api.redis_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+# Header containing the publication time of a task, in seconds since the epoch.
+PUBLISHED_AT_HEADER = 'ryr_published_at'
+
+# Content type of the Prometheus text format.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class TaskMetrics:
+    """
+    Define the waiting and service times of the tasks, aggregated across the workers.
+
+    :param client: the Redis client. Uses the shared client if `None`.
+    """
+
+    key = 'ryr:metrics:tasks'
+
+    def __init__(self, client=None):
+        """Initialize the metrics."""
+        self._client = client
+
+    @property
+    def client(self):
+        """Return the Redis client."""
+        return self._client or get_client()
+
+    def record(self, task, provider, service_time, queue=None, wait_time=None):
+        """
+        Record the run of a task, in a single round trip.
+
+        :param str task: the name of the task
+        :param str provider: the provider queried by the task, or an empty string
+        :param float service_time: number of seconds spent running the task
+        :param str queue: the queue the task was consumed from
+        :param float wait_time: number of seconds the task spent in the queue. It is not recorded if `None`.
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hincrbyfloat(self.key, f'service:{task}:{provider}:sum', service_time)
+            pipe.hincrby(self.key, f'service:{task}:{provider}:count', 1)
+            if queue and wait_time is not None:
+                pipe.hincrbyfloat(self.key, f'wait:{queue}:sum', wait_time)
+                pipe.hincrby(self.key, f'wait:{queue}:count', 1)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot record the metrics of the "{task}" task: {e}')
+
+    def snapshot(self):
+        """
+        Read the metrics.
+
+        :return: the sums and counts of the waiting times by queue, and of the service times by task and provider.
+        :rtype: dict
+        """
+        try:
+            fields = self.client.hgetall(self.key)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read the task metrics: {e}')
+            fields = {}
+
+        snapshot = {'wait': {}, 'service': {}}
+        for field, value in fields.items():
+            kind, *labels, statistic = field.decode().split(':')
+            if kind not in snapshot:
+                continue
+            # The waiting times are labelled by queue, the service times by task and provider.
+            labels = tuple(labels) if kind == 'service' else labels[0]
+            snapshot[kind].setdefault(labels, {})[statistic] = float(value)
+        return snapshot
+
+
+def format_labels(**labels):
+    """
+    Format the labels of a sample.
+
+    :return: the labels, in the Prometheus text format.
+    :rtype: str
+    """
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def escape(value):
+    """Escape the value of a label."""
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def oldest_message_ages(app, now=None):
+    """
+    Measure how long the oldest message of each queue has been waiting, from its publication time.
+
+    Only the Redis transport is supported: each queue is a Redis list per priority step, whose oldest message is read
+    without consuming it. All the lists are read in a single round trip.
+
+    :param app: the Celery application
+    :param float now: the current time, in seconds since the epoch
+    :return: the age of the oldest message of each queue, in seconds, 0 if the queue is empty, or `None` if the
+        broker is not Redis.
+    :rtype: dict
+    """
+    now = now or time.time()
+    with app.connection_for_read() as connection:
+        connection.connect()
+        channel = connection.default_channel
+        if connection.transport.driver_type != 'redis':
+            return None
+        queues = []
+        pipe = channel.client.pipeline(transaction=False)
+        for queue in app.amqp.queues:
+            for step in channel.priority_steps:
+                # The lists are named after the queue and the priority step, like the transport does. The messages are
+                # pushed on the left, and consumed from the right.
+                queues.append(queue)
+                pipe.lindex(f'{queue}{channel.sep}{step}' if step else queue, -1)
+        heads = pipe.execute()
+
+    ages = {queue: 0.0 for queue in app.amqp.queues}
+    for queue, head in zip(queues, heads):
+        published_at = orjson.loads(head).get('headers', {}).get(PUBLISHED_AT_HEADER) if head else None
+        if published_at:
+            ages[queue] = max(ages[queue], now - published_at)
+    return ages
+
+
+def render(backlog, snapshot, ages=None):
+    """
+    Render the metrics in the Prometheus text format.
+
+    :param dict backlog: the number of messages waiting in each queue. The backlog is not rendered if `None`.
+    :param dict snapshot: the task metrics (see `TaskMetrics.snapshot`)
+    :param dict ages: the age of the oldest message of each queue. The ages are not rendered if `None`.
+    :return: the metrics.
+    :rtype: str
+    """
+    lines = []
+    if backlog is not None:
+        lines += [
+            '# HELP ryr_queue_backlog Number of messages waiting in a Celery queue.',
+            '# TYPE ryr_queue_backlog gauge',
+        ]
+        lines += [f'ryr_queue_backlog{format_labels(queue=queue)} {count}' for queue, count in sorted(backlog.items())]
+
+    if ages is not None:
+        lines += [
+            '# HELP ryr_queue_oldest_message_age_seconds Time spent by the oldest message waiting in a Celery queue.',
+            '# TYPE ryr_queue_oldest_message_age_seconds gauge',
+        ]
+        lines += [
+            f'ryr_queue_oldest_message_age_seconds{format_labels(queue=queue)} {age:.3f}'
+            for queue, age in sorted(ages.items())
+        ]
+
+    lines += [
+        '# HELP ryr_task_wait_seconds Time spent by the tasks in a Celery queue before being started.',
+        '# TYPE ryr_task_wait_seconds summary',
+    ]
+    for queue, statistics in sorted(snapshot['wait'].items()):
+        labels = format_labels(queue=queue)
+        lines.append(f'ryr_task_wait_seconds_sum{labels} {statistics.get("sum", 0.0)}')
+        lines.append(f'ryr_task_wait_seconds_count{labels} {int(statistics.get("count", 0))}')
+
+    lines += [
+        '# HELP ryr_task_service_seconds Time spent by the Celery workers running the tasks.',
+        '# TYPE ryr_task_service_seconds summary',
+    ]
+    for (task, provider), statistics in sorted(snapshot['service'].items()):
+        labels = format_labels(task=task, provider=provider)
+        lines.append(f'ryr_task_service_seconds_sum{labels} {statistics.get("sum", 0.0)}')
+        lines.append(f'ryr_task_service_seconds_count{labels} {int(statistics.get("count", 0))}')
+    return '\n'.join(lines) + '\n'
+
+
+def collect(health_check=None, task_metrics=None):
+    """
+    Collect the backlog of the queues, the age of their oldest message and the task metrics.
+
+    The backlog and the ages are read from the broker on every call: they are meant to be scraped every few seconds,
+    like the probes of the health check.
+
+    :param HealthCheck health_check: the health check probing the broker. Uses the health check of the API if `None`.
+    :param TaskMetrics task_metrics: the task metrics. Uses the shared metrics if `None`.
+    :return: the metrics, in the Prometheus text format.
+    :rtype: str
+    """
+    health_check = health_check or HEALTH_CHECK
+    task_metrics = task_metrics or TASK_METRICS
+    try:
+        backlog = health_check.probe_broker()['queues']
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(f'Cannot read the backlog of the queues: {e}')
+        backlog = None
+    try:
+        ages = oldest_message_ages(health_check.app)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(f'Cannot read the age of the oldest messages: {e}')
+        ages = None
+    return render(backlog, task_metrics.snapshot(), ages)
+
+
+# Task metrics shared by the workers and the API.
+TASK_METRICS = TaskMetrics()
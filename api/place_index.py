@@ -0,0 +1,134 @@
+"""
+Define the cross-provider index of places.
+
+Matching a place from one provider to another (i.e. a Google place to a Yelp business) requires a search request. The
+index remembers the matches found by the previous lookups, so that the details of a known place can be retrieved
+directly.
+
+Every match is stored in both directions with a confidence score and expires after a while, so that closed or moved
+businesses eventually get matched again. Like the result cache, the index is an optimization: if Redis is unavailable,
+the errors are logged and the index behaves as if it was empty.
+"""
+from dataclasses import dataclass
+import logging
+import os
+
+import orjson
+import redis
+
+from api.redis_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PlaceMatch:
+    """Define the match of a place in another provider."""
+
+    place_id: str = ''
+    confidence: float = 0.0
+
+
+class PlaceIndex:
+    """
+    Define the index matching the places across the providers.
+
+    :param int ttl: number of seconds before a match expires
+    :param float min_confidence: minimum confidence, between 0 and 1, for a match to be stored
+    :param client: the Redis client. Uses the shared client if `None`.
+    """
+
+    def __init__(self, ttl, min_confidence, client=None):
+        """Initialize the index."""
+        self.ttl = ttl
+        self.min_confidence = min_confidence
+        self._client = client
+
+    @property
+    def client(self):
+        """Return the Redis client."""
+        return self._client or get_client()
+
+    @staticmethod
+    def _key(provider, place_id, other_provider):
+        """Return the Redis key storing the match of a place in another provider."""
+        return f'ryr:xref:{provider}:{place_id}:{other_provider}'
+
+    def get(self, provider, place_id, other_provider):
+        """
+        Retrieve the match of a place in another provider.
+
+        :param str provider: the provider of the known place
+        :param str place_id: the ID of the known place
+        :param str other_provider: the provider to find the place in
+        :return: the match, or `None` if the place is not indexed.
+        :rtype: PlaceMatch
+        """
+        try:
+            value = self.client.get(self._key(provider, place_id, other_provider))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot read the match of "{provider}:{place_id}" in {other_provider}: {e}')
+            return None
+        if value is None:
+            return None
+        return PlaceMatch(**orjson.loads(value))
+
+    def set(self, provider, place_id, other_provider, other_place_id, confidence):
+        """
+        Store the match of a place in both directions.
+
+        :param str provider: the provider of the first place
+        :param str place_id: the ID of the first place
+        :param str other_provider: the provider of the second place
+        :param str other_place_id: the ID of the second place
+        :param float confidence: the confidence in the match, between 0 and 1
+        :return: `True` if the match was stored.
+        :rtype: bool
+        """
+        if confidence < self.min_confidence:
+            return False
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(
+                self._key(provider, place_id, other_provider),
+                orjson.dumps(PlaceMatch(other_place_id, confidence)),
+                ex=self.ttl,
+            )
+            pipe.set(
+                self._key(other_provider, other_place_id, provider),
+                orjson.dumps(PlaceMatch(place_id, confidence)),
+                ex=self.ttl,
+            )
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot store the match of "{provider}:{place_id}" in {other_provider}: {e}')
+            return False
+        return True
+
+    def forget(self, provider, place_id, other_provider):
+        """
+        Remove the match of a place in both directions, i.e. when it does not exist anymore.
+
+        :param str provider: the provider of the known place
+        :param str place_id: the ID of the known place
+        :param str other_provider: the provider the place was matched in
+        """
+        key = self._key(provider, place_id, other_provider)
+        try:
+            value = self.client.get(key)
+            pipe = self.client.pipeline()
+            pipe.delete(key)
+            if value is not None:
+                # The reverse match is found from the forward one.
+                other_place_id = orjson.loads(value)['place_id']
+                pipe.delete(self._key(other_provider, other_place_id, provider))
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Cannot remove the match of "{provider}:{place_id}" in {other_provider}: {e}')
+
+
+# Index shared by the collection tasks.
+PLACE_INDEX = PlaceIndex(
+    int(os.environ.get('RYR_API_PLACE_INDEX_TTL', 30 * 24 * 3600)),
+    float(os.environ.get('RYR_API_PLACE_INDEX_MIN_CONFIDENCE', 0.6)),
+)
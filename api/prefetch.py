@@ -0,0 +1,44 @@
+"""
+Define the prefetching of the place details.
+
+The clients usually request the details of a few of the places returned by a nearby search. Once enabled, the details
+of the first results of every nearby search are collected in the background, with a low priority, so that the
+following requests are served from the place details cache. The prefetching tasks are sent to the prefetch lane.
+"""
+import os
+
+# Number of results of a nearby search whose details are prefetched. The prefetching is disabled if 0.
+PREFETCH_TOP = int(os.environ.get('RYR_API_PREFETCH_TOP', 0))
+
+# Maximum rate of the prefetching tasks, per worker, using the Celery notation (i.e. "30/m").
+PREFETCH_RATE_LIMIT = os.environ.get('RYR_API_PREFETCH_RATE_LIMIT', '30/m')
+
+
+def prefetch_candidates(search_results, top):
+    """
+    Select the places whose details should be prefetched.
+
+    Both the Google nearby search responses and the merged ones are supported. The details are collected using the
+    Google place IDs, therefore the places only reported by the other providers are skipped.
+
+    :param dict search_results: a nearby search response
+    :param int top: maximum number of places to select
+    :return: the first places of the search, as dictionaries containing their `place_id`, `name`, `address`,
+        `latitude` and `longitude`.
+    :rtype: list(dict)
+    """
+    candidates = []
+    for result in (search_results or {}).get('results', []):
+        if len(candidates) >= top:
+            break
+        if result.get('provider', 'google') != 'google' or not result.get('place_id'):
+            continue
+        location = result.get('geometry', {}).get('location', {})
+        candidates.append({
+            'place_id': result['place_id'],
+            'name': result.get('name', ''),
+            'address': result.get('address', result.get('vicinity', '')),
+            'latitude': result.get('latitude', location.get('lat')),
+            'longitude': result.get('longitude', location.get('lng')),
+        })
+    return candidates
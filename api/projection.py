@@ -0,0 +1,96 @@
+"""
+Define the field projection of the provider payloads.
+
+The providers return much more information than most clients need (photos, viewports, plus codes, etc.). A projection
+keeps only the requested fields. The fields are expressed as comma-separated dotted paths, for instance
+``name,place_id,geometry.location``.
+"""
+import functools
+
+
+@functools.lru_cache(maxsize=256)
+def parse_fields(fields):
+    """
+    Parse a list of fields into a projection tree.
+
+    Each node of the tree maps a key to its sub-tree, or to `None` if the whole value must be kept.
+
+    :param str fields: comma-separated dotted paths
+    :return: the projection tree. It must not be modified since it is cached.
+    :rtype: dict
+    """
+    tree = {}
+    for field in fields.split(','):
+        keys = [key.strip() for key in field.split('.') if key.strip()]
+        if not keys:
+            continue
+        node = tree
+        for key in keys[:-1]:
+            # A parent which is already fully kept absorbs its children.
+            if key in node and node[key] is None:
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[keys[-1]] = None
+    return tree
+
+
+def canonical_fields(fields):
+    """
+    Normalize a list of fields, so that the lists selecting the same projection are equal.
+
+    The paths are sorted, the duplicates and the children of a fully kept parent are dropped.
+
+    :param str fields: comma-separated dotted paths
+    :return: the canonical comma-separated dotted paths, or `None` if no field is selected.
+    :rtype: str
+    """
+    if not fields:
+        return None
+
+    def paths(tree, prefix):
+        for key, subtree in tree.items():
+            if subtree is None:
+                yield f'{prefix}{key}'
+            else:
+                yield from paths(subtree, f'{prefix}{key}.')
+
+    return ','.join(sorted(paths(parse_fields(fields), ''))) or None
+
+
+def project(value, tree):
+    """
+    Apply a projection tree to a value.
+
+    Lists are projected item by item. Missing keys are ignored.
+
+    :param value: the value to project
+    :param dict tree: the projection tree, as returned by `parse_fields`
+    :return: the projected value.
+    """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+
+def project_search_results(search_results, fields, results_key='results'):
+    """
+    Project each result of a search response.
+
+    The other entries of the response (i.e. status, pagination token) are kept as is.
+
+    :param dict search_results: the search response of a provider
+    :param str fields: comma-separated dotted paths. No projection is applied if empty.
+    :param str results_key: the key containing the list of results
+    :return: the projected search response.
+    :rtype: dict
+    """
+    if not fields or not search_results or results_key not in search_results:
+        return search_results
+    projected = dict(search_results)
+    projected[results_key] = project(search_results[results_key], parse_fields(fields))
+    return projected
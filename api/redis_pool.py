@@ -0,0 +1,194 @@
+"""
+Define the Redis connection pool shared by the whole process.
+
+The result cache, the place index, the access tracker and the audit store all talk to Redis. They share a single
+bounded pool of connections instead of each opening their own, so that the number of connections per process stays
+small and predictable. When the pool is exhausted, the callers wait for a connection to be released, up to
+`RYR_REDIS_POOL_TIMEOUT` seconds.
+
+The pool is configured like Celery: `REDIS_URL` if set, otherwise the result backend from `CELERY_RESULT_BACKEND` if it
+is a Redis URL, otherwise the local Redis server.
+
+The pool is dropped after a fork (see the `forking` module), and re-created if it is used from another process anyway,
+so that a connection is never shared between processes.
+
+The pool reports its usage (see `pool_stats`): the number of checkouts is the number of round trips to Redis, a
+pipeline or a Lua script costing a single one.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import redis
+
+from api.forking import register_after_fork
+
+# Maximum number of connections per process.
+REDIS_MAX_CONNECTIONS = int(os.environ.get('RYR_REDIS_MAX_CONNECTIONS', 16))
+
+# Number of seconds to wait for a connection when all of them are in use.
+REDIS_POOL_TIMEOUT = float(os.environ.get('RYR_REDIS_POOL_TIMEOUT', 5))
+
+# Number of seconds to wait for Redis to answer.
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('RYR_REDIS_SOCKET_TIMEOUT', 5))
+
+# Shared pool and client, lazily created, along with the ID of the process which created them.
+_pool = None
+_client = None
+_pid = None
+_lock = threading.Lock()
+
+
+def redis_url():
+    """
+    Return the URL of the Redis server.
+
+    :return: the URL, from `REDIS_URL`, or `CELERY_RESULT_BACKEND` if it points to Redis.
+    :rtype: str
+    """
+    url = os.environ.get('REDIS_URL')
+    if url:
+        return url
+    backend = os.environ.get('CELERY_RESULT_BACKEND', '')
+    if backend.startswith(('redis://', 'rediss://', 'unix://')):
+        return backend
+    return 'redis://'
+
+
+class SharedConnectionPool(redis.BlockingConnectionPool):
+    """Define a bounded connection pool recording its usage."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the pool."""
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_time = 0.0
+        super().__init__(*args, **kwargs)
+
+    def get_connection(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        """Check a connection out, recording the time spent waiting for it."""
+        start = time.perf_counter()
+        connection = super().get_connection(*args, **kwargs)
+        with self._stats_lock:
+            self.wait_time += time.perf_counter() - start
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return connection
+
+    def release(self, connection):
+        """Check a connection back in."""
+        super().release(connection)
+        with self._stats_lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def stats(self):
+        """
+        Report the usage of the pool.
+
+        :return: the maximum number of connections, the number of connections in use and their peak, the number of
+            checkouts (i.e. round trips) and the total time spent waiting for a connection, in seconds.
+        :rtype: dict
+        """
+        with self._stats_lock:
+            return {
+                'max_connections': self.max_connections,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'checkouts': self.checkouts,
+                'wait_time': self.wait_time,
+            }
+
+
+def get_pool():
+    """
+    Return the connection pool of the current process, creating it if needed.
+
+    :return: the connection pool.
+    :rtype: SharedConnectionPool
+    """
+    global _pool, _client, _pid  # pylint: disable=global-statement
+    pid = os.getpid()
+    if _pool is None or _pid != pid:
+        with _lock:
+            if _pool is None or _pid != pid:
+                _pool = SharedConnectionPool.from_url(
+                    redis_url(),
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                )
+                _client = None
+                _pid = pid
+    return _pool
+
+
+def get_client():
+    """
+    Return the Redis client of the current process, backed by the shared connection pool.
+
+    :return: the Redis client.
+    :rtype: redis.StrictRedis
+    """
+    global _client  # pylint: disable=global-statement
+    pool = get_pool()
+    client = _client
+    if client is None or client.connection_pool is not pool:
+        client = _client = redis.StrictRedis(connection_pool=pool)
+    return client
+
+
+def pool_stats():
+    """
+    Report the usage of the connection pool of the current process.
+
+    :return: the statistics of the pool (see `SharedConnectionPool.stats`), or `None` if it was not used yet.
+    :rtype: dict
+    """
+    pool = _pool
+    if pool is None or _pid != os.getpid():
+        return None
+    return pool.stats()
+
+
+@register_after_fork
+def reset_pool():
+    """Drop the pool and the client inherited from the parent process."""
+    global _pool, _client, _pid  # pylint: disable=global-statement
+    _pool = None
+    _client = None
+    _pid = None
+
+
+class LuaScript:
+    """
+    Define a Lua script, run atomically by Redis in a single round trip.
+
+    The script is invoked by its SHA1 digest. It is only sent in full when Redis does not know it yet, i.e. on first use
+    or after a restart of Redis.
+
+    :param str source: the source of the script
+    """
+
+    def __init__(self, source):
+        """Initialize the script."""
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    def __call__(self, keys=(), args=(), client=None):
+        """
+        Run the script.
+
+        :param list(str) keys: the keys accessed by the script
+        :param list args: the other arguments of the script
+        :param client: the Redis client. Uses the shared client if `None`.
+        :return: the value returned by the script.
+        """
+        client = client or get_client()
+        try:
+            return client.evalsha(self.sha, len(keys), *keys, *args)
+        except redis.exceptions.NoScriptError:
+            return client.eval(self.source, len(keys), *keys, *args)
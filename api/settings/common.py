@@ -5,10 +5,29 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 SPECIFICATION_DIR = os.path.join(BASE_DIR, 'openapi')
 SPECIFICATION_FILE = 'openapi.yaml'
+# The artifacts of the specification are pickles: they must be kept in a directory only the API user can write to.
+SPECIFICATION_CACHE_DIR = os.environ.get(
+    'RYR_API_SPECIFICATION_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser(os.path.join('~', '.cache'))), 'ryr-api'),
+)
 
 # Server parameters.
 PORT = 8000
 IMPORT_NAME = 'ryr'
 
+# Modules to load in the gunicorn master process when the application is preloaded.
+PRELOAD_MODULES = [
+    'api.celery.tasks',
+    'api.collectors.google',
+    'api.collectors.yelp',
+]
+
 # Resolver parameters.
 RESOLVER_MODULE_NAME = 'api.controller'
+ASYNC_RESOLVER_MODULE_NAME = 'api.aio_controller'
+
+# Compression parameters.
+COMPRESS_ALGORITHM = ['br', 'gzip']
+COMPRESS_BR_LEVEL = 4
+COMPRESS_MIMETYPES = ['application/json', 'application/problem+json', 'text/html']
+COMPRESS_MIN_SIZE = 500
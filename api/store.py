@@ -0,0 +1,464 @@
+"""
+Define the local persistent store of the collected places.
+
+The combined details of every collected place are kept in a SQLite database, so that they can be queried without
+calling the providers again:
+
+* an R*Tree index on the coordinates answers the bounding box and radius queries,
+* an FTS5 index on the name and address answers the name prefix queries.
+
+Both indexes are kept up to date by triggers, so that a place is written with an update, or an insert if it is new. The
+bulk loads rebuild the indexes at once instead. The database uses the WAL journal, allowing the API processes to read
+while a worker writes.
+
+The store is local to a single host: the WAL journal relies on shared memory, which does not work on network
+filesystems (NFS, SMB, etc.). The API processes and the workers writing to the store must therefore run on the same
+host, and share the database file through a local volume. Each host of a multi-host deployment has its own store.
+
+The statements only rely on SQLite 3.16 (Debian stretch), compiled with the R*Tree and FTS5 modules: `ON CONFLICT`
+upserts require SQLite 3.24. The modules are checked once the store is enabled, so that a SQLite lacking them fails
+at startup instead of on every write.
+
+The store is disabled unless `RYR_API_STORE_PATH` is set. Writing to the store is not fatal: the errors are logged and
+the collection goes on.
+"""
+import contextlib
+import dataclasses
+import functools
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import orjson
+
+from api.collectors.base import BusinessInfo
+from api.collectors.matching import EARTH_RADIUS
+from api.collectors.matching import haversine
+from api.forking import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of places returned by a query.
+MAX_LIMIT = 500
+
+# Default distance, in meters, of the radius queries.
+DEFAULT_RADIUS = 500.0
+
+# Length, in meters, of a degree of latitude.
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+# Words of a name prefix query.
+WORD_RE = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id INTEGER PRIMARY KEY,
+    place_id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    address TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    details BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree(
+    id, min_latitude, max_latitude, min_longitude, max_longitude
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(
+    name, address, content='places', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+"""
+
+# Triggers keeping the indexes up to date.
+TRIGGERS = [
+    """
+CREATE TRIGGER IF NOT EXISTS places_ai AFTER INSERT ON places BEGIN
+    INSERT INTO places_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    INSERT INTO places_fts(rowid, name, address) VALUES (new.id, new.name, new.address);
+END
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS places_au AFTER UPDATE ON places BEGIN
+    UPDATE places_rtree SET min_latitude = new.latitude, max_latitude = new.latitude,
+        min_longitude = new.longitude, max_longitude = new.longitude WHERE id = new.id;
+    INSERT INTO places_fts(places_fts, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+    INSERT INTO places_fts(rowid, name, address) VALUES (new.id, new.name, new.address);
+END
+""",
+]
+
+# The places are updated first, then inserted if they do not exist yet: each statement only fires the triggers of the
+# rows it changes.
+UPDATE = """
+UPDATE places SET name = ?, address = ?, latitude = ?, longitude = ?, details = ?, updated_at = ? WHERE place_id = ?
+"""
+INSERT = """
+INSERT OR IGNORE INTO places (place_id, name, address, latitude, longitude, details, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Virtual table modules required by the store, with the arguments of a table using them.
+REQUIRED_MODULES = {
+    'rtree': 'id, min_latitude, max_latitude',
+    'fts5': 'name',
+}
+
+
+class StoreUnavailable(RuntimeError):
+    """Define the error raised when the SQLite library cannot run the store."""
+
+
+@functools.lru_cache(maxsize=None)
+def check_sqlite(modules=tuple(REQUIRED_MODULES.items())):
+    """
+    Check that the SQLite library provides the virtual table modules required by the store.
+
+    :param tuple modules: the modules to check, as tuples containing their name and the arguments of a table
+    :raises StoreUnavailable: if a module is missing
+    """
+    connection = sqlite3.connect(':memory:')
+    missing = []
+    try:
+        for module, arguments in modules:
+            try:
+                connection.execute(f'CREATE VIRTUAL TABLE check_{module} USING {module}({arguments})')
+            except sqlite3.OperationalError:
+                missing.append(module)
+    finally:
+        connection.close()
+    if missing:
+        raise StoreUnavailable(f'SQLite {sqlite3.sqlite_version} lacks the modules required by the place store: '
+                               f'{", ".join(missing)}.')
+
+
+def longitude_ranges(west, east):
+    """
+    Split a longitude interval crossing the antimeridian.
+
+    :param float west: the western longitude, which may be lower than -180 or greater than `east`
+    :param float east: the eastern longitude, which may be greater than 180
+    :return: the intervals covering the same longitudes, within [-180, 180].
+    :rtype: list(tuple)
+    """
+    if east - west >= 360:
+        return [(-180.0, 180.0)]
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    if west > east:
+        return [(west, 180.0), (-180.0, east)]
+    return [(west, east)]
+
+
+def prefix_query(prefix):
+    """
+    Convert a name prefix to a FTS5 query.
+
+    Every word must match, the last one being a prefix.
+
+    :param str prefix: the beginning of a name, i.e. "epoch cof"
+    :return: the FTS5 query, or `None` if the prefix does not contain any word.
+    :rtype: str
+    """
+    words = WORD_RE.findall(prefix)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return f'name : ({" ".join(terms)})'
+
+
+class PlaceStore:
+    """
+    Define the store of the collected places.
+
+    Each thread uses its own connection. The store is single-host only: its database must be on a local filesystem.
+    The reads return nothing if the store is disabled.
+
+    :param str path: path of the SQLite database. The store is disabled if empty.
+    :raises StoreUnavailable: if the store is enabled, but the SQLite library lacks the modules it requires
+    """
+
+    def __init__(self, path):
+        """Initialize the store."""
+        self.path = path
+        self._local = threading.local()
+        if self.enabled:
+            check_sqlite()
+
+    @property
+    def enabled(self):
+        """Check whether the store is enabled."""
+        return bool(self.path)
+
+    @property
+    def connection(self):
+        """Return the connection of the current thread, creating the database if needed."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            for trigger in TRIGGERS:
+                connection.execute(trigger)
+            self._local.connection = connection
+        return connection
+
+    def reset(self):
+        """Drop the connections, i.e. the ones inherited from the parent process."""
+        self._local = threading.local()
+
+    def put(self, place_id, details):
+        """
+        Store the details of a place, replacing the previous ones.
+
+        :param str place_id: the ID of the place
+        :param BusinessInfo details: the combined details of the place
+        """
+        if not self.enabled:
+            return
+        try:
+            self.put_many([(place_id, dataclasses.asdict(details))])
+        except sqlite3.Error as e:
+            logger.warning(f'Cannot store the details of "{place_id}": {e}')
+
+    def put_many(self, places):
+        """
+        Store the details of several places in a single transaction, replacing the previous ones.
+
+        :param iterable places: the places, as tuples containing their ID and their details as a dictionary
+        :raises sqlite3.Error: if the places cannot be stored
+        """
+        with self.transaction() as connection:
+            self._write(connection, places)
+
+    def _write(self, connection, places):
+        """Update the places already stored, then insert the new ones."""
+        rows = list(self._rows(places))
+        connection.executemany(UPDATE, (row[1:] + row[:1] for row in rows))
+        connection.executemany(INSERT, rows)
+
+    @staticmethod
+    def _rows(places):
+        """Convert places to rows of the places table."""
+        updated_at = time.time()
+        for place_id, details in places:
+            yield place_id, details['name'], details['address'], details['latitude'], details['longitude'], \
+                orjson.dumps(details), updated_at
+
+    def load(self, chunks):
+        """
+        Store a large number of places in a single transaction, replacing the previous ones.
+
+        Updating the indexes row by row is the bottleneck of the bulk loads. The triggers are therefore disabled while
+        the places are written, then the indexes are rebuilt at once. The readers keep seeing the previous state of
+        the store until the transaction is committed.
+
+        :param iterable chunks: the chunks of places, as lists of tuples containing their ID and their details as a
+            dictionary
+        :return: the number of places stored.
+        :rtype: int
+        :raises sqlite3.Error: if the places cannot be stored
+        """
+        count = 0
+        with self.transaction() as connection:
+            connection.execute('DROP TRIGGER IF EXISTS places_ai')
+            connection.execute('DROP TRIGGER IF EXISTS places_au')
+            for places in chunks:
+                self._write(connection, places)
+                count += len(places)
+            connection.execute('DELETE FROM places_rtree')
+            connection.execute(
+                'INSERT INTO places_rtree SELECT id, latitude, latitude, longitude, longitude FROM places')
+            connection.execute("INSERT INTO places_fts(places_fts) VALUES ('rebuild')")
+            for trigger in TRIGGERS:
+                connection.execute(trigger)
+        return count
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Run the statements in a transaction, committed on success and rolled back on error."""
+        connection = self.connection
+        connection.execute('BEGIN')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def iter_chunks(self, size):
+        """
+        Iterate over all the stored places, by chunks.
+
+        :param int size: maximum number of places per chunk
+        :return: the chunks of places, as lists of tuples containing their ID and their details as a dictionary.
+        :rtype: iterator(list(tuple))
+        """
+        if not self.enabled:
+            return
+        cursor = self.connection.execute('SELECT place_id, details FROM places ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield [(place_id, orjson.loads(details)) for place_id, details in rows]
+
+    def get(self, place_id):
+        """
+        Retrieve the details of a place.
+
+        :param str place_id: the ID of the place
+        :return: the details of the place, or `None` if the place is not stored.
+        :rtype: BusinessInfo
+        """
+        if not self.enabled:
+            return None
+        row = self.connection.execute('SELECT details FROM places WHERE place_id = ?', (place_id, )).fetchone()
+        return BusinessInfo(**orjson.loads(row[0])) if row else None
+
+    def within_bbox(self, south, west, north, east, limit=MAX_LIMIT):
+        """
+        Find the places located in a bounding box.
+
+        A box whose western longitude is greater than its eastern one crosses the antimeridian: it is split in two.
+
+        :param float south: minimum latitude
+        :param float west: western longitude
+        :param float north: maximum latitude
+        :param float east: eastern longitude
+        :param int limit: maximum number of places to return
+        :return: the places, as dictionaries containing their ID and details.
+        :rtype: list(dict)
+        """
+        if not self.enabled:
+            return []
+        limit = min(limit, MAX_LIMIT)
+        results = []
+        for range_west, range_east in longitude_ranges(west, east):
+            rows = self.connection.execute(
+                'SELECT p.place_id, p.details FROM places_rtree r JOIN places p ON p.id = r.id '
+                'WHERE r.min_latitude >= ? AND r.max_latitude <= ? AND r.min_longitude >= ? AND r.max_longitude <= ? '
+                'LIMIT ?',
+                (south, north, range_west, range_east, limit - len(results)),
+            )
+            results += [self._to_result(place_id, details) for place_id, details in rows]
+            if len(results) >= limit:
+                break
+        return results
+
+    def within_radius(self, latitude, longitude, radius, limit=MAX_LIMIT):
+        """
+        Find the places located within a distance of a point, closest first.
+
+        The R*Tree selects the places in the bounding box of the circle, then the exact distances are computed.
+
+        :param float latitude: latitude of the center
+        :param float longitude: longitude of the center
+        :param float radius: maximum distance, in meters
+        :param int limit: maximum number of places to return
+        :return: the places, as dictionaries containing their ID, details and distance in meters.
+        :rtype: list(dict)
+        """
+        if not self.enabled:
+            return []
+        latitude_delta = radius / METERS_PER_DEGREE
+        longitude_delta = latitude_delta / max(math.cos(math.radians(latitude)), 1e-6)
+        results = []
+        # The circle may cross the antimeridian.
+        for west, east in longitude_ranges(longitude - longitude_delta, longitude + longitude_delta):
+            rows = self.connection.execute(
+                'SELECT p.place_id, p.details, p.latitude, p.longitude FROM places_rtree r JOIN places p '
+                'ON p.id = r.id WHERE r.min_latitude >= ? AND r.max_latitude <= ? AND r.min_longitude >= ? '
+                'AND r.max_longitude <= ?',
+                (latitude - latitude_delta, latitude + latitude_delta, west, east),
+            )
+            for place_id, details, place_latitude, place_longitude in rows:
+                distance = haversine(latitude, longitude, place_latitude, place_longitude)
+                if distance <= radius:
+                    results.append(dict(self._to_result(place_id, details), distance=distance))
+        results.sort(key=lambda result: result['distance'])
+        return results[:min(limit, MAX_LIMIT)]
+
+    def with_name_prefix(self, prefix, limit=MAX_LIMIT):
+        """
+        Find the places whose name starts with some words.
+
+        The places are not ranked: ranking every match of a short prefix costs milliseconds on a large store, while the
+        first matches are found in microseconds.
+
+        :param str prefix: the beginning of the name, i.e. "epoch cof"
+        :param int limit: maximum number of places to return
+        :return: the places, as dictionaries containing their ID and details.
+        :rtype: list(dict)
+        """
+        query = prefix_query(prefix)
+        if not query or not self.enabled:
+            return []
+        rows = self.connection.execute(
+            'SELECT p.place_id, p.details FROM places_fts f JOIN places p ON p.id = f.rowid '
+            'WHERE places_fts MATCH ? LIMIT ?',
+            (query, min(limit, MAX_LIMIT)),
+        )
+        return [self._to_result(place_id, details) for place_id, details in rows]
+
+    @staticmethod
+    def _to_result(place_id, details):
+        """Create the result representing a stored place."""
+        return dict(orjson.loads(details), place_id=place_id)
+
+
+def parse_coordinates(value, count):
+    """
+    Parse comma-separated coordinates.
+
+    :param str value: the coordinates, i.e. "30.31,-97.72"
+    :param int count: the number of coordinates expected
+    :return: the coordinates.
+    :rtype: list(float)
+    :raises ValueError: if the coordinates are malformed
+    """
+    coordinates = [float(coordinate) for coordinate in value.split(',')]
+    if len(coordinates) != count:
+        raise ValueError(f'{count} comma-separated coordinates are expected, got "{value}".')
+    return coordinates
+
+
+def query_places(store, bbox=None, location=None, radius=DEFAULT_RADIUS, prefix=None, limit=MAX_LIMIT):
+    """
+    Query the stored places using a single criterion.
+
+    :param PlaceStore store: the store to query
+    :param str bbox: the bounding box, as "south,west,north,east"
+    :param str location: the center of the radius query, as "latitude,longitude"
+    :param float radius: the distance of the radius query, in meters
+    :param str prefix: the beginning of the name of the places
+    :param int limit: maximum number of places to return
+    :return: the places found.
+    :rtype: list(dict)
+    :raises ValueError: if not exactly one criterion is provided, or if it is malformed
+    """
+    criteria = [criterion for criterion in (bbox, location, prefix) if criterion]
+    if len(criteria) != 1:
+        raise ValueError('Exactly one of "bbox", "location" or "prefix" must be provided.')
+    if bbox:
+        return store.within_bbox(*parse_coordinates(bbox, 4), limit=limit)
+    if location:
+        return store.within_radius(*parse_coordinates(location, 2), radius, limit=limit)
+    return store.with_name_prefix(prefix, limit=limit)
+
+
+# Store shared by the collection tasks and the API.
+PLACE_STORE = PlaceStore(os.environ.get('RYR_API_STORE_PATH', ''))
+
+
+@register_after_fork
+def reset_store():
+    """Drop the connections inherited from the parent process."""
+    PLACE_STORE.reset()
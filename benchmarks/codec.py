@@ -0,0 +1,60 @@
+"""
+Measure the cost of serializing the collector data classes.
+
+A `BusinessInfo` is encoded and decoded with `json_tricks`, as it used to be, and with the codec of the collector data
+classes. The Celery serializers are compared on a chord result, a list of `BusinessInfo` objects.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/codec.py --runs 20000
+"""
+import argparse
+import timeit
+
+import json_tricks
+from kombu.serialization import dumps
+from kombu.serialization import loads
+
+from api.celery import celery_settings  # noqa: F401 pylint: disable=unused-import
+from api.collectors.base import BusinessInfo
+
+BUSINESS_INFO = BusinessInfo(
+    name='Epoch Coffee - North Loop',
+    address='221 W N Loop Blvd, Austin, TX 78751, USA',
+    latitude=30.318655999999997,
+    longitude=-97.72445499999999,
+    type='Coffee & Tea, Cafes',
+    phone='(512) 454-3762',
+    website='http://www.epochcoffee.com/',
+    weight=10,
+)
+
+
+def measure(label, function, runs):
+    """Print the average duration of a function."""
+    elapsed = timeit.timeit(function, number=runs)
+    print(f'{label:<32} {elapsed / runs * 1e6:8.2f}us')
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=20000, help='number of runs')
+    args = parser.parse_args()
+
+    indented = BUSINESS_INFO.to_json()
+    measure('json_tricks dumps', lambda: json_tricks.dumps(BUSINESS_INFO, sort_keys=True, indent=2), args.runs)
+    measure('to_json()', BUSINESS_INFO.to_json, args.runs)
+    measure('to_json(compact=True)', lambda: BUSINESS_INFO.to_json(compact=True), args.runs)
+    measure('json_tricks loads', lambda: json_tricks.loads(indented), args.runs)
+    measure('from_json', lambda: BusinessInfo.from_json(indented), args.runs)
+
+    results = [BUSINESS_INFO, BUSINESS_INFO]
+    for serializer in ('json_tricks.nonp', 'ryr.json'):
+        content_type, content_encoding, data = dumps(results, serializer=serializer)
+        measure(f'{serializer} dumps', lambda: dumps(results, serializer=serializer), args.runs)
+        measure(f'{serializer} loads', lambda: loads(data, content_type, content_encoding), args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure the decoding cost of a large provider response.
+
+A Yelp search page with the maximum number of businesses is decoded with `requests` (`response.json()`) and with the
+decoder of the collectors. The time per response and the peak memory allocated while decoding are reported.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/decoding.py --runs 200
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+
+import requests
+
+from api.collectors.decoding import decode_response
+
+
+def make_response(businesses):
+    """Create a response containing a search page."""
+    page = {
+        'total':
+        businesses,
+        'businesses': [{
+            'id':
+            f'business-{i}-austin',
+            'name':
+            f'Business {i}',
+            'image_url':
+            f'https://s3-media1.fl.yelpcdn.com/bphoto/{i}/o.jpg',
+            'url':
+            f'https://www.yelp.com/biz/business-{i}-austin?adjust_creative=abcdef',
+            'review_count':
+            i,
+            'categories': [{
+                'alias': 'coffee',
+                'title': 'Coffee & Tea'
+            }, {
+                'alias': 'cafes',
+                'title': 'Cafés'
+            }],
+            'rating':
+            4.5,
+            'coordinates': {
+                'latitude': 30.3 + i / 1000,
+                'longitude': -97.7 - i / 1000
+            },
+            'transactions': ['pickup', 'delivery'],
+            'price':
+            '$$',
+            'location': {
+                'address1': f'{i} W North Loop Blvd',
+                'city': 'Austin',
+                'zip_code': '78751',
+                'country': 'US',
+                'state': 'TX',
+                'display_address': [f'{i} W North Loop Blvd', 'Austin, TX 78751'],
+            },
+            'phone':
+            '+15124543762',
+            'display_phone':
+            '(512) 454-3762',
+            'distance':
+            1000.0 + i,
+        } for i in range(businesses)],
+    }
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = 'utf-8'
+    response._content = json.dumps(page).encode()
+    return response
+
+
+def measure(label, decode, response, runs):
+    """Print the average decoding time and the peak memory of a decoder."""
+    elapsed = timeit.timeit(lambda: decode(response), number=runs)
+    tracemalloc.start()
+    decode(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<10} {elapsed / runs * 1e6:8.1f}us/response  peak={peak / 1024:8.1f}KiB')
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=200, help='number of runs')
+    parser.add_argument('--businesses', type=int, default=50, help='number of businesses in the page')
+    args = parser.parse_args()
+
+    response = make_response(args.businesses)
+    print(f'body={len(response.content) / 1024:.1f}KiB')
+    measure('requests', lambda r: r.json(), response, args.runs)
+    measure('orjson', decode_response, response, args.runs)
+
+
+if __name__ == '__main__':
+    main()
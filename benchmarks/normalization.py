@@ -0,0 +1,45 @@
+"""
+Measure the per-call cost of the normalization of the names and addresses.
+
+The "uncached" samples call the wrapped functions directly, the "cached" ones go through the LRU caches, which is what
+happens when the same candidates are scored over and over.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/normalization.py --runs 10000
+"""
+import argparse
+import timeit
+
+from api.collectors import normalization
+
+ADDRESSES = [
+    '221 West North Loop Boulevard, Suite 100, Austin, TX 78751',
+    '2700 W Anderson Ln #501, Austin, TX 78757',
+    '375 Valencia Street, San Francisco, CA 94103',
+    '1 Ferry Building, Apt. 3B, San Francisco, CA 94111',
+]
+NAMES = ['Epoch Coffee - North Loop', 'Café Épicé', 'Salt & Pepper', 'Four Barrel Coffee']
+
+
+def measure(label, function, values, runs):
+    """Print the average cost of a call, in microseconds."""
+    elapsed = timeit.timeit(lambda: [function(value) for value in values], number=runs)
+    print(f'{label:<18} {elapsed / (runs * len(values)) * 1e6:8.2f}us/call')
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10000, help='number of runs')
+    args = parser.parse_args()
+
+    measure('name uncached', normalization.normalize_name.__wrapped__, NAMES, args.runs)
+    measure('name cached', normalization.normalize_name, NAMES, args.runs)
+    measure('address uncached', normalization.normalize_address.__wrapped__, ADDRESSES, args.runs)
+    measure('address cached', normalization.normalize_address, ADDRESSES, args.runs)
+    print(normalization.cache_info())
+
+
+if __name__ == '__main__':
+    main()
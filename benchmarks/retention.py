@@ -0,0 +1,138 @@
+"""
+Measure the memory pinned by the pooled collectors under sustained load.
+
+Every worker process keeps its authenticated clients for its whole lifetime. This benchmark runs many collections
+through a set of pooled Yelp clients, with canned search pages and details, and reports the resident set of the process
+once the load is over, when the clients retain the raw payloads and when they release them. Each mode runs in its own
+process so that the measures do not interfere.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/retention.py --clients 32 --collections 2000
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+
+import orjson
+
+from api.collectors.generic import CollectorClient
+from api.collectors.pipeline import CollectionPipeline
+from api.collectors.yelp import YelpCollector
+
+
+def make_business(i):
+    """Create a business as returned by the Yelp API."""
+    return {
+        'id': f'business-{i}-austin',
+        'name': f'Business {i}',
+        'image_url': f'https://s3-media1.fl.yelpcdn.com/bphoto/{i}/o.jpg',
+        'url': f'https://www.yelp.com/biz/business-{i}-austin?adjust_creative=abcdef',
+        'review_count': i,
+        'categories': [{
+            'alias': 'coffee',
+            'title': 'Coffee & Tea'
+        }, {
+            'alias': 'cafes',
+            'title': 'Cafés'
+        }],
+        'rating': 4.5,
+        'coordinates': {
+            'latitude': 30.3 + i / 1000,
+            'longitude': -97.7 - i / 1000
+        },
+        'transactions': ['pickup', 'delivery'],
+        'price': '$$',
+        'location': {
+            'address1': f'{i} W North Loop Blvd',
+            'city': 'Austin',
+            'zip_code': '78751',
+            'country': 'US',
+            'state': 'TX',
+            'display_address': [f'{i} W North Loop Blvd', 'Austin, TX 78751'],
+        },
+        'phone': '+15124543762',
+        'display_phone': '(512) 454-3762',
+        'distance': 1000.0 + i,
+        'photos': [f'https://s3-media1.fl.yelpcdn.com/bphoto/{i}/{j}.jpg' for j in range(20)],
+        'hours': [{
+            'open': [{
+                'day': day,
+                'start': '0700',
+                'end': '2300'
+            } for day in range(7)]
+        }],
+    }
+
+
+class CannedYelpCollector(YelpCollector):
+    """Define a Yelp collector decoding canned responses instead of calling the API."""
+
+    SEARCH_PAGE = orjson.dumps({'businesses': [make_business(i) for i in range(50)], 'total': 50})
+    DETAILS = orjson.dumps(make_business(0))
+
+    def search_places(self, address, terms=None, **kwargs):
+        """Decode a canned search page."""
+        self.search_results = orjson.loads(self.SEARCH_PAGE)
+        return self.search_results
+
+    def fetch_place_details(self, place_id, fields=None):
+        """Decode canned details."""
+        return orjson.loads(self.DETAILS)
+
+
+def resident_set():
+    """Return the resident set of the process, in KiB."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def run(clients, collections, retain_raw):
+    """Run the collections and return the resident sets before and after, in KiB."""
+    pool = []
+    for _ in range(clients):
+        client = CollectorClient('yelp')
+        client.collector = CannedYelpCollector()
+        pool.append(client)
+    gc.collect()
+    before = resident_set()
+    for i in range(collections):
+        client = pool[i % clients]
+        CollectionPipeline(
+            client, retain_raw=retain_raw, audit_store=None).run(None, 'Business 0', '0 W North Loop Blvd')
+    gc.collect()
+    return before, resident_set()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=32, help='number of pooled clients')
+    parser.add_argument('--collections', type=int, default=2000, help='number of collections')
+    parser.add_argument('--mode', choices=['retain', 'release'], help='run a single mode in this process')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.clients, args.collections, args.mode == 'retain')))
+        return
+
+    print(f'clients={args.clients} collections={args.collections}')
+    for mode in ('retain', 'release'):
+        output = subprocess.check_output(
+            [
+                sys.executable, __file__, '--clients',
+                str(args.clients), '--collections',
+                str(args.collections), '--mode', mode
+            ],
+            env=os.environ,
+        )
+        before, after = json.loads(output)
+        print(f'{mode:<8} rss={after / 1024:7.1f}MiB  growth={(after - before) / 1024:7.1f}MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Measure the startup time of the WSGI application.
+
+Every sample imports `api.wsgi` in a fresh interpreter, which is what a gunicorn worker does when it boots. The
+"cold" samples start without any precompiled specification artifact, the "warm" ones reuse the artifact written by
+the first cold sample.
+
+Usage::
+
+    CONNEXION_SETTINGS_MODULE=api.settings.local python benchmarks/startup.py --runs 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SNIPPET = '''
+import time
+start = time.perf_counter()
+import api.wsgi
+print(time.perf_counter() - start)
+'''
+
+
+def sample(env):
+    """Import the WSGI app in a new interpreter and return the elapsed time in seconds."""
+    output = subprocess.run([sys.executable, '-c', SNIPPET], env=env, check=True, stdout=subprocess.PIPE)
+    return float(output.stdout.decode().strip().splitlines()[-1])
+
+
+def report(label, samples):
+    """Print the statistics of a series of samples."""
+    print(f'{label:<6} median={statistics.median(samples) * 1000:8.1f}ms '
+          f'min={min(samples) * 1000:8.1f}ms max={max(samples) * 1000:8.1f}ms runs={len(samples)}')
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='number of samples per scenario')
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='ryr-startup-')
+    env = dict(os.environ, RYR_API_SPECIFICATION_CACHE_DIR=cache_dir)
+    env.setdefault('CONNEXION_SETTINGS_MODULE', 'api.settings.local')
+    try:
+        cold = []
+        for _ in range(args.runs):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            cold.append(sample(env))
+        warm = [sample(env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report('cold', cold)
+    report('warm', warm)
+
+
+if __name__ == '__main__':
+    main()
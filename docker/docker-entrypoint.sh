@@ -9,6 +9,7 @@ set -eo pipefail
 
 # Define Celery variables.
 : ${RYR_API_CELERY_APP:=api.celery.worker}
+: ${RYR_API_CELERY_OPTS:=}
 
 # Compute variables.
 DATE=$(date -u +%Y%m%dT%H%M%S%Z)
@@ -16,7 +17,13 @@ DATE=$(date -u +%Y%m%dT%H%M%S%Z)
 # Run the API.
 if [ "$1" == "api" ]; then
   # Start WSGI server.
-  exec gunicorn ${RYR_API_API_OPTS} --log-level ${RYR_LOG_LEVEL} -b 0.0.0.0:${RYR_API_API_PORT} api.wsgi
+  exec gunicorn -c python:api.gunicorn_config ${RYR_API_API_OPTS} --log-level ${RYR_LOG_LEVEL} -b 0.0.0.0:${RYR_API_API_PORT} api.wsgi
+fi
+
+# Run the asyncio API.
+if [ "$1" == "api-async" ]; then
+  # Start the aiohttp server.
+  exec gunicorn -c python:api.gunicorn_config ${RYR_API_API_OPTS} --worker-class aiohttp.GunicornWebWorker --log-level ${RYR_LOG_LEVEL} -b 0.0.0.0:${RYR_API_API_PORT} api.aio:application
 fi
 
 # Run a Celery command.
@@ -24,6 +31,7 @@ if [ "$1" == "celery" ]; then
   # Start Celery command.
   exec $@ \
     -A ${RYR_API_CELERY_APP} \
+    ${RYR_API_CELERY_OPTS} \
     -l ${RYR_LOG_LEVEL} \
     --pidfile=celery_${CELERY_COMMAND}-${DATE}.pid
 fi
@@ -0,0 +1,41 @@
+"""
+Define a WSGI application serving the real place and health controllers, for the tests of the worker model.
+
+The collections take `COLLECTION_TIME` seconds, and Redis is replaced by mocks.
+"""
+import json
+import sys
+import time
+import types
+from unittest.mock import Mock
+
+from api.collectors.base import BusinessInfo
+from api.controller import health
+from api.controller import place
+
+# Number of seconds taken by a collection.
+COLLECTION_TIME = 1.0
+
+
+def collect_place_details(*args, **kwargs):
+    """Collect the details of a place, slowly."""
+    time.sleep(COLLECTION_TIME)
+    return BusinessInfo(name='name')
+
+
+place.HOT_PLACES = Mock()
+place.PLACE_DETAILS_CACHE = Mock(ttl=10)
+place.PLACE_DETAILS_CACHE.get_with_ttl.return_value = None
+place.PLACE_DETAILS_CACHE.set.return_value = '"etag"'
+sys.modules['api.celery.tasks'] = types.SimpleNamespace(collect_place_details=collect_place_details)
+
+
+def application(environ, start_response):
+    """Serve the health check on `/health`, and the collection of the place details on any other path."""
+    if environ['PATH_INFO'] == '/health':
+        response = health.search()
+    else:
+        response = place.post({'place_id': 'place_id', 'name': 'name', 'address': 'address'})
+    headers = [(name, str(value)) for name, value in (response.headers or {}).items()]
+    start_response(f'{response.status_code} -', headers + [('Content-Type', 'application/json')])
+    return [json.dumps(response.body).encode()]
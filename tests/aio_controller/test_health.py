@@ -0,0 +1,42 @@
+"""Test the asynchronous endpoints for the health and metrics resources."""
+import asyncio
+
+import pytest
+
+from api.admission import AsyncAdmissionController
+from api.aio_controller import health
+from api.aio_controller import metrics
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestHealth:
+    """Implement tests for the health and metrics endpoints."""
+
+    def test_search_00(self, mocker):
+        """Ensure a degraded dependency is reported without changing the status code."""
+        mocker.patch.object(health, 'ASYNC_ADMISSION', AsyncAdmissionController(1, 1, 1, 1))
+        mocker.patch.object(health.HEALTH_CHECK, 'report', return_value={'status': 'degraded', 'probes': {}})
+
+        response = asyncio.run(health.search(detailed=True))
+
+        assert response.status_code == 200
+        assert response.body['status'] == 'degraded'
+
+    def test_search_01(self, mocker):
+        """Ensure a saturated worker is reported with a 503."""
+        mocker.patch.object(health, 'ASYNC_ADMISSION', AsyncAdmissionController(0, 0, 1, 1))
+
+        response = asyncio.run(health.search())
+
+        assert response.status_code == 503
+        assert response.body['status'] == 'saturated'
+
+    def test_metrics_00(self, mocker):
+        """Ensure the metrics are served in the Prometheus text format."""
+        mocker.patch.object(metrics, 'collect', return_value='ryr_queue_backlog{queue="interactive"} 3\n')
+
+        response = asyncio.run(metrics.search())
+
+        assert response.body == 'ryr_queue_backlog{queue="interactive"} 3\n'
+        assert response.content_type == metrics.CONTENT_TYPE
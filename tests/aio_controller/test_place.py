@@ -0,0 +1,93 @@
+"""Test the asynchronous endpoint for the place resource."""
+import asyncio
+import json
+from unittest.mock import Mock
+
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+import pytest
+
+from api.admission import AsyncAdmissionController
+from api.aio_controller import place
+from api.collectors.base import BusinessInfo
+
+BODY = {'place_id': 'ChIJ1', 'name': 'Epoch Coffee', 'address': '221 W N Loop Blvd, Austin, TX 78751'}
+
+
+@pytest.fixture
+def cache(mocker):
+    """Replace the place details cache."""
+    cache = mocker.patch.object(place, 'PLACE_DETAILS_CACHE')
+    cache.ttl = 3600
+    cache.get_with_ttl.return_value = None
+    cache.set.return_value = '"etag"'
+    mocker.patch.object(place, 'HOT_PLACES')
+    return cache
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestPost:
+    """Implement tests for `post`."""
+
+    def test_post_00(self, cache, mocker):
+        """Ensure the cached details are served without dispatching the collection."""
+        cache.get_with_ttl.return_value = ('"etag"', {'name': 'Epoch Coffee'}, 120)
+        dispatch = mocker.patch('api.celery.tasks.dispatch_place_details')
+
+        response = asyncio.run(place.post(BODY))
+
+        assert response.status_code == 200
+        assert json.loads(response.body) == {'name': 'Epoch Coffee'}
+        assert response.headers['ETag'] == '"etag"'
+        assert response.headers['Cache-Control'] == 'private, max-age=120'
+        dispatch.assert_not_called()
+        place.HOT_PLACES.record.assert_called_once_with(BODY['place_id'], place.place_request(BODY))
+
+    def test_post_01(self, cache, mocker):
+        """Ensure the details are collected, cached, and their result forgotten."""
+        mocker.patch.object(place, 'ASYNC_ADMISSION', AsyncAdmissionController(1, 1, 1, 1))
+        async_result = Mock()
+        dispatch = mocker.patch('api.celery.tasks.dispatch_place_details', return_value=async_result)
+        forget = mocker.patch('api.celery.tasks.forget_result')
+
+        async def wait_for_result(result, timeout):
+            assert result is async_result
+            assert timeout == place.COLLECT_TIMEOUT
+            return BusinessInfo(name='Epoch Coffee')
+
+        mocker.patch('api.celery.aio.wait_for_result', wait_for_result)
+
+        response = asyncio.run(place.post(BODY))
+
+        assert response.status_code == 200
+        assert json.loads(response.body)['name'] == 'Epoch Coffee'
+        dispatch.assert_called_once_with(BODY['place_id'], BODY['name'], BODY['address'], None, None)
+        forget.assert_called_once_with(async_result)
+        assert cache.set.call_args[0][0] == BODY['place_id']
+
+    def test_post_02(self, cache, mocker):
+        """Ensure the requests are rejected when the collections are saturated."""
+        admission = AsyncAdmissionController(0, 0, 1, 7)
+        mocker.patch.object(place, 'ASYNC_ADMISSION', admission)
+        dispatch = mocker.patch('api.celery.tasks.dispatch_place_details')
+
+        response = asyncio.run(place.post(BODY))
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '7'
+        dispatch.assert_not_called()
+        cache.set.assert_not_called()
+
+    def test_post_03(self, cache, mocker):
+        """Ensure a collection which does not complete in time is reported as a gateway timeout, and forgotten."""
+        mocker.patch.object(place, 'ASYNC_ADMISSION', AsyncAdmissionController(1, 1, 1, 1))
+        async_result = Mock()
+        mocker.patch('api.celery.tasks.dispatch_place_details', return_value=async_result)
+        forget = mocker.patch('api.celery.tasks.forget_result')
+        mocker.patch('api.celery.aio.wait_for_result', side_effect=CeleryTimeoutError)
+
+        response = asyncio.run(place.post(BODY))
+
+        assert response.status_code == 504
+        forget.assert_called_once_with(async_result)
+        cache.set.assert_not_called()
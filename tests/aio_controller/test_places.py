@@ -0,0 +1,106 @@
+"""Test the asynchronous endpoint for the places resource."""
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from api.admission import AsyncAdmissionController
+from api.aio_controller import places
+
+LOCATION = '30.318,-97.724'
+EPOCH = {'place_id': 'ChIJ1', 'name': 'Epoch Coffee'}
+TINY_PIES = {'place_id': 'ChIJ2', 'name': 'Tiny Pies'}
+PLACES = {'status': 'OK', 'results': [EPOCH, TINY_PIES]}
+
+
+def fake_request(**headers):
+    """Create an aiohttp request."""
+    request = Mock()
+    request.headers = headers
+    return request
+
+
+@pytest.fixture
+def cache(mocker):
+    """Replace the places cache."""
+    cache = mocker.patch.object(places, 'PLACES_CACHE')
+    cache.ttl = 300
+    cache.get_with_ttl.return_value = None
+    cache.etag.return_value = None
+    cache.set.return_value = '"etag"'
+    mocker.patch.object(places, 'PREFETCH_TOP', 0)
+    mocker.patch.object(places, 'ASYNC_ADMISSION', AsyncAdmissionController(1, 1, 1, 1))
+    return cache
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestSearch:
+    """Implement tests for `search`."""
+
+    def test_search_00(self, cache, mocker):
+        """Ensure the conditional requests are answered from the cached ETag."""
+        cache.etag.return_value = '"etag"'
+        search_providers = mocker.patch.object(places, 'search_providers')
+
+        response = asyncio.run(places.search(LOCATION, fake_request(**{'If-None-Match': '"etag"'})))
+
+        assert response.status_code == 304
+        cache.get_with_ttl.assert_not_called()
+        search_providers.assert_not_called()
+
+    def test_search_01(self, cache, mocker):
+        """Ensure the cached places are served, projected on the requested fields."""
+        cache.get_with_ttl.return_value = ('"etag"', PLACES, 120)
+        search_providers = mocker.patch.object(places, 'search_providers')
+
+        response = asyncio.run(places.search(LOCATION, fake_request(), fields='name'))
+
+        assert response.status_code == 200
+        names = [{'name': place['name']} for place in PLACES['results']]
+        assert json.loads(response.body) == {'status': 'OK', 'results': names}
+        search_providers.assert_not_called()
+
+    def test_search_05(self, cache, mocker):
+        """Ensure the projections selecting the same fields share their ETag."""
+        cache.get_with_ttl.return_value = ('"etag"', PLACES, 120)
+
+        first = asyncio.run(places.search(LOCATION, fake_request(), fields='name,place_id'))
+        second = asyncio.run(places.search(LOCATION, fake_request(), fields='place_id,name'))
+
+        assert first.headers['ETag'] == second.headers['ETag'] != '"etag"'
+
+    def test_search_02(self, cache, mocker):
+        """Ensure the merged places are searched and cached under their own key."""
+        mocker.patch('api.collectors.nearby.nearby_clients')
+        mocker.patch('api.collectors.nearby.search_nearby', return_value=PLACES)
+
+        response = asyncio.run(places.search(LOCATION, fake_request(), merged=True))
+
+        assert response.status_code == 200
+        assert json.loads(response.body) == PLACES
+        cache.set.assert_called_once_with(f'merged:{LOCATION}', PLACES)
+
+    def test_search_03(self, cache, mocker, caplog):
+        """Ensure the first results are prefetched, and a failing prefetch is logged rather than raised."""
+        cache.get_with_ttl.return_value = ('"etag"', PLACES, 120)
+        mocker.patch.object(places, 'PREFETCH_TOP', 1)
+        schedule_prefetch = mocker.patch('api.celery.tasks.schedule_prefetch', side_effect=OSError('Broken pipe.'))
+
+        response = asyncio.run(places.search(LOCATION, fake_request()))
+
+        assert response.status_code == 200
+        schedule_prefetch.assert_called_once_with(PLACES, 1)
+        assert 'Broken pipe.' in caplog.text
+
+    def test_search_04(self, cache, mocker):
+        """Ensure the requests are rejected when the collections are saturated."""
+        mocker.patch.object(places, 'ASYNC_ADMISSION', AsyncAdmissionController(0, 0, 1, 7))
+        search_providers = mocker.patch.object(places, 'search_providers')
+
+        response = asyncio.run(places.search(LOCATION, fake_request()))
+
+        assert response.status_code == 503
+        search_providers.assert_not_called()
+        cache.set.assert_not_called()
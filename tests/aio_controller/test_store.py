@@ -0,0 +1,55 @@
+"""Test the asynchronous endpoint for the store resource."""
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from api.aio_controller import store
+from api.collectors.base import BusinessInfo
+from api.store import PlaceStore
+
+
+@pytest.fixture
+def place_store(mocker, tmp_path):
+    """Replace the place store with a store containing a single place."""
+    place_store = PlaceStore(str(tmp_path / 'places.db'))
+    place_store.put('ChIJ1', BusinessInfo(name='Epoch Coffee', latitude=30.318, longitude=-97.724))
+    mocker.patch.object(store, 'PLACE_STORE', place_store)
+    return place_store
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestSearch:
+    """Implement tests for `search`."""
+
+    def test_search_00(self, place_store):
+        """Ensure the stored places are found by name prefix."""
+        response = asyncio.run(store.search(prefix='epoch'))
+
+        assert response.status_code == 200
+        assert [place['name'] for place in json.loads(response.body)['results']] == ['Epoch Coffee']
+
+    def test_search_01(self, place_store):
+        """Ensure an ambiguous query is rejected."""
+        response = asyncio.run(store.search(prefix='epoch', location='30.318,-97.724'))
+
+        assert response.status_code == 400
+
+    def test_search_02(self, mocker):
+        """Ensure the queries are rejected if the store is not enabled."""
+        mocker.patch.object(store, 'PLACE_STORE', PlaceStore(''))
+
+        response = asyncio.run(store.search(prefix='epoch'))
+
+        assert response.status_code == 503
+
+    def test_search_03(self, place_store, mocker):
+        """Ensure a store which cannot be read answers with a 503."""
+        mocker.patch.object(store, 'query_places', side_effect=sqlite3.OperationalError('database is locked'))
+
+        response = asyncio.run(store.search(prefix='epoch'))
+
+        assert response.status_code == 503
+        assert 'database is locked' in json.loads(response.body)['error']['message']
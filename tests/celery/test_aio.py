@@ -0,0 +1,170 @@
+"""Test the Celery asyncio helpers."""
+import asyncio
+import queue
+import threading
+from unittest.mock import Mock
+
+from celery.backends.redis import RedisBackend
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+import pytest
+
+from api.celery.aio import get_listener
+from api.celery.aio import ResultListener
+from api.celery.aio import wait_for_result
+
+
+class FakePubSub:
+    """Define a pub/sub connection delivering the messages published on its subscribed channels."""
+
+    def __init__(self):
+        """Initialize the connection."""
+        self.messages = queue.Queue()
+        self.channels = set()
+        self.unsubscribed = threading.Event()
+
+    def publish(self, channel, data):
+        """Publish a message, delivered if the channel is subscribed."""
+        if channel in self.channels:
+            self.messages.put({'type': 'message', 'channel': channel.encode(), 'data': data})
+
+    def subscribe(self, *channels):
+        """Subscribe to channels, and confirm each subscription."""
+        for channel in channels:
+            self.channels.add(channel)
+            self.messages.put({'type': 'subscribe', 'channel': channel.encode(), 'data': len(self.channels)})
+
+    def unsubscribe(self, *channels):
+        """Unsubscribe from channels."""
+        self.channels.difference_update(channels)
+        self.unsubscribed.set()
+
+    def get_message(self, timeout=0):
+        """Return the next message, or `None` if none is received before the timeout."""
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def fake_backend(published=None):
+    """
+    Create a Redis result backend storing a result once it is first read, then publishing it to its subscribers.
+
+    :param dict published: the metadata of the published result. Nothing is published if `None`.
+    """
+    backend = Mock(spec=RedisBackend)
+    backend.url = 'redis://localhost:6379/1'
+    backend.task_keyprefix = b'celery-task-meta-'
+    backend.get_key_for_task.side_effect = lambda task_id: b'celery-task-meta-' + task_id.encode()
+    backend.decode_result.side_effect = lambda data: data
+    pubsub = Mock(wraps=FakePubSub())
+    stored = threading.Event()
+
+    def get_task_meta(task_id):
+        if stored.is_set():
+            return published
+        if published is not None:
+            stored.set()
+            pubsub.publish(f'celery-task-meta-{task_id}', published)
+        return {'status': 'PENDING', 'result': None}
+
+    backend.get_task_meta.side_effect = get_task_meta
+    backend.client.pubsub.return_value = pubsub
+    return backend
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestWaitForResult:
+    """Implement tests for `wait_for_result`."""
+
+    def test_wait_for_result_00(self):
+        """Ensure the result is polled until it is ready."""
+        async_result = Mock()
+        async_result.ready.side_effect = [False, False, True]
+        async_result.get.return_value = 42
+
+        actual = asyncio.run(wait_for_result(async_result, interval=0))
+
+        assert actual == 42
+        assert async_result.ready.call_count == 3
+
+    def test_wait_for_result_01(self):
+        """Ensure waiting times out if the result never gets ready."""
+        async_result = Mock()
+        async_result.ready.return_value = False
+
+        with pytest.raises(CeleryTimeoutError):
+            asyncio.run(wait_for_result(async_result, timeout=0.01, interval=0.001))
+
+        async_result.get.assert_not_called()
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestResultListener:
+    """Implement tests for `ResultListener`."""
+
+    def test_wait_00(self):
+        """Ensure the published result is received without polling the backend."""
+        backend = fake_backend({'status': 'SUCCESS', 'result': 42})
+        listener = ResultListener(backend)
+
+        actual = asyncio.run(listener.wait(Mock(id='task1'), timeout=5))
+
+        assert actual == 42
+        backend.client.pubsub.return_value.subscribe.assert_called_once_with('celery-task-meta-task1')
+
+    def test_wait_04(self):
+        """Ensure the channel of a result is unsubscribed once the result is received."""
+        backend = fake_backend({'status': 'SUCCESS', 'result': 42})
+        listener = ResultListener(backend)
+
+        assert asyncio.run(listener.wait(Mock(id='task1'), timeout=5)) == 42
+        assert not listener._subscriptions  # pylint: disable=protected-access
+        assert backend.client.pubsub.return_value.unsubscribed.wait(5)
+        backend.client.pubsub.return_value.unsubscribe.assert_called_once_with('celery-task-meta-task1')
+
+    def test_wait_05(self):
+        """Ensure the coroutines waiting for the same result share its subscription."""
+        backend = fake_backend({'status': 'SUCCESS', 'result': 42})
+        listener = ResultListener(backend)
+
+        async def wait_twice():
+            return await asyncio.gather(
+                listener.wait(Mock(id='task1'), timeout=5), listener.wait(Mock(id='task1'), timeout=5))
+
+        assert asyncio.run(wait_twice()) == [42, 42]
+        assert backend.client.pubsub.return_value.unsubscribed.wait(5)
+        assert backend.client.pubsub.return_value.subscribe.call_count == 1
+
+    def test_wait_01(self):
+        """Ensure the error of a failed task is raised."""
+        backend = fake_backend({'status': 'FAILURE', 'result': {'exc_type': 'ValueError'}})
+        backend.exception_to_python.return_value = ValueError('Not found.')
+        listener = ResultListener(backend)
+
+        with pytest.raises(ValueError):
+            asyncio.run(listener.wait(Mock(id='task1'), timeout=5))
+
+    def test_wait_02(self):
+        """Ensure waiting times out if the result is never published."""
+        listener = ResultListener(fake_backend())
+
+        with pytest.raises(CeleryTimeoutError):
+            asyncio.run(listener.wait(Mock(id='task1'), timeout=0.01))
+
+    def test_wait_03(self):
+        """Ensure a result stored before the subscription is read from the backend."""
+        backend = fake_backend()
+        backend.get_task_meta.side_effect = None
+        backend.get_task_meta.return_value = {'status': 'SUCCESS', 'result': 42}
+        listener = ResultListener(backend)
+
+        assert asyncio.run(listener.wait(Mock(id='task1'), timeout=5)) == 42
+        assert not listener._waiters  # pylint: disable=protected-access
+
+    def test_get_listener_00(self):
+        """Ensure the listener is shared by the instances of a Redis backend, and unused by the other backends."""
+        assert get_listener(fake_backend()) is get_listener(fake_backend())
+        assert get_listener(Mock()) is None
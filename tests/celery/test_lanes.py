@@ -0,0 +1,19 @@
+"""Test the lanes module."""
+import pytest
+
+from api.celery.lanes import INTERACTIVE
+from api.celery.lanes import lane_options
+from api.celery.lanes import LANES
+
+
+class TestLanes:
+    """Implement tests for the lanes of the collection work."""
+
+    def test_lane_options_00(self):
+        """Ensure the options contain the queue and the priority of the lane."""
+        assert lane_options(INTERACTIVE) == {'queue': 'interactive', 'priority': LANES[INTERACTIVE].priority}
+
+    def test_lane_options_01(self):
+        """Ensure unknown lanes are rejected."""
+        with pytest.raises(ValueError):
+            lane_options('unknown')
@@ -0,0 +1,66 @@
+"""Test the recording of the Celery task metrics."""
+from unittest.mock import Mock
+
+import pytest
+
+from api.celery import metrics
+from api.metrics import PUBLISHED_AT_HEADER
+
+
+def fake_task(name, published_at=None, is_eager=False):
+    """Create a task being run by a worker."""
+    task = Mock()
+    task.name = name
+    task.request.is_eager = is_eager
+    task.request.delivery_info = {'routing_key': 'interactive'}
+    setattr(task.request, PUBLISHED_AT_HEADER, published_at)
+    return task
+
+
+class TestTaskMetrics:
+    """Implement tests for the recording of the task metrics."""
+
+    @pytest.mark.parametrize('name, args, kwargs, expected', [
+        ('api.celery.tasks.collect_place_details_from_provider', ('yelp', 'name'), {}, 'yelp'),
+        ('api.celery.tasks.collect_place_details_from_provider', (), {
+            'provider': 'google'
+        }, 'google'),
+        ('api.celery.tasks.collect_place_details_from_google', ('place_id', ), {}, 'google'),
+        ('api.celery.tasks.combine_collector_results', ([], ), {}, ''),
+    ])
+    def test_task_provider_00(self, name, args, kwargs, expected):
+        """Ensure the provider is found from the task and its arguments."""
+        assert metrics.task_provider(name, args, kwargs) == expected
+
+    def test_stamp_published_at_00(self):
+        """Ensure the tasks are stamped with their publication time, once."""
+        headers = {}
+        metrics.stamp_published_at(headers=headers)
+        published_at = headers[PUBLISHED_AT_HEADER]
+        metrics.stamp_published_at(headers=headers)
+
+        assert headers[PUBLISHED_AT_HEADER] == published_at
+
+    def test_record_task_00(self, mocker):
+        """Ensure the waiting and service times of a task are recorded."""
+        record = mocker.patch.object(metrics.TASK_METRICS, 'record')
+        mocker.patch('time.time', return_value=1010.0)
+        task = fake_task('api.celery.tasks.collect_place_details_from_provider', published_at=1000.0)
+
+        metrics.start_timer(task_id='task1', task=task)
+        metrics.record_task(task_id='task1', task=task, args=('google', 'name'), kwargs={})
+
+        name, provider, service_time, queue, wait_time = record.call_args[0]
+        assert (name, provider, queue, wait_time) == (task.name, 'google', 'interactive', 10.0)
+        assert service_time >= 0
+        assert 'task1' not in metrics._running  # pylint: disable=protected-access
+
+    def test_record_task_01(self, mocker):
+        """Ensure the tasks run eagerly are not recorded."""
+        record = mocker.patch.object(metrics.TASK_METRICS, 'record')
+        task = fake_task('api.celery.tasks.combine_collector_results', is_eager=True)
+
+        metrics.start_timer(task_id='task1', task=task)
+        metrics.record_task(task_id='task1', task=task, args=([], ), kwargs={})
+
+        record.assert_not_called()
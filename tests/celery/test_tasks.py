@@ -12,10 +12,14 @@ import requests
 import responses
 
 from api.celery import tasks
+from api.celery.lanes import BATCH
+from api.celery.lanes import lane_options
+from api.celery.lanes import PREFETCH
 from api.collectors.base import BusinessInfo
 from api.collectors.base import PlaceSearchSummary
 from api.collectors.generic import CollectorClient
 from api.collectors.yelp import YelpCollector
+from api.place_index import PlaceMatch
 from tests.collectors.test_google import GOOGLE_MAPS_DETAILS_RESPONSE
 from tests.collectors.test_yelp import YELP_DETAILS_RESPONSE
 from tests.collectors.test_yelp import YELP_SEARCH_RESPONSE
@@ -105,6 +109,44 @@ class TestCeleryTasks:
         assert task.successful()
         assert dataclasses.asdict(task.result) == yelp_info
 
+    def test_collect_place_details_from_yelp_01(self, mocker):
+        """Ensure an indexed Yelp business is retrieved without searching."""
+        mocker.patch.dict('os.environ', {'RYR_COLLECTOR_YELP_API_KEY': self.fake.pystr()})
+        mocker.patch.object(tasks.PLACE_INDEX, 'get', return_value=PlaceMatch('yelp-id', 0.9))
+        search_places = mocker.patch.object(CollectorClient, 'search_places')
+        fetch_place_details = mocker.patch.object(CollectorClient, 'fetch_place_details')
+        mocker.patch.object(CollectorClient, 'to_business_info', return_value=BusinessInfo())
+
+        task = tasks.collect_place_details_from_yelp.s(self.fake.pystr(), self.fake.pystr(), 'google-id').apply()
+
+        assert task.successful()
+        search_places.assert_not_called()
+        fetch_place_details.assert_called_once_with('yelp-id')
+
+    @responses.activate
+    def test_collect_place_details_from_yelp_02(self, mocker):
+        """Ensure the match found by a search is indexed."""
+        mocker.patch.dict('os.environ', {'RYR_COLLECTOR_YELP_API_KEY': self.fake.pystr()})
+        mocker.patch.object(tasks.PLACE_INDEX, 'get', return_value=None)
+        index_set = mocker.patch.object(tasks.PLACE_INDEX, 'set')
+        responses.add(
+            responses.GET,
+            'https://api.yelp.com/v3/businesses/search',
+            json=YELP_SEARCH_RESPONSE,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            'https://api.yelp.com/v3/businesses/four-barrel-coffee-san-francisco',
+            json=YELP_DETAILS_RESPONSE,
+            status=200,
+        )
+
+        task = tasks.collect_place_details_from_yelp.s('Four Barrel Coffee', self.fake.pystr(), 'google-id').apply()
+
+        assert task.successful()
+        index_set.assert_called_once_with('google', 'google-id', 'yelp', 'four-barrel-coffee-san-francisco', 1.0)
+
     def test_combine_collector_results_00(self):
         """Ensure results are combined correctly."""
         b0 = BusinessInfo(name='name1')
@@ -114,6 +156,178 @@ class TestCeleryTasks:
         assert task.successful()
         assert task.result == b2
 
+    def test_combine_collector_results_01(self, mocker):
+        """Ensure the combined results are written to the place store."""
+        store_put = mocker.patch.object(tasks.PLACE_STORE, 'put')
+        task = tasks.combine_collector_results.s([BusinessInfo(name='name1')], 'place-id').apply()
+
+        assert task.successful()
+        store_put.assert_called_once_with('place-id', BusinessInfo(name='name1'))
+
+    def test_cache_place_details_00(self, mocker):
+        """Ensure the combined results are cached."""
+        cache_set = mocker.patch.object(tasks.PLACE_DETAILS_CACHE, 'set')
+        task = tasks.cache_place_details.s([BusinessInfo(name='name1')], 'place-id').apply()
+
+        assert task.successful()
+        cache_set.assert_called_once_with('place-id', dataclasses.asdict(BusinessInfo(name='name1')))
+
+    def test_prefetch_place_details_00(self, mocker):
+        """Ensure the places already cached are not collected again."""
+        mocker.patch.object(tasks.PLACE_DETAILS_CACHE, 'etag', return_value='"etag"')
+        chord_mock = mocker.patch('api.celery.tasks.chord')
+        task = tasks.prefetch_place_details.s('place-id', 'name', 'address').apply()
+
+        assert task.successful()
+        chord_mock.assert_not_called()
+
+    def test_prefetch_place_details_01(self, mocker):
+        """Ensure the details of the places not cached are collected by the rate limited task itself, and cached."""
+        mocker.patch.object(tasks.PLACE_DETAILS_CACHE, 'etag', return_value=None)
+        chord_mock = mocker.patch('api.celery.tasks.chord')
+        collect = mocker.patch.object(tasks, 'collect_place_details_from_provider')
+        collect.side_effect = lambda provider, *args: provider
+        cache = mocker.patch.object(tasks, 'cache_place_details')
+        task = tasks.prefetch_place_details.s('place-id', 'name', 'address').apply()
+
+        assert task.successful()
+        chord_mock.assert_not_called()
+        assert [c[0][0] for c in collect.call_args_list] == ['google', 'yelp']
+        cache.assert_called_once_with(['google', 'yelp'], 'place-id')
+        assert tasks.prefetch_place_details.rate_limit == tasks.PREFETCH_RATE_LIMIT
+
+    def test_refresh_hot_places_00(self, mocker):
+        """Ensure the hottest places expiring first are refreshed within the quota, by batches spread evenly."""
+        request = {'name': 'name', 'address': 'address', 'latitude': None, 'longitude': None}
+        mocker.patch.object(tasks.HOT_PLACES, 'decay')
+        mocker.patch.object(
+            tasks.HOT_PLACES,
+            'hottest',
+            return_value=[
+                ('fresh', dict(request, place_id='fresh')),
+                ('expiring', dict(request, place_id='expiring')),
+                ('missing', dict(request, place_id='missing')),
+                ('expired', dict(request, place_id='expired')),
+            ])
+        mocker.patch.object(tasks.PLACE_DETAILS_CACHE, 'remaining_ttls', return_value=[3000, 10, 0, 5])
+        mocker.patch.object(tasks, 'REFRESH_QUOTA', 3)
+        mocker.patch.object(tasks, 'REFRESH_BATCH_SIZE', 2)
+        refresh = mocker.patch.object(tasks.refresh_places_details, 'apply_async')
+        task = tasks.refresh_hot_places.s().apply()
+
+        assert task.successful()
+        assert [[place['place_id'] for place in c[1]['args'][0]] for c in refresh.call_args_list] == [
+            ['missing', 'expired'],
+            ['expiring'],
+        ]
+        assert [c[1]['countdown'] for c in refresh.call_args_list] == [0, tasks.REFRESH_INTERVAL / 2]
+        assert refresh.call_args[1]['queue'] == lane_options(PREFETCH)['queue']
+
+    def test_refresh_places_details_00(self, mocker):
+        """Ensure the places are collected from every provider with batched requests, then cached."""
+        mocker.patch.dict(os.environ, RYR_COLLECTOR_GOOGLE_PLACES_API_KEY='key', RYR_COLLECTOR_YELP_API_KEY='key')
+        mocker.patch.object(tasks, 'get_client', side_effect=lambda provider, api_key: Mock(provider=provider))
+        run_many = mocker.patch.object(
+            tasks.CollectionPipeline,
+            'run_many',
+            side_effect=[dict(a='google-a', b='google-b'), dict(a='yelp-a')],
+        )
+        cache = mocker.patch.object(tasks, 'cache_place_details')
+        places = [{'place_id': 'a'}, {'place_id': 'b'}, {'place_id': 'c'}]
+        task = tasks.refresh_places_details.s(places).apply()
+
+        assert task.successful()
+        assert run_many.call_count == 2
+        assert [c[0] for c in cache.call_args_list] == [(['google-a', 'yelp-a'], 'a'), (['google-b'], 'b')]
+
+    def test_dispatch_place_details_00(self, mocker):
+        """Ensure the collection tasks are sent to the requested lane."""
+        chord_mock = mocker.patch('api.celery.tasks.chord')
+        tasks.dispatch_place_details('place-id', 'name', 'address', lane=BATCH)
+
+        header = chord_mock.call_args[0][0]
+        callback = chord_mock.return_value.call_args[0][0]
+        assert [signature.options for signature in header] == [lane_options(BATCH)] * 2
+        assert callback.options == {'queue': 'batch', 'priority': lane_options(BATCH)['priority']}
+        assert callback.args == ('place-id', )
+
+    def test_collection_header_00(self, mocker):
+        """Ensure the header only contains the enabled providers able to collect the details."""
+        mocker.patch.object(tasks.REGISTRY, 'enabled', return_value=['yelp'])
+        header = tasks.collection_header('place-id', 'name', 'address', queue='batch')
+
+        assert [signature.args for signature in header] == [('yelp', 'name', 'address', 'place-id', None, None)]
+        assert header[0].options == {'queue': 'batch'}
+        tasks.REGISTRY.enabled.assert_called_once_with(tasks.DETAILS)
+
+    def test_collect_place_details_01(self, mocker):
+        """Ensure the combined result is waited for within the timeout, then removed from the backend."""
+        async_result = Mock(id='result-id')
+        async_result.get.return_value = BusinessInfo(name='name1')
+        mocker.patch('api.celery.tasks.dispatch_place_details', return_value=async_result)
+
+        assert tasks.collect_place_details('place-id', 'name', 'address', timeout=30) == BusinessInfo(name='name1')
+        async_result.get.assert_called_once_with(timeout=30)
+        async_result.backend.forget.assert_called_once_with('result-id')
+        async_result.parent.forget.assert_called_once_with()
+
+    def test_collect_place_details_02(self):
+        """Ensure the results of the chord header are stored, for the chord callback to receive them."""
+        assert not tasks.collect_place_details_from_provider.ignore_result
+        assert not tasks.collect_place_details_from_google.ignore_result
+        assert not tasks.collect_place_details_from_yelp.ignore_result
+
+    def test_forget_result_00(self):
+        """Ensure failing to remove a result is not fatal."""
+        async_result = Mock(id='result-id')
+        async_result.backend.forget.side_effect = OSError
+        tasks.forget_result(async_result)
+
+    def test_schedule_prefetch_00(self, mocker):
+        """Ensure only the first places which are not cached are prefetched."""
+        search_results = {
+            'results': [
+                {
+                    'place_id': 'cached',
+                    'name': 'name0',
+                    'vicinity': 'address0'
+                },
+                {
+                    'place_id': 'missing',
+                    'name': 'name1',
+                    'vicinity': 'address1'
+                },
+                {
+                    'place_id': 'ignored',
+                    'name': 'name2',
+                    'vicinity': 'address2'
+                },
+            ]
+        }
+        mocker.patch.object(tasks.PLACE_DETAILS_CACHE, 'missing', return_value=['missing'])
+        apply_async = mocker.patch.object(tasks.prefetch_place_details, 'apply_async')
+
+        assert tasks.schedule_prefetch(search_results, 2) == ['missing']
+        apply_async.assert_called_once_with(
+            kwargs={
+                'place_id': 'missing',
+                'name': 'name1',
+                'address': 'address1',
+                'latitude': None,
+                'longitude': None
+            },
+            queue='prefetch',
+            priority=lane_options(PREFETCH)['priority'],
+        )
+
+    def test_schedule_prefetch_01(self, mocker):
+        """Ensure failing to publish the tasks is not fatal."""
+        search_results = {'results': [{'place_id': 'missing'}]}
+        mocker.patch.object(tasks.PLACE_DETAILS_CACHE, 'missing', return_value=['missing'])
+        mocker.patch.object(tasks.prefetch_place_details, 'apply_async', side_effect=OSError)
+
+        assert tasks.schedule_prefetch(search_results, 2) == []
+
     @pytest.mark.skip()
     def test_collect_place_details_00(self, mocker):
         """
@@ -108,3 +108,12 @@ class TestAbstractCollector:
             a.to_business_info()
 
         assert True
+
+    def test_release_00(self):
+        """Ensure the raw payloads are returned and dropped."""
+        a = AbstractCollector()
+        a.result = {'name': 'Epoch Coffee'}
+
+        assert a.release() == {'details': {'name': 'Epoch Coffee'}}
+        assert a.result is None
+        assert a.search_results is None
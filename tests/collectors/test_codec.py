@@ -0,0 +1,71 @@
+"""Test the codec module."""
+from dataclasses import dataclass
+
+import json_tricks
+import pytest
+
+from api.collectors.base import BusinessInfo
+from api.collectors.base import CODEC
+from api.collectors.base import PlaceSearchSummary
+from api.collectors.codec import Codec
+
+BUSINESS_INFO = BusinessInfo(name='Epoch Café', address='221 W N Loop Blvd', latitude=30.3186, weight=10)
+SUMMARY = PlaceSearchSummary('epoch-coffee-austin', 'Epoch Coffee', '221 W N Loop Blvd', 30.3186, -97.7244, 'yelp')
+
+
+@dataclass
+class Unregistered:
+    """Define a data class unknown to the codec."""
+
+    name: str = ''
+
+
+class TestCodec:
+    """Implement tests for the codec of the collector data classes."""
+
+    @pytest.mark.parametrize('obj', [BUSINESS_INFO, SUMMARY])
+    @pytest.mark.parametrize('indent', [None, 2])
+    def test_encode_00(self, obj, indent):
+        """Ensure the representation is identical to the json_tricks one."""
+        assert CODEC.encode(obj, indent=indent) == json_tricks.dumps(obj, sort_keys=True, indent=indent)
+
+    @pytest.mark.parametrize('obj', [BUSINESS_INFO, SUMMARY])
+    def test_decode_00(self, obj):
+        """Ensure the compact and json_tricks representations are decoded."""
+        assert CODEC.decode(CODEC.encode_compact(obj)) == obj
+        assert CODEC.decode(json_tricks.dumps(obj)) == obj
+        assert json_tricks.loads(CODEC.encode_compact(obj).decode()) == obj
+
+    def test_decode_01(self):
+        """Ensure the missing attributes take their default values."""
+        data = '{"__instance_type__": ["api.collectors.base", "BusinessInfo"], "attributes": {"name": "Epoch"}}'
+
+        assert CODEC.decode(data) == BusinessInfo(name='Epoch')
+
+    @pytest.mark.parametrize('data', [
+        '{"__instance_type__": ["os", "system"], "attributes": {}}',
+        '{"__instance_type__": ["api.collectors.base", "BusinessInfo"], "attributes": {}, "__version__": 2}',
+    ])
+    def test_decode_02(self, data):
+        """Ensure the unknown types and versions are rejected."""
+        with pytest.raises(ValueError):
+            CODEC.decode(data)
+
+    def test_encode_01(self):
+        """Ensure the unregistered classes are rejected."""
+        with pytest.raises(TypeError):
+            CODEC.encode(Unregistered())
+
+    def test_dumps_00(self):
+        """Ensure the nested objects round-trip."""
+        value = [[BUSINESS_INFO, SUMMARY], {'status': 'OK', 'result': None}]
+
+        assert CODEC.loads(CODEC.dumps(value)) == value
+        assert json_tricks.loads(CODEC.dumps(value).decode()) == value
+
+    def test_register_00(self):
+        """Ensure the classes can be registered later on."""
+        codec = Codec([])
+        codec.register(Unregistered)
+
+        assert codec.decode(codec.encode_compact(Unregistered('Epoch'))) == Unregistered('Epoch')
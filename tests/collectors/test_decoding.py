@@ -0,0 +1,26 @@
+"""Test the decoding module."""
+import pytest
+import requests
+
+from api.collectors.decoding import decode_response
+
+
+def make_response(content):
+    """Create a response with a raw body."""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+class TestDecoding:
+    """Implement tests for the decoding of the provider responses."""
+
+    def test_decode_response_00(self):
+        """Ensure the body is decoded from its raw bytes."""
+        assert decode_response(make_response('{"name":"Café"}'.encode())) == {'name': 'Café'}
+
+    def test_decode_response_01(self):
+        """Ensure invalid bodies raise a `ValueError`."""
+        with pytest.raises(ValueError):
+            decode_response(make_response(b'<html>'))
@@ -0,0 +1,52 @@
+"""Test the dedup module."""
+from api.collectors.base import PlaceSearchSummary
+from api.collectors.dedup import deduplicate
+from api.collectors.dedup import SpatialGrid
+
+
+class TestDedup:
+    """Implement tests for the de-duplication of the places."""
+
+    def test_spatial_grid_00(self):
+        """Ensure the neighbors are found in the surrounding cells only."""
+        grid = SpatialGrid(50.0, 30.0)
+        grid.add(30.31865, -97.72445, 'epoch')
+        assert list(grid.neighbors(30.31870, -97.72450)) == ['epoch']
+        assert list(grid.neighbors(30.32865, -97.72445)) == []
+
+    def test_deduplicate_00(self):
+        """Ensure the same business reported by several providers is collapsed."""
+        google = PlaceSearchSummary('g1', 'Epoch Coffee', '221 W N Loop Blvd', 30.31865, -97.72445, 'google')
+        yelp = PlaceSearchSummary('y1', 'Epoch Coffee - North Loop', '221 W North Loop Blvd', 30.3187, -97.7245, 'yelp')
+        assert deduplicate([google, yelp]) == [(google, [yelp])]
+
+    def test_deduplicate_01(self):
+        """Ensure close businesses with different names are kept."""
+        epoch = PlaceSearchSummary('g1', 'Epoch Coffee', '', 30.31865, -97.72445, 'google')
+        tacodeli = PlaceSearchSummary('y1', 'Tacodeli', '', 30.3187, -97.7245, 'yelp')
+        assert deduplicate([epoch, tacodeli]) == [(epoch, []), (tacodeli, [])]
+
+    def test_deduplicate_02(self):
+        """Ensure businesses with the same name located far away from each other are kept."""
+        north = PlaceSearchSummary('g1', 'Starbucks', '', 30.31865, -97.72445, 'google')
+        south = PlaceSearchSummary('y1', 'Starbucks', '', 30.30865, -97.72445, 'yelp')
+        assert deduplicate([north, south]) == [(north, []), (south, [])]
+
+    def test_deduplicate_03(self):
+        """Ensure the businesses reported by the same provider, or without coordinates, are kept."""
+        first = PlaceSearchSummary('g1', 'Starbucks', '', 30.31865, -97.72445, 'google')
+        second = PlaceSearchSummary('g2', 'Starbucks', '', 30.31866, -97.72445, 'google')
+        unknown = PlaceSearchSummary('y1', 'Starbucks', '', 0.0, 0.0, 'yelp')
+        assert deduplicate([first, second, unknown]) == [(first, []), (second, []), (unknown, [])]
+
+    def test_deduplicate_04(self):
+        """Ensure every duplicate is found among hundreds of places."""
+        google = [
+            PlaceSearchSummary(f'g{i}', f'Business {i:03}', '', 30.3 + i * 0.001, -97.7, 'google') for i in range(300)
+        ]
+        yelp = [
+            PlaceSearchSummary(f'y{i}', f'Business {i:03}', '', 30.3 + i * 0.001, -97.70005, 'yelp') for i in range(300)
+        ]
+        groups = deduplicate(google + yelp)
+        assert len(groups) == 300
+        assert all([d.place_id for d in duplicates] == [f'y{place.place_id[1:]}'] for place, duplicates in groups)
@@ -5,6 +5,7 @@ import pytest
 
 from api.collectors.base import PlaceSearchSummary
 from api.collectors.generic import CollectorClient
+from api.collectors.generic import MATCH_PAGE_SIZE
 
 
 class TestCollectorClient:
@@ -40,6 +41,16 @@ class TestCollectorClient:
 
         c.collector.get_place_details.assert_called()
 
+    def test_get_places_details_00(self, mocker):
+        """Ensure the details of several places are retrieved together and converted."""
+        c = CollectorClient(self.fake.pystr())
+        c.collector = mocker.Mock()
+        c.collector.get_places_details.return_value = {'a': {'name': 'A'}}
+        c.collector.convert.side_effect = lambda result: result['name']
+
+        assert c.get_places_details(['a', 'b']) == {'a': 'A'}
+        c.collector.get_places_details.assert_called_once_with(['a', 'b'])
+
     def test_retrieve_search_summary_00(self, mocker):
         """Ensure the collector functions are called."""
         c = CollectorClient(self.fake.pystr())
@@ -83,14 +94,26 @@ class TestCollectorClient:
         fake_address = self.fake.address()
         c = CollectorClient(self.fake.pystr())
         c.search_places = mocker.Mock()
-        c.retrieve_search_summary = mocker.Mock(return_value=PlaceSearchSummary(place_id=fake_place_id))
+        c.retrieve_search_summaries = mocker.Mock(return_value=[
+            PlaceSearchSummary(place_id=self.fake.pystr(), name=self.fake.pystr(), address=self.fake.address()),
+            PlaceSearchSummary(place_id=fake_place_id, name=fake_name, address=fake_address),
+        ])
         c.get_place_details = mocker.Mock()
 
         c.lookup_place(name=fake_name, address=fake_address)
 
-        c.search_places.assert_called_with(address=fake_address, terms=fake_name, limit=1)
+        c.search_places.assert_called_with(address=fake_address, terms=fake_name, limit=MATCH_PAGE_SIZE)
         c.get_place_details.assert_called_with(fake_place_id)
 
+    def test_lookup_place_03(self, mocker):
+        """Ensure lookup fails when the search does not return any result."""
+        c = CollectorClient(self.fake.pystr())
+        c.search_places = mocker.Mock()
+        c.retrieve_search_summaries = mocker.Mock(return_value=[])
+
+        with pytest.raises(ValueError):
+            c.lookup_place(name=self.fake.pystr(), address=self.fake.address())
+
     def test_to_business_info_00(self, mocker):
         """Ensure the collector functions are called."""
         c = CollectorClient(self.fake.pystr())
@@ -5,7 +5,9 @@ import json
 import googlemaps
 from faker import Faker
 import pytest
+import responses
 
+from api.collectors import google
 from api.collectors.base import BusinessInfo
 from api.collectors.base import PlaceSearchSummary
 from api.collectors.google import GoogleCollector
@@ -45,6 +47,52 @@ class TestGoogleCollector():
 
         assert type(details_results) is dict
 
+    def test_place_details_02(self, mocker, google_collector):
+        """Ensure only the fields needed to create a `BusinessInfo` are requested by default."""
+        gmaps = google_collector
+
+        place = mocker.patch.object(googlemaps.Client, 'place', return_value=GOOGLE_MAPS_DETAILS_RESPONSE)
+        gmaps.get_place_details('place-id')
+        gmaps.get_place_details('place-id', fields=['name'])
+
+        assert place.call_args_list[0][1] == {'fields': GoogleCollector.BUSINESS_INFO_FIELDS}
+        assert place.call_args_list[1][1] == {'fields': ['name']}
+
+    @responses.activate
+    def test_place_details_03(self, mocker, google_collector):
+        """Ensure the responses are decoded with orjson by the client, and their status checked."""
+        gmaps = google_collector
+        decode = mocker.spy(google, 'decode_response')
+        responses.add(
+            responses.GET,
+            'https://maps.googleapis.com/maps/api/place/details/json',
+            json=GOOGLE_MAPS_DETAILS_RESPONSE,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            'https://maps.googleapis.com/maps/api/place/details/json',
+            json={'status': 'INVALID_REQUEST'},
+            status=200,
+        )
+
+        assert gmaps.get_place_details('place-id') == GOOGLE_MAPS_DETAILS_RESPONSE
+        assert 'fields=formatted_address' in responses.calls[0].request.url
+        assert decode.call_count == 1
+        with pytest.raises(googlemaps.exceptions.ApiError):
+            gmaps.get_place_details('place-id')
+
+    def test_places_details_00(self, mocker, google_collector):
+        """Ensure several places are fetched one by one."""
+        gmaps = google_collector
+
+        place = mocker.patch.object(googlemaps.Client, 'place', return_value=GOOGLE_MAPS_DETAILS_RESPONSE)
+        actual = gmaps.get_places_details(['a', 'b', 'c'])
+
+        assert actual == dict.fromkeys(['a', 'b', 'c'], GOOGLE_MAPS_DETAILS_RESPONSE)
+        assert sorted(c[0][0] for c in place.call_args_list) == ['a', 'b', 'c']
+        assert gmaps.get_places_details([]) == {}
+
     def test_place_details_01(self, mocker, google_collector):
         """Ensure retrieve_place_details returns a dictionary."""
         gmaps = google_collector
@@ -116,10 +164,42 @@ class TestGoogleCollector():
             place_id='ChIJyWEHuEmuEmsRm9hTkapTCrk',
             name='Rhythmboat Cruises',
             address='Pyrmont Bay Wharf Darling Dr, Sydney',
+            latitude=-33.870775,
+            longitude=151.199025,
+            provider='google',
         )
 
         assert actual == expected
 
+    def test_retrieve_search_summaries_00(self, google_collector):
+        """Ensure all the results of the search are returned as `PlaceSearchSummary` objects."""
+        gmaps = google_collector
+        gmaps.search_results = GOOGLE_MAPS_SEARCH_RESPONSE
+        actual = gmaps.retrieve_search_summaries()
+
+        assert len(actual) == len(GOOGLE_MAPS_SEARCH_RESPONSE['results'])
+        assert actual[0] == gmaps.retrieve_search_summary(0)
+
+    def test_retrieve_search_summaries_01(self, mocker, google_collector):
+        """Ensure the candidates of a text search are returned, with the fields needed to summarize them."""
+        gmaps = google_collector
+        find_place = mocker.patch.object(googlemaps.Client, 'find_place', return_value=GOOGLE_MAPS_FIND_PLACE_RESPONSE)
+        gmaps.search_places('221 W N Loop Blvd, Austin', terms='Epoch Coffee')
+
+        actual = gmaps.retrieve_search_summaries()
+        expected = PlaceSearchSummary(
+            place_id='ChIJG-gJw2vKRIYROWi2uwOp8QE',
+            name='Epoch Coffee',
+            address='221 W N Loop Blvd, Austin, TX 78751, United States',
+            latitude=30.3186556,
+            longitude=-97.7245012,
+            provider='google',
+        )
+
+        assert find_place.call_args[1] == {'fields': GoogleCollector.SEARCH_SUMMARY_FIELDS}
+        assert actual == [expected]
+        assert gmaps.retrieve_search_summary() == expected
+
     def test_search_places_nearby_00(self, mocker, google_collector):
         """"""
         gmaps = google_collector
@@ -254,6 +334,27 @@ GOOGLE_MAPS_SEARCH_RESPONSE_JSON = """
 """
 GOOGLE_MAPS_SEARCH_RESPONSE = json.loads(GOOGLE_MAPS_SEARCH_RESPONSE_JSON)
 
+# Google Maps Find Place API Response example.
+GOOGLE_MAPS_FIND_PLACE_RESPONSE_JSON = """
+{
+   "candidates" : [
+      {
+         "formatted_address" : "221 W N Loop Blvd, Austin, TX 78751, United States",
+         "geometry" : {
+            "location" : {
+               "lat" : 30.3186556,
+               "lng" : -97.7245012
+            }
+         },
+         "name" : "Epoch Coffee",
+         "place_id" : "ChIJG-gJw2vKRIYROWi2uwOp8QE"
+      }
+   ],
+   "status" : "OK"
+}
+"""
+GOOGLE_MAPS_FIND_PLACE_RESPONSE = json.loads(GOOGLE_MAPS_FIND_PLACE_RESPONSE_JSON)
+
 # Google Maps Place Details API Response example.
 # https://developers.google.com/places/web-service/details#PlaceDetailsResponses
 GOOGLE_MAPS_DETAILS_RESPONSE_JSON = """
@@ -0,0 +1,59 @@
+"""Test the matching module."""
+import pytest
+
+from api.collectors.base import PlaceSearchSummary
+from api.collectors.matching import best_match
+from api.collectors.matching import address_similarity
+from api.collectors.matching import haversine
+from api.collectors.matching import name_similarity
+from api.collectors.matching import score_candidate
+from api.collectors.matching import trigram_similarity
+
+
+class TestMatching:
+    """Implement tests for the matching engine."""
+
+    def test_trigram_similarity_00(self):
+        """Ensure identical texts are fully similar, and unrelated ones are not."""
+        assert trigram_similarity('epoch coffee', 'epoch coffee') == 1.0
+        assert trigram_similarity('epoch coffee', 'gary danko') < 0.1
+        assert trigram_similarity('', 'gary danko') == 0.0
+
+    def test_name_similarity_00(self):
+        """Ensure the names are normalized before being compared."""
+        assert name_similarity('Epoch Coffee', 'EPOCH coffee!') == 1.0
+
+    def test_address_similarity_00(self):
+        """Ensure the addresses are normalized before being compared."""
+        assert address_similarity('221 West North Loop Boulevard, Suite 100', '221 W N Loop Blvd') == 1.0
+
+    def test_haversine_00(self):
+        """Ensure distances are computed in meters."""
+        assert haversine(30.0, -97.0, 30.0, -97.0) == 0.0
+        assert haversine(0.0, 0.0, 0.0, 1.0) == pytest.approx(111195, rel=1e-3)
+
+    def test_score_candidate_00(self):
+        """Ensure unknown components are ignored."""
+        candidate = PlaceSearchSummary(name='Epoch Coffee')
+        assert score_candidate(candidate, name='Epoch Coffee', address='221 W N Loop Blvd') == 1.0
+
+    def test_best_match_00(self):
+        """Ensure the best candidate is selected, even if it is not ranked first."""
+        candidates = [
+            PlaceSearchSummary('1', 'Epoch Coffee', '2700 W Anderson Ln, Austin', 30.358, -97.734),
+            PlaceSearchSummary('2', 'Epoch Coffee', '221 W North Loop Blvd, Austin', 30.3186, -97.72457),
+            PlaceSearchSummary('3', 'Tacodeli', '221 W North Loop Blvd, Austin', 30.3187, -97.72458),
+        ]
+        match, score = best_match(
+            candidates,
+            name='Epoch Coffee - North Loop',
+            address='221 West North Loop Boulevard, Austin',
+            latitude=30.31865,
+            longitude=-97.72445,
+        )
+        assert match.place_id == '2'
+        assert 0.0 < score <= 1.0
+
+    def test_best_match_01(self):
+        """Ensure no match is returned without candidate."""
+        assert best_match([], name='Epoch Coffee') == (None, 0.0)
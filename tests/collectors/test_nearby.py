@@ -0,0 +1,48 @@
+"""Test the nearby module."""
+from unittest.mock import Mock
+
+from api.collectors import nearby
+from api.collectors.base import PlaceSearchSummary
+
+
+def mock_client(provider, summaries=None, error=None):
+    """Create a client returning some search summaries."""
+    client = Mock(provider=provider)
+    client.search_places_nearby.side_effect = error
+    client.retrieve_search_summaries.return_value = summaries or []
+    return client
+
+
+class TestNearby:
+    """Implement tests for the search of the places nearby a location."""
+
+    def test_nearby_clients_00(self, monkeypatch):
+        """Ensure the providers without API key are ignored."""
+        monkeypatch.setenv('RYR_COLLECTOR_GOOGLE_PLACES_API_KEY', 'AIzaFakeKey')
+        monkeypatch.delenv('RYR_COLLECTOR_YELP_API_KEY', raising=False)
+        clients = nearby.nearby_clients()
+        assert [client.provider for client in clients] == ['google']
+
+    def test_search_nearby_00(self):
+        """Ensure the results of the providers are merged."""
+        google = mock_client('google', [
+            PlaceSearchSummary('g1', 'Epoch Coffee', '221 W N Loop Blvd', 30.31865, -97.72445, 'google'),
+        ])
+        yelp = mock_client('yelp', [
+            PlaceSearchSummary('y1', 'Epoch Coffee', '221 W North Loop Blvd', 30.3187, -97.7245, 'yelp'),
+            PlaceSearchSummary('y2', 'Tacodeli', '', 30.3188, -97.7246, 'yelp'),
+        ])
+        actual = nearby.search_nearby('30.31865,-97.72445', [google, yelp], radius=100)
+
+        assert actual['status'] == 'OK'
+        assert [result['place_id'] for result in actual['results']] == ['g1', 'y2']
+        assert actual['results'][0]['duplicates'] == [{'provider': 'yelp', 'place_id': 'y1'}]
+        google.search_places_nearby.assert_called_once_with('30.31865,-97.72445', radius=100)
+
+    def test_search_nearby_01(self):
+        """Ensure a failing provider does not fail the search."""
+        google = mock_client('google', error=RuntimeError('OVER_QUERY_LIMIT'))
+        yelp = mock_client('yelp', [PlaceSearchSummary('y2', 'Tacodeli', '', 30.3188, -97.7246, 'yelp')])
+        actual = nearby.search_nearby('30.31865,-97.72445', [google, yelp])
+
+        assert [result['place_id'] for result in actual['results']] == ['y2']
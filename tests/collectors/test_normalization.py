@@ -0,0 +1,51 @@
+"""Test the normalization module."""
+from api.collectors import normalization
+from api.collectors.base import BusinessInfo
+from api.collectors.base import PlaceSearchSummary
+
+
+class TestNormalization:
+    """Implement tests for the normalization of the names and addresses."""
+
+    def test_normalize_name_00(self):
+        """Ensure case, accents and punctuation are ignored."""
+        assert normalization.normalize_name('Café Épicé - North Loop!') == 'cafe epice north loop'
+
+    def test_normalize_name_01(self):
+        """Ensure ampersands are spelled out."""
+        assert normalization.normalize_name('Salt&Pepper') == 'salt and pepper'
+
+    def test_normalize_name_02(self):
+        """Ensure empty names are supported."""
+        assert normalization.normalize_name('') == ''
+        assert normalization.normalize_name(None) == ''
+
+    def test_normalize_address_00(self):
+        """Ensure the address components are abbreviated."""
+        assert normalization.normalize_address('221 West North Loop Boulevard, Austin') == '221 w n loop blvd austin'
+
+    def test_normalize_address_01(self):
+        """Ensure the secondary units are removed."""
+        assert normalization.normalize_address('1 Main Street Suite 100') == '1 main st'
+        assert normalization.normalize_address('1 Main St., Apt. 3B, Austin') == '1 main st austin'
+        assert normalization.normalize_address('1 Main St #12') == '1 main st'
+
+    def test_trigrams_00(self):
+        """Ensure the tokens are padded."""
+        assert normalization.trigrams('ab') == frozenset({'  a', ' ab', 'ab '})
+        assert normalization.trigrams('') == frozenset()
+
+    def test_cache_00(self):
+        """Ensure the normalized forms are memoized."""
+        normalization.normalize_address.cache_clear()
+        normalization.normalize_address('1 Main Street')
+        normalization.normalize_address('1 Main Street')
+        info = normalization.cache_info()['address']
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_dataclasses_00(self):
+        """Ensure the data classes expose their normalized forms."""
+        summary = PlaceSearchSummary(name='Epoch Coffee', address='221 West North Loop Boulevard')
+        info = BusinessInfo(name='Epoch Coffee', address='221 West North Loop Boulevard')
+        assert summary.normalized_name() == info.normalized_name() == 'epoch coffee'
+        assert summary.normalized_address() == info.normalized_address() == '221 w n loop blvd'
@@ -0,0 +1,147 @@
+"""Test the pipeline module."""
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from api.collectors import pipeline
+from api.collectors.base import BusinessInfo
+from api.collectors.base import PlaceSearchSummary
+from api.collectors.pipeline import CollectionPipeline
+from api.place_index import PlaceMatch
+
+
+def mock_client(provider, summaries=None):
+    """Create a client returning canned data."""
+    client = Mock(provider=provider)
+    client.retrieve_search_summaries.return_value = summaries or []
+    client.to_business_info.return_value = BusinessInfo(name='Epoch Coffee')
+    return client
+
+
+class TestCollectionPipeline:
+    """Implement tests for the collection pipeline."""
+
+    def test_run_00(self):
+        """Ensure the details of a reference place are retrieved directly."""
+        client = mock_client('google')
+        p = CollectionPipeline(client, Mock())
+
+        assert p.run('google-id') == BusinessInfo(name='Epoch Coffee')
+        client.fetch_place_details.assert_called_once_with('google-id')
+        client.search_places.assert_not_called()
+        assert list(p.timings) == ['details', 'convert']
+
+    def test_run_01(self):
+        """Ensure an indexed place is retrieved without searching."""
+        client = mock_client('yelp')
+        index = Mock()
+        index.get.return_value = PlaceMatch('yelp-id', 0.9)
+        p = CollectionPipeline(client, index)
+
+        assert p.run('google-id', 'Epoch Coffee', '221 W N Loop Blvd') == BusinessInfo(name='Epoch Coffee')
+        index.get.assert_called_once_with('google', 'google-id', 'yelp')
+        client.fetch_place_details.assert_called_once_with('yelp-id')
+        assert list(p.timings) == ['index', 'details', 'convert']
+
+    def test_run_02(self):
+        """Ensure the place is searched, matched and indexed."""
+        client = mock_client('yelp', [PlaceSearchSummary('yelp-id', 'Epoch Coffee', '221 W N Loop Blvd')])
+        index = Mock()
+        index.get.return_value = None
+        p = CollectionPipeline(client, index)
+
+        assert p.run('google-id', 'Epoch Coffee', '221 W N Loop Blvd') == BusinessInfo(name='Epoch Coffee')
+        client.fetch_place_details.assert_called_once_with('yelp-id')
+        index.set.assert_called_once_with('google', 'google-id', 'yelp', 'yelp-id', 1.0)
+        assert list(p.timings) == ['index', 'search', 'match', 'details', 'convert']
+
+    def test_run_03(self):
+        """Ensure a stale indexed place is forgotten and searched again."""
+        client = mock_client('yelp', [PlaceSearchSummary('new-id', 'Epoch Coffee', '221 W N Loop Blvd')])
+        client.fetch_place_details.side_effect = [requests.exceptions.HTTPError, None]
+        index = Mock()
+        index.get.return_value = PlaceMatch('old-id', 0.9)
+        p = CollectionPipeline(client, index)
+
+        p.run('google-id', 'Epoch Coffee', '221 W N Loop Blvd')
+        index.forget.assert_called_once_with('google', 'google-id', 'yelp')
+        client.fetch_place_details.assert_called_with('new-id')
+
+    def test_run_04(self):
+        """Ensure an error is raised if the search does not return any result."""
+        p = CollectionPipeline(mock_client('yelp'))
+        with pytest.raises(ValueError):
+            p.run(None, 'Epoch Coffee', '221 W N Loop Blvd')
+
+    def test_run_05(self):
+        """Ensure the raw payloads are released and audited once the collection is over."""
+        client = mock_client('google')
+        client.release.return_value = {'details': {'name': 'Epoch Coffee'}}
+        audit_store = Mock(enabled=True)
+        p = CollectionPipeline(client, audit_store=audit_store)
+
+        p.run('google-id')
+        client.release.assert_called_once_with()
+        audit_store.put.assert_called_once_with('google', 'details', 'google-id', {'name': 'Epoch Coffee'})
+
+    def test_run_06(self):
+        """Ensure the raw payloads are kept if they are retained."""
+        client = mock_client('google')
+        p = CollectionPipeline(client, retain_raw=True)
+
+        p.run('google-id')
+        client.release.assert_not_called()
+
+    def test_run_many_00(self):
+        """Ensure the places of the reference provider are retrieved together."""
+        client = mock_client('google')
+        client.get_places_details.return_value = {'a': BusinessInfo(name='A'), 'b': BusinessInfo(name='B')}
+        p = CollectionPipeline(client, Mock())
+
+        places = [dict(place_id='a'), dict(place_id='b')]
+
+        assert p.run_many(places) == {'a': BusinessInfo(name='A'), 'b': BusinessInfo(name='B')}
+        client.get_places_details.assert_called_once_with(['a', 'b'])
+        client.fetch_place_details.assert_not_called()
+
+    def test_run_many_01(self):
+        """Ensure the indexed places are retrieved together, and the other ones collected one by one."""
+        client = mock_client('yelp')
+        client.retrieve_search_summaries.side_effect = [
+            [PlaceSearchSummary('yelp-b', 'Epoch Coffee', '221 W N Loop Blvd')],
+            [],
+        ]
+        client.get_places_details.return_value = {'yelp-a': BusinessInfo(name='A')}
+        index = Mock()
+        matches = {'a': PlaceMatch('yelp-a', 0.9)}
+        index.get.side_effect = lambda provider, place_id, other_provider: matches.get(place_id)
+        p = CollectionPipeline(client, index)
+        places = [
+            dict(place_id='a', name='A', address='1 Main St', latitude=None, longitude=None),
+            dict(place_id='b', name='Epoch Coffee', address='221 W N Loop Blvd', latitude=None, longitude=None),
+            dict(place_id='c', name='Missing', address='2 Main St', latitude=None, longitude=None),
+        ]
+
+        assert p.run_many(places) == {'a': BusinessInfo(name='A'), 'b': BusinessInfo(name='Epoch Coffee')}
+        client.get_places_details.assert_called_once_with(['yelp-a'])
+        client.fetch_place_details.assert_called_once_with('yelp-b')
+
+    def test_run_many_02(self):
+        """Ensure the places are collected one by one if the batched request fails."""
+        client = mock_client('google')
+        client.get_places_details.side_effect = requests.exceptions.HTTPError
+        p = CollectionPipeline(client)
+
+        assert p.run_many([{'place_id': 'a'}]) == {'a': BusinessInfo(name='Epoch Coffee')}
+        client.fetch_place_details.assert_called_once_with('a')
+
+    def test_get_client_00(self, mocker):
+        """Ensure the clients are reused until the process forks."""
+        mocker.patch.object(pipeline.CollectorClient, 'authenticate')
+        client = pipeline.get_client('yelp', 'key')
+
+        assert pipeline.get_client('yelp', 'key') is client
+        pipeline.reset_clients()
+        assert pipeline.get_client('yelp', 'key') is not client
+        pipeline.reset_clients()
@@ -0,0 +1,89 @@
+"""Test the registry module."""
+import pytest
+
+from api.collectors.registry import BATCH
+from api.collectors.registry import BUILTIN_CAPABILITIES
+from api.collectors.registry import BUILTIN_COLLECTORS
+from api.collectors.registry import CollectorRegistry
+from api.collectors.registry import DETAILS
+from api.collectors.registry import NEARBY_SEARCH
+
+
+class DummyCollector:
+    """Define a collector only able to retrieve details."""
+
+    CAPABILITIES = frozenset([DETAILS])
+
+
+class TestCollectorRegistry:
+    """Implement tests for the collector registry."""
+
+    def test_load_00(self):
+        """Ensure the built-in collectors are loaded from their module."""
+        registry = CollectorRegistry(group='ryr.tests.none')
+        collector = registry.load('yelp')
+
+        assert collector.__name__ == 'YelpCollector'
+        assert registry.load('yelp') is collector
+
+    def test_load_01(self):
+        """Ensure unknown providers are rejected."""
+        registry = CollectorRegistry(group='ryr.tests.none')
+        with pytest.raises(ValueError):
+            registry.load('unknown')
+
+    def test_load_02(self):
+        """Ensure the provider modules are only imported when loaded."""
+        registry = CollectorRegistry(group='ryr.tests.none', builtins={'missing': 'tests.collectors.missing:Collector'})
+
+        assert registry.names() == ['missing']
+        with pytest.raises(ImportError):
+            registry.load('missing')
+
+    def test_register_00(self):
+        """Ensure a registered collector replaces the previous one."""
+        registry = CollectorRegistry(group='ryr.tests.none')
+        registry.load('yelp')
+        registry.register('yelp', DummyCollector)
+
+        assert registry.load('yelp') is DummyCollector
+
+    def test_capabilities_00(self):
+        """Ensure the capabilities are declared by the collectors."""
+        registry = CollectorRegistry(group='ryr.tests.none', capabilities={})
+        assert NEARBY_SEARCH in registry.capabilities('google')
+
+    def test_capabilities_01(self):
+        """Ensure the static capabilities of the built-in collectors match the ones of their class."""
+        registry = CollectorRegistry(group='ryr.tests.none')
+        assert set(BUILTIN_CAPABILITIES) == set(BUILTIN_COLLECTORS)
+        for name, capabilities in BUILTIN_CAPABILITIES.items():
+            assert registry.load(name).CAPABILITIES == capabilities
+        assert registry.enabled(BATCH, names=['google', 'yelp']) == ['yelp']
+
+    def test_capabilities_02(self):
+        """Ensure the collectors whose capabilities are declared are not imported to select them."""
+        registry = CollectorRegistry(
+            group='ryr.tests.none',
+            builtins={'missing': 'tests.collectors.missing:Collector'},
+            capabilities={'missing': frozenset([DETAILS])},
+        )
+
+        assert registry.enabled(DETAILS, names=['missing']) == ['missing']
+        assert registry.enabled(NEARBY_SEARCH, names=['missing']) == []
+
+    def test_register_01(self):
+        """Ensure the capabilities can be declared when registering a collector."""
+        registry = CollectorRegistry(group='ryr.tests.none', builtins={})
+        registry.register('missing', 'tests.collectors.missing:Collector', capabilities=[NEARBY_SEARCH])
+
+        assert registry.capabilities('missing') == frozenset([NEARBY_SEARCH])
+
+    def test_enabled_00(self):
+        """Ensure the enabled collectors are filtered by capability."""
+        registry = CollectorRegistry(group='ryr.tests.none', builtins={}, capabilities={})
+        registry.register('dummy', DummyCollector)
+        registry.register('yelp', 'api.collectors.yelp:YelpCollector')
+
+        assert registry.enabled(DETAILS, names=['yelp', 'dummy']) == ['yelp', 'dummy']
+        assert registry.enabled(NEARBY_SEARCH, names=['yelp', 'dummy']) == ['yelp']
@@ -1,6 +1,5 @@
 """Test the yelp module."""
 import json
-from unittest.mock import Mock
 
 from faker import Faker
 import requests
@@ -19,8 +18,8 @@ class TestYelpCollector():
         """Ensure the search returns a dictionary."""
         yelp = YelpCollector()
         response = requests.Response()
-        response.json = Mock(return_value=YELP_SEARCH_RESPONSE)
-        mocker.patch.object(requests, 'get', return_value=response)
+        response._content = json.dumps(YELP_SEARCH_RESPONSE).encode()
+        mocker.patch.object(requests.Session, 'get', return_value=response)
         search_results = yelp.search_places(self.fake.address(), terms=self.fake.pystr())
 
         assert type(search_results) is dict
@@ -29,8 +28,8 @@ class TestYelpCollector():
         """Ensure the search returns a dictionary."""
         yelp = YelpCollector()
         response = requests.Response()
-        response.json = Mock(return_value=YELP_SEARCH_RESPONSE)
-        mocker.patch.object(requests, 'get', return_value=response)
+        response._content = json.dumps(YELP_SEARCH_RESPONSE).encode()
+        mocker.patch.object(requests.Session, 'get', return_value=response)
         search_results = yelp.search_places(
             self.fake.address(),
             terms=self.fake.pystr(),
@@ -44,8 +43,8 @@ class TestYelpCollector():
         yelp = YelpCollector()
         response = requests.Response()
         response.status_code = 200
-        response.json = Mock(return_value=YELP_DETAILS_RESPONSE)
-        mocker.patch.object(requests, 'get', return_value=response)
+        response._content = json.dumps(YELP_DETAILS_RESPONSE).encode()
+        mocker.patch.object(requests.Session, 'get', return_value=response)
         details_results = yelp.get_place_details(self.fake.pystr())
 
         assert type(details_results) is dict
@@ -56,8 +55,8 @@ class TestYelpCollector():
 
         response = requests.Response()
         response.status_code = 200
-        response.json = Mock(return_value=YELP_DETAILS_RESPONSE)
-        mocker.patch.object(requests, 'get', return_value=response)
+        response._content = json.dumps(YELP_DETAILS_RESPONSE).encode()
+        mocker.patch.object(requests.Session, 'get', return_value=response)
         yelp.get_place_details(self.fake.pystr())
         actual = yelp.to_business_info()
         expected = BusinessInfo(
@@ -81,15 +80,70 @@ class TestYelpCollector():
         yelp = YelpCollector()
         response = requests.Response()
         response.status_code = 404
-        mocker.patch.object(requests, 'get', return_value=response)
+        mocker.patch.object(requests.Session, 'get', return_value=response)
         with pytest.raises(requests.exceptions.HTTPError):
             yelp.get_place_details(self.fake.pystr())
 
-    def test_search_places_nearby_00(self):
-        """Ensure the search_nearby fucntion raise `NotImplementedError`."""
+    def test_places_details_00(self, mocker):
+        """Ensure several businesses are retrieved per GraphQL request."""
         yelp = YelpCollector()
-        with pytest.raises(NotImplementedError):
-            yelp.search_places_nearby('123.456,789.012')
+        mocker.patch.object(YelpCollector, 'GRAPHQL_BATCH_SIZE', 2)
+        responses = []
+        for data in ({'b0': YELP_GRAPHQL_BUSINESS, 'b1': None}, {'b0': YELP_GRAPHQL_BUSINESS}):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = json.dumps({'data': data}).encode()
+            responses.append(response)
+        post = mocker.patch.object(requests.Session, 'post', side_effect=responses)
+
+        actual = yelp.get_places_details(['gary-danko', 'closed', 'gary-danko-2'])
+
+        assert list(actual) == ['gary-danko', 'gary-danko-2']
+        assert post.call_count == 2
+        assert post.call_args_list[0][1]['json']['variables'] == {'id0': 'gary-danko', 'id1': 'closed'}
+        assert yelp.convert(actual['gary-danko']) == BusinessInfo(
+            name='Gary Danko',
+            address='800 N Point St San Francisco, CA 94109',
+            latitude=37.80587,
+            longitude=-122.42058,
+            type='American (New)',
+            phone='+14152520800',
+        )
+
+    def test_places_details_01(self, mocker):
+        """Ensure the GraphQL requests raise an exception if status is not 200."""
+        yelp = YelpCollector()
+        response = requests.Response()
+        response.status_code = 401
+        mocker.patch.object(requests.Session, 'post', return_value=response)
+        with pytest.raises(requests.exceptions.HTTPError):
+            yelp.get_places_details(['gary-danko'])
+
+    def test_search_places_nearby_00(self, mocker):
+        """Ensure the nearby search queries the coordinates of the location."""
+        yelp = YelpCollector()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(YELP_SEARCH_RESPONSE).encode()
+        get = mocker.patch.object(requests.Session, 'get', return_value=response)
+        search_results = yelp.search_places_nearby('37.767, -122.421', radius=100)
+
+        assert search_results == YELP_SEARCH_RESPONSE
+        assert get.call_args[1]['params'] == {
+            'latitude': '37.767',
+            'longitude': '-122.421',
+            'radius': 100,
+            'limit': YelpCollector.MAX_LIMIT,
+        }
+
+    def test_search_places_nearby_01(self, mocker):
+        """Ensure the nearby search raises an exception if status is not 200."""
+        yelp = YelpCollector()
+        response = requests.Response()
+        response.status_code = 400
+        mocker.patch.object(requests.Session, 'get', return_value=response)
+        with pytest.raises(requests.exceptions.HTTPError):
+            yelp.search_places_nearby('37.767,-122.421')
 
     def test_to_business_info_00(self):
         """Ensure empty search results return `None`."""
@@ -128,11 +182,27 @@ class TestYelpCollector():
             place_id='four-barrel-coffee-san-francisco',
             name='Four Barrel Coffee',
             address='',
+            latitude=37.7670169511878,
+            longitude=-122.42184275,
+            provider='yelp',
         )
 
         assert actual == expected
 
 
+# Yelp GraphQL business example.
+YELP_GRAPHQL_BUSINESS_JSON = """
+{
+  "id": "gary-danko-san-francisco",
+  "name": "Gary Danko",
+  "phone": "+14152520800",
+  "location": {"formatted_address": "800 N Point St\\nSan Francisco, CA 94109"},
+  "coordinates": {"latitude": 37.80587, "longitude": -122.42058},
+  "categories": [{"title": "American (New)"}]
+}
+"""
+YELP_GRAPHQL_BUSINESS = json.loads(YELP_GRAPHQL_BUSINESS_JSON)
+
 # Yelp Search API Response example.
 YELP_SEARCH_RESPONSE_JSON = """
 {
@@ -0,0 +1,204 @@
+"""Test the admission module."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from api.admission import AdmissionController
+from api.admission import AsyncAdmissionController
+from api.admission import Overloaded
+from api.admission import overloaded_response
+from api.admission import timed_out_response
+
+
+class TestAdmissionController:
+    """Implement tests for the admission control of the threads."""
+
+    def test_admit_00(self):
+        """Ensure the slots are freed after the collections."""
+        admission = AdmissionController(limit=1, queue_size=0, timeout=0, retry_after=10)
+        with admission.admit():
+            assert admission.in_flight == 1
+        with admission.admit():
+            pass
+        assert admission.in_flight == 0
+        assert admission.rejected == 0
+
+    def test_admit_01(self):
+        """Ensure the requests beyond the queue are rejected right away."""
+        admission = AdmissionController(limit=1, queue_size=0, timeout=10, retry_after=10)
+        with admission.admit():
+            with pytest.raises(Overloaded) as excinfo:
+                with admission.admit():
+                    pass
+        assert excinfo.value.retry_after == 10
+        assert admission.rejected == 1
+        assert admission.in_flight == 0
+
+    def test_admit_02(self):
+        """Ensure the waiting requests are rejected after the timeout."""
+        admission = AdmissionController(limit=1, queue_size=1, timeout=0.01, retry_after=10)
+        with admission.admit():
+            with pytest.raises(Overloaded):
+                admission.acquire()
+        assert admission.waiting == 0
+        assert admission.rejected == 1
+
+    def test_admit_03(self):
+        """Ensure the waiting requests are admitted when a slot is freed."""
+        admission = AdmissionController(limit=1, queue_size=1, timeout=10, retry_after=10)
+        admission.acquire()
+        waiter = threading.Thread(target=admission.acquire)
+        waiter.start()
+        while not admission.waiting:
+            pass
+        assert admission.saturated
+        admission.release()
+        waiter.join()
+        assert admission.in_flight == 1
+        assert admission.waiting == 0
+        assert not admission.saturated
+
+    def test_stats_00(self):
+        """Ensure the saturation is the ratio of the requests to the capacity."""
+        admission = AdmissionController(limit=2, queue_size=2, timeout=0, retry_after=10)
+        admission.acquire()
+        assert admission.stats() == {
+            'limit': 2,
+            'queue_size': 2,
+            'in_flight': 1,
+            'waiting': 0,
+            'rejected': 0,
+            'saturation': 0.25,
+        }
+
+    def test_overloaded_response_00(self):
+        """Ensure the rejected requests tell the clients when to retry."""
+        response = overloaded_response(Overloaded(30))
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '30'
+        assert 'overloaded' in response.body['error']['message']
+
+    def test_timed_out_response_00(self):
+        """Ensure the collections which do not complete in time are reported as a gateway timeout."""
+        response = timed_out_response()
+        assert response.status_code == 504
+        assert 'did not complete' in response.body['error']['message']
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestAsyncAdmissionController:
+    """Implement tests for the admission control of the coroutines."""
+
+    def test_admit_00(self):
+        """Ensure the waiting requests are admitted when a slot is freed, and the others rejected."""
+        admission = AsyncAdmissionController(limit=1, queue_size=1, timeout=10, retry_after=10)
+        order = []
+
+        async def collect(name):
+            try:
+                async with admission.admit():
+                    order.append(name)
+                    await asyncio.sleep(0.01)
+            except Overloaded:
+                order.append(f'{name}:rejected')
+
+        async def run():
+            await asyncio.gather(collect('first'), collect('second'), collect('third'))
+
+        asyncio.run(run())
+        assert order == ['first', 'third:rejected', 'second']
+        assert admission.in_flight == 0
+        assert admission.rejected == 1
+
+    def test_admit_01(self):
+        """Ensure the waiting requests are rejected after the timeout."""
+        admission = AsyncAdmissionController(limit=1, queue_size=1, timeout=0.01, retry_after=10)
+
+        async def run():
+            async with admission.admit():
+                with pytest.raises(Overloaded):
+                    await admission.acquire()
+
+        asyncio.run(run())
+        assert admission.waiting == 0
+        assert admission.in_flight == 0
+
+
+def free_port():
+    """Find a free local port."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def get(port, path):
+    """Send a request to the server, and return the status code of the response."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request('GET', path)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def server():
+    """Start a gunicorn worker configured like the API, serving the real controllers."""
+    pytest.importorskip('gunicorn')
+    port = free_port()
+    env = dict(
+        os.environ,
+        RYR_API_ADMISSION_LIMIT='2',
+        RYR_API_ADMISSION_QUEUE_SIZE='2',
+        RYR_API_ADMISSION_TIMEOUT='10',
+        RYR_API_SPARE_THREADS='2',
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', '-c', 'python:api.gunicorn_config', '-w', '1', '-b', f'127.0.0.1:{port}',
+            'tests.admission_app:application'
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                get(port, '/health')
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    pytest.fail('gunicorn did not start.')
+                time.sleep(0.1)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.mark.usefixtures('socket_enabled')
+class TestWorkerModel:
+    """Implement tests for the admission control of a real gunicorn worker."""
+
+    def test_admission_00(self, server):
+        """Ensure the collections beyond the slots and the queue are shed, and the worker is reported saturated."""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            collections = [executor.submit(get, server, '/place') for _ in range(8)]
+            time.sleep(0.5)
+            health = get(server, '/health')
+            statuses = sorted(collection.result() for collection in collections)
+
+        assert health == 503
+        assert statuses == [200] * 4 + [503] * 4
+        assert get(server, '/health') == 200
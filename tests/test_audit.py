@@ -0,0 +1,59 @@
+"""Test the audit module."""
+from unittest.mock import Mock
+
+import redis
+
+from api.audit import AuditStore
+from api.audit import compress
+from api.audit import decompress
+
+
+class TestAuditStore:
+    """Implement tests for the audit store of the raw payloads."""
+
+    def test_compress_00(self):
+        """Ensure a payload survives the compression."""
+        payload = {'result': {'name': 'Epoch Coffee', 'types': ['cafe'] * 100}}
+        data = compress(payload)
+
+        assert len(data) < len(str(payload))
+        assert decompress(data) == payload
+
+    def test_put_00(self):
+        """Ensure a payload is stored compressed with the TTL."""
+        client = Mock()
+        store = AuditStore(10, client=client)
+
+        store.put('google', 'details', 'google-id', {'name': 'Epoch Coffee'})
+
+        key, data = client.set.call_args[0]
+        assert key == 'ryr:audit:google:details:google-id'
+        assert decompress(data) == {'name': 'Epoch Coffee'}
+        assert client.set.call_args[1] == {'ex': 10}
+
+    def test_put_01(self):
+        """Ensure nothing is stored if the store is disabled."""
+        client = Mock()
+        AuditStore(0, client=client).put('google', 'details', 'google-id', {'name': 'Epoch Coffee'})
+
+        client.set.assert_not_called()
+
+    def test_put_02(self):
+        """Ensure Redis errors are not raised."""
+        client = Mock()
+        client.set.side_effect = redis.exceptions.ConnectionError
+        AuditStore(10, client=client).put('google', 'details', 'google-id', {'name': 'Epoch Coffee'})
+
+    def test_get_00(self):
+        """Ensure a stored payload is decompressed."""
+        client = Mock()
+        client.get.return_value = compress({'name': 'Epoch Coffee'})
+
+        assert AuditStore(10, client=client).get('google', 'details', 'google-id') == {'name': 'Epoch Coffee'}
+
+    def test_get_01(self):
+        """Ensure Redis errors are treated as missing payloads."""
+        client = Mock()
+        client.get.side_effect = redis.exceptions.ConnectionError
+
+        assert AuditStore(10, client=client).get('google', 'details', 'google-id') is None
@@ -0,0 +1,41 @@
+"""Test the background module."""
+import asyncio
+import logging
+
+import pytest
+
+from api import background
+
+
+# The event loop uses a socket pair to wake itself up.
+@pytest.mark.usefixtures('socket_enabled')
+class TestRunInBackground:
+    """Implement tests for `run_in_background`."""
+
+    def test_run_in_background_00(self):
+        """Ensure the call runs without being awaited, and its future is released once done."""
+        calls = []
+
+        async def run():
+            future = background.run_in_background(calls.append, 'called')
+            assert future in background._pending  # pylint: disable=protected-access
+            await asyncio.wait([future])
+
+        asyncio.run(run())
+
+        assert calls == ['called']
+        assert not background._pending  # pylint: disable=protected-access
+
+    def test_run_in_background_01(self, caplog):
+        """Ensure the errors of the calls are logged."""
+
+        def fail():
+            raise ValueError('Boom.')
+
+        async def run():
+            await asyncio.wait([background.run_in_background(fail)])
+
+        with caplog.at_level(logging.WARNING, logger=background.__name__):
+            asyncio.run(run())
+
+        assert 'Boom.' in caplog.text
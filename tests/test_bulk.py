@@ -0,0 +1,71 @@
+"""Test the bulk module."""
+import dataclasses
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+
+from api import bulk
+from api.collectors.base import BusinessInfo
+from api.store import PlaceStore
+
+pa = pytest.importorskip('pyarrow')
+
+EPOCH = BusinessInfo(name='Epoch Coffee', address='221 W N Loop Blvd, Austin', latitude=30.3187, longitude=-97.7245)
+MOZART = BusinessInfo(
+    name='Mozart\'s Coffee', address='3825 Lake Austin Blvd, Austin', latitude=30.2953, longitude=-97.7843, weight=10)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a store containing a few places."""
+    s = PlaceStore(str(tmp_path / 'places.db'))
+    s.put('epoch', EPOCH)
+    s.put('mozart', MOZART)
+    return s
+
+
+class TestBulk:
+    """Implement tests for the bulk export and import."""
+
+    @pytest.mark.parametrize('extension', ['parquet', 'arrow'])
+    def test_round_trip_00(self, store, tmp_path, extension):
+        """Ensure the places survive an export followed by an import, by chunks."""
+        path = str(tmp_path / f'places.{extension}')
+        target = PlaceStore(str(tmp_path / 'target.db'))
+        cache = Mock()
+
+        assert bulk.export_places(store, path, chunk_size=1) == 2
+        assert bulk.import_places(target, path, cache=cache, chunk_size=1) == 2
+        assert target.get('epoch') == EPOCH
+        assert target.get('mozart') == MOZART
+        assert [r['place_id'] for r in target.with_name_prefix('mozart')] == ['mozart']
+        assert cache.set_many.call_count == 2
+
+    def test_import_places_00(self, store, tmp_path):
+        """Ensure the cache is not seeded if the places cannot be stored."""
+        path = str(tmp_path / 'places.parquet')
+        bulk.export_places(store, path)
+        target = Mock()
+        target.load.side_effect = sqlite3.OperationalError('database is locked')
+        cache = Mock()
+
+        with pytest.raises(sqlite3.OperationalError):
+            bulk.import_places(target, path, cache=cache)
+        cache.set_many.assert_not_called()
+
+    def test_from_record_batch_00(self):
+        """Ensure the missing values are replaced by the defaults."""
+        batch = pa.RecordBatch.from_pylist([{'place_id': 'epoch', 'name': 'Epoch Coffee'}], schema=bulk.schema())
+
+        assert bulk.from_record_batch(batch) == [('epoch', dataclasses.asdict(BusinessInfo(name='Epoch Coffee')))]
+
+    def test_file_format_00(self):
+        """Ensure the unknown extensions are rejected."""
+        with pytest.raises(ValueError):
+            bulk.file_format('places.csv')
+
+    def test_main_00(self, store, tmp_path, capsys):
+        """Ensure the command line exports the places."""
+        assert bulk.main(['export', str(tmp_path / 'places.parquet'), '--store', store.path]) == 0
+        assert 'exported 2 places' in capsys.readouterr().out
@@ -0,0 +1,155 @@
+"""Test the cache module."""
+from unittest.mock import Mock
+
+from faker import Faker
+import pytest
+import redis
+
+from api.cache import compute_etag
+from api.cache import ResultCache
+from api.cache import serialize
+
+
+class TestResultCache:
+    """Implement tests for the result cache."""
+    fake = Faker()
+
+    def test_serialize_00(self):
+        """Ensure the serialization does not depend on the order of the keys."""
+        assert serialize({'a': 1, 'b': 2}) == serialize({'b': 2, 'a': 1})
+
+    def test_compute_etag_00(self):
+        """Ensure the ETag is strong and quoted."""
+        etag = compute_etag(b'{}')
+        assert etag.startswith('"') and etag.endswith('"')
+        assert not etag.startswith('W/')
+
+    def test_get_00(self):
+        """Ensure a cached result is returned with its ETag."""
+        client = Mock()
+        client.mget.return_value = [b'"etag"', b'{"name":"name1"}']
+        cache = ResultCache('test', 10, client=client)
+
+        actual = cache.get(self.fake.pystr())
+
+        assert actual == ('"etag"', {'name': 'name1'})
+
+    def test_get_01(self):
+        """Ensure a missing result returns `None`."""
+        client = Mock()
+        client.mget.return_value = [None, None]
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.get(self.fake.pystr()) is None
+
+    def test_get_02(self):
+        """Ensure Redis errors are treated as cache misses."""
+        client = Mock()
+        client.mget.side_effect = redis.exceptions.ConnectionError
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.get(self.fake.pystr()) is None
+
+    @pytest.mark.parametrize('ttl, expected', [(42, 42), (-1, 60), (3600, 60)])
+    def test_get_with_ttl_00(self, ttl, expected):
+        """Ensure a cached result is returned with its remaining time to live, bounded by the TTL of the cache."""
+        client = Mock()
+        client.pipeline.return_value.execute.return_value = [[b'"etag"', b'{"name":"name1"}'], ttl]
+        cache = ResultCache('test', 60, client=client)
+
+        assert cache.get_with_ttl('key') == ('"etag"', {'name': 'name1'}, expected)
+
+    def test_get_with_ttl_01(self):
+        """Ensure Redis errors are treated as cache misses."""
+        client = Mock()
+        client.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.get_with_ttl('key') is None
+        assert cache.stats()['misses'] == 1
+
+    def test_stats_00(self):
+        """Ensure the hits and the misses are counted."""
+        client = Mock()
+        client.mget.side_effect = [[b'"etag"', b'{}'], [None, None], redis.exceptions.ConnectionError]
+        cache = ResultCache('test', 10, client=client)
+        assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': None}
+
+        for _ in range(3):
+            cache.get(self.fake.pystr())
+
+        assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+
+    def test_etag_00(self):
+        """Ensure the ETag is retrieved without the result."""
+        client = Mock()
+        client.get.return_value = b'"etag"'
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.etag('key') == '"etag"'
+        client.get.assert_called_once_with('ryr:cache:test:key:etag')
+
+    def test_set_00(self):
+        """Ensure the result and its ETag are stored with the TTL."""
+        client = Mock()
+        pipe = client.pipeline.return_value
+        cache = ResultCache('test', 10, client=client)
+
+        etag = cache.set('key', {'name': 'name1'})
+
+        assert etag == compute_etag(b'{"name":"name1"}')
+        pipe.set.assert_any_call('ryr:cache:test:key:body', b'{"name":"name1"}', ex=10)
+        pipe.set.assert_any_call('ryr:cache:test:key:etag', etag, ex=10)
+        pipe.execute.assert_called_once_with()
+
+    def test_set_01(self):
+        """Ensure the ETag is returned even if Redis is unavailable."""
+        client = Mock()
+        client.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.set('key', {}) == compute_etag(b'{}')
+
+    def test_set_many_00(self):
+        """Ensure several results are stored in a single round trip."""
+        client = Mock()
+        pipe = client.pipeline.return_value
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.set_many([('a', {'name': 'name1'}), ('b', {})]) == 2
+        pipe.set.assert_any_call('ryr:cache:test:a:body', b'{"name":"name1"}', ex=10)
+        pipe.set.assert_any_call('ryr:cache:test:b:etag', compute_etag(b'{}'), ex=10)
+        pipe.execute.assert_called_once_with()
+
+    def test_set_many_01(self):
+        """Ensure Redis errors are not raised."""
+        client = Mock()
+        client.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.set_many([('a', {})]) == 0
+
+    def test_missing_00(self):
+        """Ensure only the results which are not cached are returned."""
+        client = Mock()
+        client.mget.return_value = [b'"etag"', None]
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.missing(['a', 'b']) == ['b']
+        client.mget.assert_called_once_with(['ryr:cache:test:a:etag', 'ryr:cache:test:b:etag'])
+
+    def test_missing_01(self):
+        """Ensure Redis errors are treated as cache misses."""
+        client = Mock()
+        client.mget.side_effect = redis.exceptions.ConnectionError
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.missing(['a', 'b']) == ['a', 'b']
+
+    def test_remaining_ttls_00(self):
+        """Ensure the results which are not cached have no remaining time to live."""
+        client = Mock()
+        client.pipeline.return_value.execute.return_value = [120, -2]
+        cache = ResultCache('test', 10, client=client)
+
+        assert cache.remaining_ttls(['a', 'b']) == [120, 0]
@@ -0,0 +1,94 @@
+"""Test the connexion_spec module."""
+import os
+import pickle
+
+import pytest
+
+from api import connexion_spec
+from api.connexion_spec import artifact_path
+from api.connexion_spec import is_trusted
+from api.connexion_spec import load_specification
+from api.connexion_spec import specification_digest
+
+SPECIFICATION = b'openapi: "3.0.2"\n'
+
+
+@pytest.fixture
+def specification_path(tmpdir):
+    """Write a specification."""
+    path = tmpdir.join('openapi.yaml')
+    path.write_binary(SPECIFICATION)
+    return str(path)
+
+
+@pytest.fixture
+def parse(mocker):
+    """Mock the parsing of the specifications."""
+    return mocker.patch.object(connexion_spec, 'parse_specification', return_value={'openapi': '3.0.2'})
+
+
+class TestConnexionSpec:
+    """Implement tests for the precompiled specification."""
+
+    def test_specification_digest_00(self):
+        """Ensure the digest depends on the content and on the version of connexion."""
+        digest = specification_digest(SPECIFICATION, '2.0.1')
+        assert digest == specification_digest(SPECIFICATION, '2.0.1')
+        assert digest != specification_digest(SPECIFICATION, '2.0.2')
+        assert digest != specification_digest(SPECIFICATION + b'\n', '2.0.1')
+
+    def test_load_specification_00(self, tmpdir, specification_path, parse):
+        """Ensure a missing artifact is written to a private directory."""
+        cache_dir = str(tmpdir.join('cache'))
+
+        actual = load_specification(specification_path, cache_dir)
+
+        assert actual == {'openapi': '3.0.2'}
+        parse.assert_called_once_with(SPECIFICATION)
+        assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+        path = artifact_path(specification_path, cache_dir, specification_digest(SPECIFICATION))
+        assert os.stat(path).st_mode & 0o077 == 0
+
+    def test_load_specification_01(self, tmpdir, specification_path, parse):
+        """Ensure an existing artifact is loaded without parsing the specification."""
+        cache_dir = str(tmpdir.join('cache'))
+        load_specification(specification_path, cache_dir)
+
+        actual = load_specification(specification_path, cache_dir)
+
+        assert actual == {'openapi': '3.0.2'}
+        parse.assert_called_once()
+
+    def test_load_specification_02(self, tmpdir, specification_path, parse):
+        """Ensure a corrupt artifact is replaced."""
+        cache_dir = str(tmpdir.join('cache'))
+        load_specification(specification_path, cache_dir)
+        path = artifact_path(specification_path, cache_dir, specification_digest(SPECIFICATION))
+        with open(path, 'wb') as f:
+            f.write(b'corrupt')
+
+        actual = load_specification(specification_path, cache_dir)
+
+        assert actual == {'openapi': '3.0.2'}
+        assert parse.call_count == 2
+        with open(path, 'rb') as f:
+            assert pickle.load(f) == {'openapi': '3.0.2'}
+
+    def test_load_specification_03(self, tmpdir, specification_path, parse):
+        """Ensure the artifacts of a directory writable by other users are ignored."""
+        cache_dir = tmpdir.join('cache')
+        cache_dir.mkdir()
+        cache_dir.chmod(0o777)
+        path = artifact_path(specification_path, str(cache_dir), specification_digest(SPECIFICATION))
+        with open(path, 'wb') as f:
+            pickle.dump({'planted': True}, f)
+
+        actual = load_specification(specification_path, str(cache_dir))
+
+        assert actual == {'openapi': '3.0.2'}
+        assert not is_trusted(str(cache_dir))
+
+    def test_load_specification_04(self, specification_path, parse):
+        """Ensure the specification is parsed if the caching is disabled."""
+        assert load_specification(specification_path) == {'openapi': '3.0.2'}
+        parse.assert_called_once_with(SPECIFICATION)
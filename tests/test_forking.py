@@ -0,0 +1,63 @@
+"""Test the forking module."""
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from api import forking
+
+
+@pytest.fixture()
+def callbacks(mocker):
+    """Isolate the registered callbacks."""
+    registry = []
+    mocker.patch.object(forking, '_after_fork_callbacks', registry)
+    return registry
+
+
+class TestForking:
+    """Implement tests for the forking module."""
+
+    def test_register_after_fork_00(self, callbacks):
+        """Ensure a callback is registered only once."""
+        callback = Mock()
+        forking.register_after_fork(callback)
+        forking.register_after_fork(callback)
+
+        assert callbacks == [callback]
+
+    def test_register_after_fork_01(self, callbacks):
+        """Ensure the function can be used as a decorator."""
+
+        @forking.register_after_fork
+        def callback():
+            pass
+
+        assert callback in callbacks
+
+    def test_run_after_fork_callbacks_00(self, callbacks):
+        """Ensure all the callbacks are run, even if one of them fails."""
+        failing = Mock(side_effect=RuntimeError, __qualname__='failing')
+        callback = Mock()
+        forking.register_after_fork(failing)
+        forking.register_after_fork(callback)
+
+        forking.run_after_fork_callbacks()
+
+        failing.assert_called_once_with()
+        callback.assert_called_once_with()
+
+    def test_run_after_fork_callbacks_01(self, callbacks):
+        """Ensure the callbacks are run in the child process after a fork."""
+        read_fd, write_fd = os.pipe()
+        forking.register_after_fork(lambda: os.write(write_fd, b'reset'))
+
+        pid = os.fork()
+        if pid == 0:
+            # The child exits right away, without running the test session teardown.
+            os._exit(0)  # pylint: disable=protected-access
+        os.waitpid(pid, 0)
+        os.close(write_fd)
+
+        with os.fdopen(read_fd, 'rb') as reader:
+            assert reader.read() == b'reset'
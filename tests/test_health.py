@@ -0,0 +1,155 @@
+"""Test the health module."""
+import threading
+import time
+from unittest.mock import MagicMock
+from unittest.mock import Mock
+
+import orjson
+import redis
+
+from api.health import HealthCheck
+from api.health import WORKERS_LOCK_KEY
+from api.health import WORKERS_REPORT_KEY
+
+
+def fake_app(message_counts, active_queues):
+    """Create a Celery application with queues holding some messages."""
+    app = MagicMock()
+    app.amqp.queues = {}
+    for name, count in message_counts.items():
+        queue = Mock()
+        queue.return_value.queue_declare.return_value.message_count = count
+        app.amqp.queues[name] = queue
+    app.control.inspect.return_value.active_queues.return_value = active_queues
+    return app
+
+
+def consumed(*names):
+    """Create the queues consumed by a worker, as reported by the worker."""
+    return [{'name': name} for name in names]
+
+
+def fake_client(shared_report=None, locked=False):
+    """Create a Redis client holding the shared report of the workers."""
+    client = Mock()
+    client.get.return_value = orjson.dumps(shared_report) if shared_report is not None else None
+    client.set.return_value = not locked
+    return client
+
+
+class TestHealthCheck:
+    """Implement tests for the deep health check."""
+
+    def test_run_00(self):
+        """Ensure the dependencies are reported."""
+        active_queues = {'worker1': consumed('interactive'), 'worker2': consumed('interactive', 'batch')}
+        app = fake_app({'interactive': 3, 'batch': 0}, active_queues)
+        health_check = HealthCheck(5, 1, app=app, redis_client=fake_client())
+
+        actual = health_check.run()
+
+        assert actual['status'] == 'ok'
+        assert actual['dependencies']['broker']['queues'] == {'interactive': 3, 'batch': 0}
+        assert actual['dependencies']['workers']['workers'] == 2
+        assert actual['dependencies']['workers']['consumers'] == {'interactive': 2, 'batch': 1}
+        assert actual['dependencies']['result_backend']['latency'] >= 0
+        assert set(actual['caches']) == {'places', 'place'}
+        assert actual['caches']['place']['scope'] == 'process'
+        app.control.inspect.assert_called_once_with(timeout=1)
+
+    def test_run_01(self):
+        """Ensure a failing dependency is reported without preventing the other probes."""
+        client = fake_client()
+        client.ping.side_effect = redis.exceptions.ConnectionError('Connection refused.')
+        app = fake_app({'interactive': 0}, None)
+        health_check = HealthCheck(5, 1, app=app, redis_client=client)
+
+        actual = health_check.run()
+
+        assert actual['status'] == 'degraded'
+        assert actual['dependencies']['redis'] == {'status': 'error', 'error': 'Connection refused.'}
+        assert actual['dependencies']['workers']['workers'] == 0
+        assert actual['dependencies']['broker']['status'] == 'ok'
+
+    def test_report_00(self):
+        """Ensure the report is reused until it expires."""
+        client = fake_client()
+        health_check = HealthCheck(60, 1, app=fake_app({}, {}), redis_client=client)
+
+        first = health_check.report()
+        second = health_check.report()
+
+        assert first is second
+        client.ping.assert_called_once()
+
+    def test_report_01(self):
+        """Ensure the probes are run again once the report expired."""
+        client = fake_client()
+        health_check = HealthCheck(0, 1, app=fake_app({}, {}), redis_client=client)
+
+        health_check.report()
+        health_check.report()
+
+        assert client.ping.call_count == 2
+
+    def test_report_02(self):
+        """Ensure the previous report is returned while another thread runs the probes."""
+        health_check = HealthCheck(0, 1, app=fake_app({}, {}), redis_client=fake_client())
+        previous = health_check.report()
+        running = threading.Event()
+        release = threading.Event()
+
+        def run():
+            running.set()
+            release.wait()
+            return {'status': 'ok'}
+
+        health_check.run = run
+        refresh = threading.Thread(target=health_check.report)
+        refresh.start()
+        running.wait()
+        try:
+            assert health_check.report() is previous
+        finally:
+            release.set()
+            refresh.join()
+
+    def test_probe_workers_00(self):
+        """Ensure the fresh report shared by the API processes is reused without asking the workers."""
+        shared = {'workers': 3, 'consumers': {'interactive': 3}, 'checked_at': time.time()}
+        app = fake_app({}, {})
+        health_check = HealthCheck(5, 1, app=app, redis_client=fake_client(shared))
+
+        assert health_check.probe_workers() == shared
+        app.control.inspect.assert_not_called()
+
+    def test_probe_workers_01(self):
+        """Ensure a single process refreshes the expired report, the other ones reporting the previous one."""
+        shared = {'workers': 3, 'consumers': {'interactive': 3}, 'checked_at': time.time() - 60}
+        app = fake_app({}, {})
+        health_check = HealthCheck(5, 1, app=app, redis_client=fake_client(shared, locked=True))
+
+        assert health_check.probe_workers() == shared
+        app.control.inspect.assert_not_called()
+
+    def test_probe_workers_02(self):
+        """Ensure the expired report is refreshed and shared."""
+        app = fake_app({'interactive': 0}, {'worker1': consumed('interactive')})
+        client = fake_client()
+        health_check = HealthCheck(5, 1, app=app, redis_client=client)
+
+        actual = health_check.probe_workers()
+
+        assert actual['workers'] == 1
+        client.set.assert_any_call(WORKERS_LOCK_KEY, 1, nx=True, ex=2)
+        client.set.assert_any_call(WORKERS_REPORT_KEY, orjson.dumps(actual), ex=51)
+
+    def test_probe_workers_03(self):
+        """Ensure the workers are asked directly if Redis is unavailable."""
+        app = fake_app({'interactive': 0}, {'worker1': consumed('interactive')})
+        client = fake_client()
+        client.get.side_effect = redis.exceptions.ConnectionError
+        client.set.side_effect = redis.exceptions.ConnectionError
+        health_check = HealthCheck(5, 1, app=app, redis_client=client)
+
+        assert health_check.probe_workers()['workers'] == 1
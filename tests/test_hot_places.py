@@ -0,0 +1,80 @@
+"""Test the hot_places module."""
+from unittest.mock import Mock
+
+import redis
+
+from api.hot_places import AccessTracker
+from api.hot_places import DECAY_SCRIPT
+from api.hot_places import EVICTION_CHUNK
+from api.hot_places import place_request
+
+
+class TestAccessTracker:
+    """Implement tests for the access tracker."""
+
+    def test_record_00(self):
+        """Ensure the access count is incremented and the request is stored."""
+        client = Mock()
+        pipe = client.pipeline.return_value
+        tracker = AccessTracker('test', 10, 0.5, client=client)
+
+        tracker.record('place-id', {'place_id': 'place-id'})
+
+        pipe.execute_command.assert_called_once_with('ZINCRBY', 'ryr:hot:test:scores', 1, 'place-id')
+        pipe.hset.assert_called_once_with('ryr:hot:test:requests', 'place-id', b'{"place_id":"place-id"}')
+        pipe.execute.assert_called_once_with()
+
+    def test_record_01(self):
+        """Ensure Redis errors are not fatal."""
+        client = Mock()
+        client.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError
+        tracker = AccessTracker('test', 10, 0.5, client=client)
+
+        tracker.record('place-id', {})
+
+    def test_hottest_00(self):
+        """Ensure the hottest entries are returned with their requests."""
+        client = Mock()
+        client.zrevrange.return_value = [b'a', b'b']
+        client.hmget.return_value = [b'{"place_id":"a"}', None]
+        tracker = AccessTracker('test', 10, 0.5, client=client)
+
+        assert tracker.hottest(2) == [('a', {'place_id': 'a'})]
+        client.zrevrange.assert_called_once_with('ryr:hot:test:scores', 0, 1)
+
+    def test_hottest_01(self):
+        """Ensure Redis errors are treated as no entry."""
+        client = Mock()
+        client.zrevrange.side_effect = redis.exceptions.ConnectionError
+        tracker = AccessTracker('test', 10, 0.5, client=client)
+
+        assert tracker.hottest(2) == []
+
+    def test_decay_00(self):
+        """Ensure the counts decay and the coldest entries beyond the capacity are evicted, in a single script."""
+        client = Mock()
+        tracker = AccessTracker('test', 10, 0.5, client=client)
+
+        tracker.decay()
+
+        keys = ['ryr:hot:test:scores', 'ryr:hot:test:requests']
+        client.evalsha.assert_called_once_with(DECAY_SCRIPT.sha, 2, *keys, 0.5, 10, EVICTION_CHUNK)
+
+    def test_decay_01(self):
+        """Ensure Redis errors are not fatal."""
+        client = Mock()
+        client.evalsha.side_effect = redis.exceptions.ConnectionError
+        tracker = AccessTracker('test', 10, 0.5, client=client)
+
+        tracker.decay()
+
+    def test_place_request_00(self):
+        """Ensure only the collection arguments are kept."""
+        body = {'place_id': 'place-id', 'name': 'name', 'address': 'address', 'extra': 'extra'}
+        assert place_request(body) == {
+            'place_id': 'place-id',
+            'name': 'name',
+            'address': 'address',
+            'latitude': None,
+            'longitude': None,
+        }
@@ -0,0 +1,45 @@
+"""Test the http_cache module."""
+import pytest
+
+from api.http_cache import cache_headers
+from api.http_cache import etag_matches
+from api.http_cache import not_modified
+
+
+class TestHttpCache:
+    """Implement tests for the HTTP caching helpers."""
+
+    @pytest.mark.parametrize(
+        'if_none_match,etag,expected',
+        [
+            ('"abc"', '"abc"', True),
+            ('"def", "abc"', '"abc"', True),
+            ('W/"abc"', '"abc"', True),
+            ('"abc:gzip"', '"abc"', True),
+            ('W/"abc:br"', '"abc"', True),
+            ('*', '"abc"', True),
+            ('"def"', '"abc"', False),
+            ('"abc"', None, False),
+            (None, '"abc"', False),
+        ],
+    )
+    def test_etag_matches(self, if_none_match, etag, expected):
+        """Ensure the If-None-Match header is compared correctly."""
+        assert etag_matches(if_none_match, etag) == expected
+
+    def test_cache_headers_00(self):
+        """Ensure the caching headers are generated."""
+        actual = cache_headers('"abc"', 60)
+        expected = {'ETag': '"abc"', 'Cache-Control': 'public, max-age=60'}
+        assert actual == expected
+
+    def test_cache_headers_01(self):
+        """Ensure private responses are not stored by shared caches."""
+        assert cache_headers('"abc"', 60, public=False)['Cache-Control'] == 'private, max-age=60'
+
+    def test_not_modified_00(self):
+        """Ensure a 304 response carries the caching headers but no body."""
+        response = not_modified('"abc"', 60)
+        assert response.status_code == 304
+        assert response.headers['ETag'] == '"abc"'
+        assert response.body is None
@@ -0,0 +1,175 @@
+"""Test the metrics module."""
+from unittest.mock import MagicMock
+from unittest.mock import Mock
+
+import orjson
+import redis
+
+from api.metrics import collect
+from api.metrics import format_labels
+from api.metrics import oldest_message_ages
+from api.metrics import PUBLISHED_AT_HEADER
+from api.metrics import render
+from api.metrics import TaskMetrics
+
+
+def fake_app(lists, driver_type='redis'):
+    """Create a Celery application whose broker holds some lists of messages, by name."""
+    app = MagicMock()
+    app.amqp.queues = {'interactive': Mock(), 'batch': Mock()}
+    connection = app.connection_for_read.return_value.__enter__.return_value
+    connection.transport.driver_type = driver_type
+    channel = connection.default_channel
+    channel.sep = '\x06\x16'
+    channel.priority_steps = [0, 3]
+    pipe = channel.client.pipeline.return_value
+    names = []
+    pipe.lindex.side_effect = lambda name, index: names.append(name)
+    pipe.execute.side_effect = lambda: [lists.get(name, [None])[-1] for name in names]
+    return app
+
+
+def message(published_at):
+    """Create a message published at a given time, as stored by the Redis transport."""
+    return orjson.dumps({'body': '', 'headers': {PUBLISHED_AT_HEADER: published_at}})
+
+
+class TestTaskMetrics:
+    """Implement tests for the task metrics."""
+
+    def test_record_00(self):
+        """Ensure the waiting and service times are recorded in a single round trip."""
+        client = Mock()
+        pipe = client.pipeline.return_value
+        metrics = TaskMetrics(client=client)
+
+        metrics.record('api.celery.tasks.collect', 'google', 0.5, 'interactive', 1.5)
+
+        pipe.hincrbyfloat.assert_any_call(TaskMetrics.key, 'service:api.celery.tasks.collect:google:sum', 0.5)
+        pipe.hincrby.assert_any_call(TaskMetrics.key, 'service:api.celery.tasks.collect:google:count', 1)
+        pipe.hincrbyfloat.assert_any_call(TaskMetrics.key, 'wait:interactive:sum', 1.5)
+        pipe.hincrby.assert_any_call(TaskMetrics.key, 'wait:interactive:count', 1)
+        pipe.execute.assert_called_once()
+
+    def test_record_01(self):
+        """Ensure the waiting time is skipped if it is unknown."""
+        client = Mock()
+        pipe = client.pipeline.return_value
+        metrics = TaskMetrics(client=client)
+
+        metrics.record('api.celery.tasks.add', '', 0.5, 'interactive', None)
+
+        assert pipe.hincrbyfloat.call_count == 1
+
+    def test_record_02(self):
+        """Ensure Redis errors are ignored."""
+        client = Mock()
+        client.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError
+        metrics = TaskMetrics(client=client)
+
+        metrics.record('api.celery.tasks.add', '', 0.5)
+
+    def test_snapshot_00(self):
+        """Ensure the metrics are grouped by labels."""
+        client = Mock()
+        client.hgetall.return_value = {
+            b'wait:interactive:sum': b'3.5',
+            b'wait:interactive:count': b'2',
+            b'service:api.celery.tasks.collect:google:sum': b'1.25',
+            b'service:api.celery.tasks.collect:google:count': b'5',
+            b'service:api.celery.tasks.add::count': b'1',
+        }
+        metrics = TaskMetrics(client=client)
+
+        assert metrics.snapshot() == {
+            'wait': {
+                'interactive': {
+                    'sum': 3.5,
+                    'count': 2
+                }
+            },
+            'service': {
+                ('api.celery.tasks.collect', 'google'): {
+                    'sum': 1.25,
+                    'count': 5
+                },
+                ('api.celery.tasks.add', ''): {
+                    'count': 1
+                },
+            },
+        }
+
+    def test_snapshot_01(self):
+        """Ensure Redis errors return empty metrics."""
+        client = Mock()
+        client.hgetall.side_effect = redis.exceptions.ConnectionError
+        metrics = TaskMetrics(client=client)
+
+        assert metrics.snapshot() == {'wait': {}, 'service': {}}
+
+
+class TestRender:
+    """Implement tests for the rendering of the metrics."""
+
+    def test_format_labels_00(self):
+        """Ensure the label values are escaped."""
+        assert format_labels(queue='a"b\\c') == r'{queue="a\"b\\c"}'
+
+    def test_render_00(self):
+        """Ensure the metrics are rendered in the Prometheus text format."""
+        snapshot = {
+            'wait': {
+                'interactive': {
+                    'sum': 3.5,
+                    'count': 2
+                }
+            },
+            'service': {
+                ('api.celery.tasks.collect', 'google'): {
+                    'sum': 1.25,
+                    'count': 5
+                }
+            },
+        }
+
+        actual = render({'interactive': 3, 'batch': 0}, snapshot).splitlines()
+
+        assert 'ryr_queue_backlog{queue="batch"} 0' in actual
+        assert 'ryr_queue_backlog{queue="interactive"} 3' in actual
+        assert 'ryr_task_wait_seconds_sum{queue="interactive"} 3.5' in actual
+        assert 'ryr_task_wait_seconds_count{queue="interactive"} 2' in actual
+        assert 'ryr_task_service_seconds_sum{task="api.celery.tasks.collect",provider="google"} 1.25' in actual
+        assert 'ryr_task_service_seconds_count{task="api.celery.tasks.collect",provider="google"} 5' in actual
+
+    def test_render_01(self):
+        """Ensure the age of the oldest messages is rendered."""
+        actual = render(None, {'wait': {}, 'service': {}}, {'interactive': 12.5, 'batch': 0.0}).splitlines()
+
+        assert 'ryr_queue_oldest_message_age_seconds{queue="batch"} 0.000' in actual
+        assert 'ryr_queue_oldest_message_age_seconds{queue="interactive"} 12.500' in actual
+
+    def test_oldest_message_ages_00(self):
+        """Ensure the oldest message of each queue is read across the priority steps."""
+        app = fake_app({
+            'interactive': [message(990.0), message(980.0)],
+            'interactive\x06\x163': [message(970.0)],
+        })
+
+        assert oldest_message_ages(app, now=1000.0) == {'interactive': 30.0, 'batch': 0.0}
+
+    def test_oldest_message_ages_01(self):
+        """Ensure the ages are not reported if the broker is not Redis."""
+        assert oldest_message_ages(fake_app({}, driver_type='amqp')) is None
+
+    def test_collect_00(self):
+        """Ensure the task metrics are still rendered if the broker is unavailable."""
+        health_check = Mock()
+        health_check.probe_broker.side_effect = ConnectionError('Connection refused.')
+        task_metrics = Mock()
+        task_metrics.snapshot.return_value = {'wait': {'interactive': {'sum': 1.0, 'count': 1}}, 'service': {}}
+
+        actual = collect(health_check, task_metrics)
+
+        assert 'ryr_queue_backlog' not in actual
+        assert 'ryr_queue_oldest_message_age_seconds' not in actual
+        assert 'ryr_task_wait_seconds_count{queue="interactive"} 1' in actual
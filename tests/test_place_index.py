@@ -0,0 +1,70 @@
+"""Test the place_index module."""
+from unittest.mock import Mock
+
+import redis
+
+from api.place_index import PlaceIndex
+from api.place_index import PlaceMatch
+
+
+class TestPlaceIndex:
+    """Implement tests for the cross-provider place index."""
+
+    def test_get_00(self):
+        """Ensure an indexed match is returned."""
+        client = Mock()
+        client.get.return_value = b'{"place_id":"yelp-id","confidence":0.9}'
+        index = PlaceIndex(10, 0.5, client=client)
+
+        actual = index.get('google', 'google-id', 'yelp')
+
+        assert actual == PlaceMatch(place_id='yelp-id', confidence=0.9)
+        client.get.assert_called_once_with('ryr:xref:google:google-id:yelp')
+
+    def test_get_01(self):
+        """Ensure Redis errors are treated as missing matches."""
+        client = Mock()
+        client.get.side_effect = redis.exceptions.ConnectionError
+        index = PlaceIndex(10, 0.5, client=client)
+
+        assert index.get('google', 'google-id', 'yelp') is None
+
+    def test_set_00(self):
+        """Ensure a match is stored in both directions with the TTL."""
+        client = Mock()
+        pipe = client.pipeline.return_value
+        index = PlaceIndex(10, 0.5, client=client)
+
+        assert index.set('google', 'google-id', 'yelp', 'yelp-id', 0.9)
+
+        pipe.set.assert_any_call('ryr:xref:google:google-id:yelp', b'{"place_id":"yelp-id","confidence":0.9}', ex=10)
+        pipe.set.assert_any_call('ryr:xref:yelp:yelp-id:google', b'{"place_id":"google-id","confidence":0.9}', ex=10)
+
+    def test_set_01(self):
+        """Ensure low confidence matches are not stored."""
+        client = Mock()
+        index = PlaceIndex(10, 0.5, client=client)
+
+        assert not index.set('google', 'google-id', 'yelp', 'yelp-id', 0.4)
+        client.pipeline.assert_not_called()
+
+    def test_forget_00(self):
+        """Ensure a match is removed in both directions."""
+        client = Mock()
+        client.get.return_value = b'{"place_id":"yelp-id","confidence":0.9}'
+        pipe = client.pipeline.return_value
+        index = PlaceIndex(10, 0.5, client=client)
+
+        index.forget('google', 'google-id', 'yelp')
+
+        pipe.delete.assert_any_call('ryr:xref:google:google-id:yelp')
+        pipe.delete.assert_any_call('ryr:xref:yelp:yelp-id:google')
+        pipe.execute.assert_called_once_with()
+
+    def test_forget_01(self):
+        """Ensure Redis errors are not fatal."""
+        client = Mock()
+        client.get.side_effect = redis.exceptions.ConnectionError
+        index = PlaceIndex(10, 0.5, client=client)
+
+        index.forget('google', 'google-id', 'yelp')
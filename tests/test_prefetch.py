@@ -0,0 +1,63 @@
+"""Test the prefetch module."""
+from api.prefetch import prefetch_candidates
+
+
+class TestPrefetch:
+    """Implement tests for the selection of the places to prefetch."""
+
+    def test_prefetch_candidates_00(self):
+        """Ensure the Google nearby search results are supported."""
+        search_results = {
+            'results': [
+                {
+                    'place_id': 'ChIJ1',
+                    'name': 'Epoch Coffee',
+                    'vicinity': '221 W N Loop Blvd',
+                    'geometry': {
+                        'location': {
+                            'lat': 30.31865,
+                            'lng': -97.72445
+                        }
+                    },
+                },
+                {
+                    'place_id': 'ChIJ2',
+                    'name': 'Tacodeli',
+                    'vicinity': '1500 Spyglass Dr'
+                },
+            ]
+        }
+        assert prefetch_candidates(search_results, 1) == [{
+            'place_id': 'ChIJ1',
+            'name': 'Epoch Coffee',
+            'address': '221 W N Loop Blvd',
+            'latitude': 30.31865,
+            'longitude': -97.72445,
+        }]
+
+    def test_prefetch_candidates_01(self):
+        """Ensure the merged results only reported by the other providers are skipped."""
+        search_results = {
+            'results': [
+                {
+                    'place_id': 'y1',
+                    'name': 'Tacodeli',
+                    'address': '',
+                    'provider': 'yelp'
+                },
+                {
+                    'place_id': 'ChIJ1',
+                    'name': 'Epoch Coffee',
+                    'address': '221 W N Loop Blvd',
+                    'provider': 'google',
+                    'latitude': 30.31865,
+                    'longitude': -97.72445
+                },
+            ]
+        }
+        assert [c['place_id'] for c in prefetch_candidates(search_results, 5)] == ['ChIJ1']
+
+    def test_prefetch_candidates_02(self):
+        """Ensure empty responses are supported."""
+        assert prefetch_candidates(None, 5) == []
+        assert prefetch_candidates({'status': 'ZERO_RESULTS', 'results': []}, 5) == []
@@ -0,0 +1,50 @@
+"""Test the projection module."""
+from api.projection import canonical_fields
+from api.projection import parse_fields
+from api.projection import project
+from api.projection import project_search_results
+from tests.collectors.test_google import GOOGLE_MAPS_NEARBY_SEARCH_RESPONSE
+
+
+class TestProjection:
+    """Implement tests for the field projection."""
+
+    def test_parse_fields_00(self):
+        """Ensure dotted paths are parsed into a tree."""
+        actual = parse_fields('name, geometry.location ,geometry.viewport.northeast')
+        expected = {'name': None, 'geometry': {'location': None, 'viewport': {'northeast': None}}}
+        assert actual == expected
+
+    def test_parse_fields_01(self):
+        """Ensure a parent field absorbs its children, whatever their order."""
+        assert parse_fields('geometry,geometry.location') == {'geometry': None}
+        assert parse_fields('geometry.location,geometry') == {'geometry': None}
+
+    def test_canonical_fields_00(self):
+        """Ensure the lists of fields selecting the same projection are equal."""
+        expected = 'geometry,name'
+        assert canonical_fields('name,geometry') == expected
+        assert canonical_fields(' geometry.location, name ,geometry,name') == expected
+        assert canonical_fields('geometry.location,name') == 'geometry.location,name'
+        assert canonical_fields(',') is None
+        assert canonical_fields(None) is None
+
+    def test_project_00(self):
+        """Ensure only the requested fields are kept, and missing ones ignored."""
+        value = {'name': 'n', 'geometry': {'location': {'lat': 1}, 'viewport': {}}, 'photos': [{}]}
+        actual = project(value, parse_fields('name,geometry.location,rating'))
+        expected = {'name': 'n', 'geometry': {'location': {'lat': 1}}}
+        assert actual == expected
+
+    def test_project_search_results_00(self):
+        """Ensure each result is projected and the other entries are kept."""
+        actual = project_search_results(GOOGLE_MAPS_NEARBY_SEARCH_RESPONSE, 'place_id,geometry.location')
+        assert actual['status'] == GOOGLE_MAPS_NEARBY_SEARCH_RESPONSE['status']
+        assert len(actual['results']) == len(GOOGLE_MAPS_NEARBY_SEARCH_RESPONSE['results'])
+        for result in actual['results']:
+            assert set(result) <= {'place_id', 'geometry'}
+            assert set(result.get('geometry', {})) <= {'location'}
+
+    def test_project_search_results_01(self):
+        """Ensure the response is untouched without fields."""
+        assert project_search_results(GOOGLE_MAPS_NEARBY_SEARCH_RESPONSE, None) is GOOGLE_MAPS_NEARBY_SEARCH_RESPONSE
@@ -0,0 +1,103 @@
+"""Test the redis_pool module."""
+from unittest.mock import Mock
+
+import pytest
+import redis
+
+from api import redis_pool
+from api.redis_pool import LuaScript
+from api.redis_pool import SharedConnectionPool
+
+
+class FakeConnection(redis.Connection):
+    """Define a connection which never connects."""
+
+    def connect(self, *args, **kwargs):
+        """Do not connect."""
+
+    def can_read(self, *args, **kwargs):
+        """Pretend there is nothing to read."""
+        return False
+
+
+@pytest.fixture
+def reset_pool():
+    """Isolate the shared pool."""
+    redis_pool.reset_pool()
+    yield
+    redis_pool.reset_pool()
+
+
+class TestRedisPool:
+    """Implement tests for the shared Redis connection pool."""
+
+    @pytest.mark.parametrize('environ, expected', [
+        ({
+            'REDIS_URL': 'redis://cache:6379/1',
+            'CELERY_RESULT_BACKEND': 'redis://backend'
+        }, 'redis://cache:6379/1'),
+        ({
+            'CELERY_RESULT_BACKEND': 'redis://backend:6379/0'
+        }, 'redis://backend:6379/0'),
+        ({
+            'CELERY_RESULT_BACKEND': 'rpc://'
+        }, 'redis://'),
+        ({}, 'redis://'),
+    ])
+    def test_redis_url(self, mocker, environ, expected):
+        """Ensure the URL is configured like Celery."""
+        mocker.patch.dict('os.environ', environ, clear=True)
+
+        assert redis_pool.redis_url() == expected
+
+    def test_get_client_00(self, reset_pool, mocker):
+        """Ensure the client and its pool are shared, until the process changes."""
+        client = redis_pool.get_client()
+
+        assert redis_pool.get_client() is client
+        assert client.connection_pool is redis_pool.get_pool()
+        assert client.connection_pool.max_connections == redis_pool.REDIS_MAX_CONNECTIONS
+
+        mocker.patch('os.getpid', return_value=-1)
+        assert redis_pool.get_client() is not client
+        assert redis_pool.get_client().connection_pool is not client.connection_pool
+
+    def test_pool_stats_00(self, reset_pool):
+        """Ensure no statistics are reported before the pool is used."""
+        assert redis_pool.pool_stats() is None
+
+    def test_stats_00(self):
+        """Ensure the checkouts and the connections in use are counted."""
+        pool = SharedConnectionPool(connection_class=FakeConnection, max_connections=2)
+
+        first = pool.get_connection('GET')
+        second = pool.get_connection('GET')
+        pool.release(first)
+        pool.release(second)
+        pool.release(pool.get_connection('GET'))
+
+        stats = pool.stats()
+        assert stats['checkouts'] == 3
+        assert stats['in_use'] == 0
+        assert stats['peak_in_use'] == 2
+        assert stats['max_connections'] == 2
+
+    def test_lua_script_00(self):
+        """Ensure a script is invoked by its digest."""
+        client = Mock()
+        script = LuaScript('return 1')
+
+        script(['key'], [1], client=client)
+
+        client.evalsha.assert_called_once_with('e0e1f9fabfc9d4800c877a703b823ac0578ff8db', 1, 'key', 1)
+        client.eval.assert_not_called()
+
+    def test_lua_script_01(self):
+        """Ensure a script unknown to Redis is sent in full."""
+        client = Mock()
+        client.evalsha.side_effect = redis.exceptions.NoScriptError
+        script = LuaScript('return 1')
+
+        script(['key'], [1], client=client)
+
+        client.eval.assert_called_once_with('return 1', 1, 'key', 1)
@@ -0,0 +1,174 @@
+"""Test the store module."""
+import dataclasses
+
+import pytest
+
+from api.collectors.base import BusinessInfo
+from api.store import check_sqlite
+from api.store import longitude_ranges
+from api.store import PlaceStore
+from api.store import prefix_query
+from api.store import query_places
+from api.store import StoreUnavailable
+
+EPOCH = BusinessInfo(name='Epoch Coffee', address='221 W N Loop Blvd, Austin', latitude=30.3187, longitude=-97.7245)
+EPOCH_CAFE = BusinessInfo(name='Epoch Café', address='2700 W Anderson Ln, Austin', latitude=30.3590, longitude=-97.7370)
+MOZART = BusinessInfo(
+    name='Mozart\'s Coffee', address='3825 Lake Austin Blvd, Austin', latitude=30.2953, longitude=-97.7843)
+TAVEUNI = BusinessInfo(name='Taveuni Coffee', address='Waiyevo, Taveuni, Fiji', latitude=-16.79, longitude=179.98)
+SAMOA = BusinessInfo(name='Samoa Coffee', address='Apia, Samoa', latitude=-16.80, longitude=-179.98)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a store containing a few places."""
+    s = PlaceStore(str(tmp_path / 'places.db'))
+    s.put('epoch', EPOCH)
+    s.put('epoch-cafe', EPOCH_CAFE)
+    s.put('mozart', MOZART)
+    return s
+
+
+class TestPlaceStore:
+    """Implement tests for the local place store."""
+
+    def test_put_00(self, store):
+        """Ensure a stored place is replaced, along with its indexes."""
+        moved = BusinessInfo(name='Mozart\'s Roastery', address='1 Main St', latitude=40.0, longitude=-100.0)
+        store.put('mozart', moved)
+
+        assert store.get('mozart') == moved
+        assert store.with_name_prefix('mozart\'s cof') == []
+        assert [r['place_id'] for r in store.within_bbox(39.9, -100.1, 40.1, -99.9)] == ['mozart']
+
+    def test_put_01(self):
+        """Ensure nothing is stored if the store is disabled."""
+        store = PlaceStore('')
+        store.put('epoch', EPOCH)
+
+        assert not store.enabled
+
+    def test_put_many_00(self, store):
+        """Ensure the new places are inserted, and the stored ones updated, in the same batch."""
+        moved = BusinessInfo(name='Mozart\'s Roastery', address='1 Main St', latitude=40.0, longitude=-100.0)
+        store.put_many([('mozart', dataclasses.asdict(moved)), ('taveuni', dataclasses.asdict(TAVEUNI))])
+
+        assert store.get('mozart') == moved
+        assert store.get('taveuni') == TAVEUNI
+        assert [r['place_id'] for r in store.with_name_prefix('taveuni')] == ['taveuni']
+        assert len(store.with_name_prefix('epoch')) == 2
+
+    def test_check_sqlite_00(self):
+        """Ensure the modules required by the store are available."""
+        check_sqlite()
+
+    def test_check_sqlite_01(self):
+        """Ensure the missing modules are reported."""
+        with pytest.raises(StoreUnavailable, match='bogus'):
+            check_sqlite((('rtree', 'id, min_x, max_x'), ('bogus', 'x')))
+
+    def test_load_00(self, store):
+        """Ensure the indexes are rebuilt after a bulk load, and kept up to date afterwards."""
+        moved = dict(dataclasses.asdict(MOZART), latitude=40.0, longitude=-100.0)
+        added = dict(dataclasses.asdict(EPOCH), name='Epoch Coffee Burnet')
+
+        assert store.load([[('mozart', moved)], [('epoch-burnet', added)]]) == 2
+        assert [r['place_id'] for r in store.within_bbox(39.9, -100.1, 40.1, -99.9)] == ['mozart']
+        assert sorted(r['place_id'] for r in store.with_name_prefix('epoch cof')) == ['epoch', 'epoch-burnet']
+
+        store.put('mozart', MOZART)
+        assert store.within_bbox(39.9, -100.1, 40.1, -99.9) == []
+
+    def test_load_01(self, store):
+        """Ensure the store is left untouched if a bulk load fails."""
+
+        def chunks():
+            yield [('mozart', dict(dataclasses.asdict(MOZART), latitude=40.0))]
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            store.load(chunks())
+        assert store.get('mozart') == MOZART
+        assert len(store.with_name_prefix('mozart')) == 1
+
+    def test_within_bbox_00(self, store):
+        """Ensure only the places located in the bounding box are returned."""
+        results = store.within_bbox(30.30, -97.75, 30.37, -97.70)
+
+        assert sorted(r['place_id'] for r in results) == ['epoch', 'epoch-cafe']
+        assert results[0]['name'].startswith('Epoch')
+
+    def test_within_bbox_01(self, store):
+        """Ensure a bounding box crossing the antimeridian is split."""
+        store.put('taveuni', TAVEUNI)
+        store.put('samoa', SAMOA)
+
+        assert sorted(r['place_id'] for r in store.within_bbox(-17, 179.9, -16, -179.9)) == ['samoa', 'taveuni']
+        assert len(store.within_bbox(-17, 179.9, -16, -179.9, limit=1)) == 1
+
+    @pytest.mark.parametrize('west, east, expected', [
+        (-97.75, -97.70, [(-97.75, -97.70)]),
+        (179.9, -179.9, [(179.9, 180.0), (-180.0, -179.9)]),
+        (-180.1, -179.9, [(179.9, 180.0), (-180.0, -179.9)]),
+        (-190.0, 190.0, [(-180.0, 180.0)]),
+    ])
+    def test_longitude_ranges(self, west, east, expected):
+        """Ensure the longitude intervals crossing the antimeridian are split."""
+        assert longitude_ranges(west, east) == pytest.approx(expected)
+
+    def test_within_radius_00(self, store):
+        """Ensure the places within the radius are returned, closest first."""
+        results = store.within_radius(30.3188, -97.7246, 5000)
+
+        assert [r['place_id'] for r in results] == ['epoch', 'epoch-cafe']
+        assert results[0]['distance'] < results[1]['distance'] <= 5000
+
+    def test_within_radius_01(self, store):
+        """Ensure a circle crossing the antimeridian is split."""
+        store.put('taveuni', TAVEUNI)
+        store.put('samoa', SAMOA)
+
+        assert [r['place_id'] for r in store.within_radius(-16.79, 179.99, 5000)] == ['taveuni', 'samoa']
+
+    def test_get_00(self):
+        """Ensure the disabled store is not read."""
+        store = PlaceStore('')
+
+        assert store.get('epoch') is None
+        assert store.within_bbox(30.30, -97.75, 30.37, -97.70) == []
+        assert store.within_radius(30.3188, -97.7246, 5000) == []
+        assert store.with_name_prefix('epoch') == []
+        assert list(store.iter_chunks(10)) == []
+
+    def test_with_name_prefix_00(self, store):
+        """Ensure the names are matched by prefix, ignoring the case and the accents."""
+        assert sorted(r['place_id'] for r in store.with_name_prefix('epoch')) == ['epoch', 'epoch-cafe']
+        assert [r['place_id'] for r in store.with_name_prefix('EPOCH caf')] == ['epoch-cafe']
+        assert store.with_name_prefix('221') == []
+        assert store.with_name_prefix('"') == []
+
+    @pytest.mark.parametrize('prefix, expected', [
+        ('epoch cof', 'name : ("epoch" "cof"*)'),
+        ('"epoch" OR', 'name : ("epoch" "OR"*)'),
+        (' - ', None),
+    ])
+    def test_prefix_query(self, prefix, expected):
+        """Ensure the prefixes are converted to safe FTS5 queries."""
+        assert prefix_query(prefix) == expected
+
+    def test_query_places_00(self, store):
+        """Ensure the criterion selects the query."""
+        assert len(query_places(store, bbox='30.30,-97.75,30.37,-97.70')) == 2
+        assert len(query_places(store, location='30.3188,-97.7246', radius=100)) == 1
+        assert len(query_places(store, prefix='moz', limit=1)) == 1
+
+    @pytest.mark.parametrize('criteria', [
+        dict(),
+        dict(bbox='30.30,-97.75,30.37,-97.70', prefix='epoch'),
+        dict(bbox='30.30,-97.75'),
+        dict(location='a,b'),
+    ])
+    def test_query_places_01(self, store, criteria):
+        """Ensure invalid criteria are rejected."""
+        with pytest.raises(ValueError):
+            query_places(store, **criteria)